@@ -144,11 +144,22 @@ class CarriedStateBase(ABC):
         This method should not be directly used; use copy_and_apply instead.
         """
 
+    def _discard(self):
+        """
+        Reverts the state updates made on self, for implementations in which these updates are
+        visible to self.parent_state before they are applied (e.g., if the states share storage).
+        This method should not be directly used; use copy_and_apply instead.
+        """
+
     @contextlib.contextmanager
     def copy_and_apply(self: TCarriedState) -> Iterator[TCarriedState]:
         copied_state = self._copy()
-        # The exit logic will not be called in case an exception is raised inside the context.
-        yield copied_state
+        try:
+            yield copied_state
+        except BaseException:
+            # The updates are not applied in case an exception is raised inside the context.
+            copied_state._discard()
+            raise
         copied_state._apply()  # Apply to self.
 
 
@@ -2,9 +2,21 @@ import asyncio
 import dataclasses
 import logging
 import os
+import random
 import ssl
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Sequence, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
 from urllib.parse import urljoin
 
 import aiohttp
@@ -13,6 +25,7 @@ from services.external_api.has_uri_prefix import HasUriPrefix
 from starkware.starkware_utils.validated_dataclass import ValidatedDataclass
 
 logger = logging.getLogger(__name__)
+T = TypeVar("T")
 
 
 class BadRequest(Exception):
@@ -48,10 +61,41 @@ class RetryConfig(ValidatedDataclass):
         HTTPStatus.GATEWAY_TIMEOUT,
     )
 
+    # The delay before the first retry, in seconds. The delay is multiplied by backoff_factor
+    # after each retry, up to max_backoff.
+    initial_backoff: float = 1.0
+    backoff_factor: float = 2.0
+    max_backoff: float = 30.0
+    # The actual delay is drawn uniformly from [(1 - jitter) * delay, delay], so that clients that
+    # failed together do not retry together.
+    jitter: float = 0.5
+
+    def get_backoff(self, n_retries_done: int) -> float:
+        """
+        Returns the delay before the next retry, given the number of retries done so far.
+        """
+        # Avoid computing huge powers in case of unlimited retries.
+        exponent = min(n_retries_done, 64)
+        delay = min(self.initial_backoff * self.backoff_factor ** exponent, self.max_backoff)
+        return delay * random.uniform(1 - self.jitter, 1)
+
 
 class BaseClient(HasUriPrefix):
     """
     A base class for HTTP clients.
+
+    By default, each request opens its own connection. To reuse connections (keep-alive) across
+    requests, use the client as an async context manager; the requests sent inside the context
+    share a connection pool of up to max_connections connections (max_connections_per_host per
+    host; 0 for unlimited). For example:
+
+        async with client:
+            for tx_hash in tx_hashes:
+                await client.get_transaction(tx_hash=tx_hash)
+
+    Callers that send many requests should either do so inside the context, or use
+    send_concurrently() (on which bulk methods, such as FeederGatewayClient.get_transactions(), are
+    based), which enters it.
     """
 
     def __init__(
@@ -60,9 +104,20 @@ class BaseClient(HasUriPrefix):
         certificates_path: Optional[str] = None,
         retry_config: Optional[RetryConfig] = None,
         validate_server_crt: bool = True,
+        max_connections: int = 100,
+        max_connections_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
     ):
         self.url = url
         self.ssl_context: Optional[ssl.SSLContext] = None
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+
+        # The pooled session, open while the client is used as a context manager.
+        self.session: Optional[aiohttp.ClientSession] = None
+        # The number of (possibly nested) contexts that use self.session.
+        self.n_session_users = 0
 
         self.retry_config = RetryConfig() if retry_config is None else retry_config
         assert (
@@ -85,6 +140,54 @@ class BaseClient(HasUriPrefix):
                     os.path.join(certificates_path, "server.crt")
                 )
 
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            ssl=self.ssl_context,
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    async def __aenter__(self):
+        if self.n_session_users == 0:
+            self.session = self._create_session()
+        self.n_session_users += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.n_session_users -= 1
+        if self.n_session_users == 0:
+            assert self.session is not None
+            session, self.session = self.session, None
+            await session.close()
+
+    async def send_concurrently(
+        self, funcs: Iterable[Callable[[], Awaitable[T]]], max_concurrency: int = 10
+    ) -> List[T]:
+        """
+        Calls the given functions (typically, requests of this client) with up to max_concurrency
+        of them running at a time, using a pooled session. Returns their results, in order.
+        If one of them fails, the others are cancelled (before the pooled session is closed), and
+        the exception is raised.
+        """
+        assert max_concurrency > 0, "max_concurrency must be positive."
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(func: Callable[[], Awaitable[T]]) -> T:
+            async with semaphore:
+                return await func()
+
+        async with self:
+            tasks = [asyncio.ensure_future(run(func)) for func in funcs]
+            try:
+                return list(await asyncio.gather(*tasks))
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
     async def _send_request(
         self, send_method: str, uri: str, data: Optional[Union[str, Dict[str, Any]]] = None
     ) -> str:
@@ -96,26 +199,40 @@ class BaseClient(HasUriPrefix):
             a. Retries n_retries times for specified error types.
             b. Raises an exception immediately for other error types.
         """
+        if self.session is not None:
+            return await self._send_request_with_retries(
+                session=self.session, send_method=send_method, uri=uri, data=data
+            )
+
+        async with self._create_session() as session:
+            return await self._send_request_with_retries(
+                session=session, send_method=send_method, uri=uri, data=data
+            )
+
+    async def _send_request_with_retries(
+        self,
+        session: aiohttp.ClientSession,
+        send_method: str,
+        uri: str,
+        data: Optional[Union[str, Dict[str, Any]]],
+    ) -> str:
         url = urljoin(base=self.url, url=self.format_uri(uri))
 
         limited_retries = self.retry_config.n_retries > 0
         # n_retries > 0 means limited retries; n_retries == -1 means unlimited retries.
         n_retries_left = self.retry_config.n_retries
+        n_retries_done = 0
 
         while True:
             n_retries_left -= 1
 
             try:
-                async with aiohttp.TCPConnector(ssl=self.ssl_context) as connector:
-                    async with aiohttp.ClientSession(connector=connector) as session:
-                        async with session.request(
-                            method=send_method, url=url, data=data
-                        ) as response:
-                            text = await response.text()
-                            if response.status != HTTPStatus.OK:
-                                raise BadRequest(status_code=response.status, text=text)
-
-                            return text
+                async with session.request(method=send_method, url=url, data=data) as response:
+                    text = await response.text()
+                    if response.status != HTTPStatus.OK:
+                        raise BadRequest(status_code=response.status, text=text)
+
+                    return text
             except aiohttp.ClientError as exception:
                 error_message = f"Got {type(exception).__name__}"
 
@@ -141,7 +258,8 @@ class BaseClient(HasUriPrefix):
                     exc_info=True,
                 )
 
-            await asyncio.sleep(1)
+            await asyncio.sleep(self.retry_config.get_backoff(n_retries_done=n_retries_done))
+            n_retries_done += 1
 
     async def is_alive(self) -> str:
         return await self._send_request(send_method="GET", uri="/is_alive")
@@ -0,0 +1,135 @@
+import asyncio
+import dataclasses
+import functools
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Set
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from services.external_api.base_client import BadRequest, BaseClient, RetryConfig
+
+
+class Client(BaseClient):
+    prefix = ""
+
+
+@dataclasses.dataclass
+class ServerState:
+    n_requests: int = 0
+    connections: Set[Any] = dataclasses.field(default_factory=set)
+    n_failures: int = 0
+
+
+@dataclasses.dataclass
+class Server:
+    test_server: TestServer
+    state: ServerState
+
+    def make_url(self, path: str) -> str:
+        return str(self.test_server.make_url(path))
+
+
+@pytest.fixture
+async def server() -> AsyncIterator[Server]:
+    """
+    A server that counts the requests it gets and the connections they are sent on.
+    /echo/{value} returns value and /fail/{n} fails with SERVICE_UNAVAILABLE n times in total.
+    """
+    state = ServerState()
+
+    async def echo(request: web.Request) -> web.Response:
+        state.n_requests += 1
+        state.connections.add(request.transport)
+        await asyncio.sleep(0.01)
+        return web.Response(text=request.match_info["value"])
+
+    async def fail(request: web.Request) -> web.Response:
+        if state.n_failures < int(request.match_info["n"]):
+            state.n_failures += 1
+            return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE, text="Unavailable.")
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.add_routes([web.get("/echo/{value}", echo), web.get("/fail/{n}", fail)])
+    test_server = TestServer(app)
+    await test_server.start_server()
+    yield Server(test_server=test_server, state=state)
+    await test_server.close()
+
+
+def test_retry_config_backoff():
+    retry_config = RetryConfig(initial_backoff=1.0, backoff_factor=2.0, max_backoff=5.0, jitter=0)
+    assert [retry_config.get_backoff(n_retries_done=i) for i in range(5)] == [1, 2, 4, 5, 5]
+
+    retry_config = RetryConfig(initial_backoff=4.0, jitter=0.5)
+    assert all(2.0 <= retry_config.get_backoff(n_retries_done=0) <= 4.0 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_retries(server: Server):
+    retry_config = RetryConfig(n_retries=3, initial_backoff=0.001)
+    client = Client(url=server.make_url("/"), retry_config=retry_config)
+    assert await client._send_request(send_method="GET", uri="/fail/2") == "ok"
+
+    with pytest.raises(BadRequest, match="Unavailable"):
+        await client._send_request(send_method="GET", uri="/fail/10")
+
+
+@pytest.mark.asyncio
+async def test_pooled_session(server: Server):
+    client = Client(url=server.make_url("/"), max_connections=2)
+    async with client:
+        async with client:
+            for i in range(5):
+                assert await client._send_request(send_method="GET", uri=f"/echo/{i}") == str(i)
+        # The inner context does not close the session.
+        assert client.session is not None and not client.session.closed
+    assert client.session is None
+
+    # All the requests were sent on a single kept-alive connection.
+    assert server.state.n_requests == 5
+    assert len(server.state.connections) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_concurrently(server: Server):
+    client = Client(url=server.make_url("/"), max_connections=3)
+    results = await client.send_concurrently(
+        funcs=(
+            functools.partial(client._send_request, send_method="GET", uri=f"/echo/{i}")
+            for i in range(20)
+        ),
+        max_concurrency=5,
+    )
+    assert results == [str(i) for i in range(20)]
+    # The number of connections is bounded by the pool size.
+    assert len(server.state.connections) <= 3
+    assert client.session is None
+
+
+@pytest.mark.asyncio
+async def test_send_concurrently_failure(server: Server):
+    client = Client(url=server.make_url("/"), retry_config=RetryConfig(n_retries=1))
+    n_cancelled = 0
+
+    async def wait():
+        nonlocal n_cancelled
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            n_cancelled += 1
+            raise
+
+    funcs: List[Callable[[], Awaitable[Optional[str]]]] = [
+        functools.partial(client._send_request, send_method="GET", uri="/missing"),
+        wait,
+        wait,
+        wait,
+    ]
+    with pytest.raises(BadRequest, match="Not Found"):
+        await client.send_concurrently(funcs=funcs)
+    # The other calls were cancelled before the session was closed.
+    assert n_cancelled == 3
+    assert client.session is None
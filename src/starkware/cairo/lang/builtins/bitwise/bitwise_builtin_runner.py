@@ -60,13 +60,8 @@ class BitwiseBuiltinRunner(SimpleBuiltinRunner):
     def air_private_input(self, runner) -> Dict[str, Any]:
         assert self.base is not None, "Uninitialized self.base."
         res: Dict[int, Any] = {}
-        for addr, val in runner.vm_memory.items():
-            if (
-                not isinstance(addr, RelocatableValue)
-                or addr.segment_index != self.base.segment_index
-            ):
-                continue
-            idx, typ = divmod(addr.offset, CELLS_PER_BITWISE)
+        for offset, val in runner.vm_memory.get_segment_items(self.base.segment_index):
+            idx, typ = divmod(offset, CELLS_PER_BITWISE)
             if typ >= 2:
                 continue
 
@@ -77,7 +72,8 @@ class BitwiseBuiltinRunner(SimpleBuiltinRunner):
             assert "x" in item, f"Missing first input of bitwise instance {index}."
             assert "y" in item, f"Missing second input of bitwise instance {index}."
 
-        return {"bitwise": sorted(res.values(), key=lambda item: item["index"])}
+        # The cells are ordered by offset, hence the instances are ordered by index.
+        return {"bitwise": list(res.values())}
 
     def get_used_diluted_check_units(self, diluted_spacing: int, diluted_n_bits: int) -> int:
         total_n_bits = self.bitwise_builtin.total_n_bits
@@ -96,13 +96,8 @@ class EcOpBuiltinRunner(SimpleBuiltinRunner):
     def air_private_input(self, runner) -> Dict[str, Any]:
         assert self.base is not None, "Uninitialized self.base."
         res: Dict[int, Any] = {}
-        for addr, val in runner.vm_memory.items():
-            if (
-                not isinstance(addr, RelocatableValue)
-                or addr.segment_index != self.base.segment_index
-            ):
-                continue
-            idx, typ = divmod(addr.offset, CELLS_PER_EC_OP)
+        for offset, val in runner.vm_memory.get_segment_items(self.base.segment_index):
+            idx, typ = divmod(offset, CELLS_PER_EC_OP)
             if typ >= INPUT_CELLS_PER_EC_OP:
                 continue
 
@@ -113,4 +108,5 @@ class EcOpBuiltinRunner(SimpleBuiltinRunner):
             for name in INPUT_NAMES:
                 assert name in item, f"Missing input '{name}' of {self.name} instance {index}."
 
-        return {self.name: sorted(res.values(), key=lambda item: item["index"])}
+        # The cells are ordered by offset, hence the instances are ordered by index.
+        return {self.name: list(res.values())}
@@ -45,13 +45,8 @@ class HashBuiltinRunner(SimpleBuiltinRunner):
     def air_private_input(self, runner) -> Dict[str, Any]:
         assert self.base is not None, "Uninitialized self.base."
         res: Dict[int, Any] = {}
-        for addr, val in runner.vm_memory.items():
-            if (
-                not isinstance(addr, RelocatableValue)
-                or addr.segment_index != self.base.segment_index
-            ):
-                continue
-            idx, typ = divmod(addr.offset, CELLS_PER_HASH)
+        for offset, val in runner.vm_memory.get_segment_items(self.base.segment_index):
+            idx, typ = divmod(offset, CELLS_PER_HASH)
             if typ == 2:
                 continue
 
@@ -62,7 +57,8 @@ class HashBuiltinRunner(SimpleBuiltinRunner):
             assert "x" in item, f"Missing first input of {self.name} instance {index}."
             assert "y" in item, f"Missing second input of {self.name} instance {index}."
 
-        return {self.name: sorted(res.values(), key=lambda item: item["index"])}
+        # The cells are ordered by offset, hence the instances are ordered by index.
+        return {self.name: list(res.values())}
 
     def get_additional_data(self):
         return [list(RelocatableValue.to_tuple(x)) for x in sorted(self.verified_addresses)]
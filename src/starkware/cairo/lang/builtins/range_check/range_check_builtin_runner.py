@@ -1,7 +1,8 @@
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from starkware.cairo.lang.vm.builtin_runner import BuiltinVerifier, SimpleBuiltinRunner
-from starkware.cairo.lang.vm.relocatable import RelocatableValue
 from starkware.python.math_utils import safe_div
 
 
@@ -38,31 +39,34 @@ class RangeCheckBuiltinRunner(SimpleBuiltinRunner):
 
     def air_private_input(self, runner) -> Dict[str, Any]:
         assert self.base is not None, "Uninitialized self.base."
-        res: Dict[int, Any] = {}
-        for addr, val in runner.vm_memory.items():
-            if (
-                not isinstance(addr, RelocatableValue)
-                or addr.segment_index != self.base.segment_index
-            ):
-                continue
-            idx = addr.offset
-
+        res: List[Dict[str, Any]] = []
+        for offset, val in runner.vm_memory.get_segment_items(self.base.segment_index):
             assert isinstance(val, int)
-            res[idx] = {"index": idx, "value": hex(val)}
+            res.append({"index": offset, "value": hex(val)})
 
-        return {"range_check": sorted(res.values(), key=lambda item: item["index"])}
+        return {"range_check": res}
 
     def get_range_check_usage(self, runner) -> Optional[Tuple[int, int]]:
         assert self.base is not None, "Uninitialized self.base."
-        rc_min = None
-        rc_max = None
-        for addr, val in runner.vm_memory.items():
-            if (
-                not isinstance(addr, RelocatableValue)
-                or addr.segment_index != self.base.segment_index
-            ):
-                continue
+        values = [val for _, val in runner.vm_memory.get_segment_items(self.base.segment_index)]
+        if len(values) == 0:
+            return None
 
+        part_bits = self.inner_rc_bound.bit_length() - 1
+        if self.inner_rc_bound == 2 ** part_bits and part_bits in (8, 16, 32):
+            # Fast path: the parts of the values are their little-endian words of part_bits bits,
+            # so all the values can be split at once. The values are below self.bound, as checked
+            # by the validation rule.
+            part_bytes = part_bits // 8
+            n_bytes = part_bytes * self.n_parts
+            parts = np.frombuffer(
+                b"".join(val.to_bytes(n_bytes, "little") for val in values),
+                dtype=f"<u{part_bytes}",
+            )
+            return int(parts.min()), int(parts.max())
+
+        rc_min = rc_max = None
+        for val in values:
             # Split val into n_parts parts.
             for _ in range(self.n_parts):
                 part_val = val % self.inner_rc_bound
@@ -73,8 +77,7 @@ class RangeCheckBuiltinRunner(SimpleBuiltinRunner):
                     rc_min = min(rc_min, part_val)
                     rc_max = max(rc_max, part_val)
                 val //= self.inner_rc_bound
-        if rc_min is None or rc_max is None:
-            return None
+        assert rc_min is not None and rc_max is not None
         return rc_min, rc_max
 
     def get_used_perm_range_check_units(self, runner) -> int:
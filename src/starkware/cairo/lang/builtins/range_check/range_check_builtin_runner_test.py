@@ -1,6 +1,13 @@
+from types import SimpleNamespace
+
 import pytest
 
 from starkware.cairo.lang.builtins.builtin_runner_test_utils import PRIME, compile_and_run
+from starkware.cairo.lang.builtins.range_check.range_check_builtin_runner import (
+    RangeCheckBuiltinRunner,
+)
+from starkware.cairo.lang.vm.memory_dict import MemoryDict
+from starkware.cairo.lang.vm.relocatable import RelocatableValue
 from starkware.cairo.lang.vm.vm_exceptions import VmException
 
 
@@ -30,3 +37,24 @@ end
         match=f"Range-check builtin: Expected value at address 2:0 to be an integer. Got: 2:0",
     ):
         compile_and_run(CODE_FORMAT.format(value="range_check_ptr"))
+
+
+@pytest.mark.parametrize("inner_rc_bound, n_parts", [(2 ** 16, 8), (2 ** 8, 2), (10, 3)])
+def test_get_range_check_usage(inner_rc_bound: int, n_parts: int):
+    builtin_runner = RangeCheckBuiltinRunner(
+        included=True, ratio=8, inner_rc_bound=inner_rc_bound, n_parts=n_parts
+    )
+    builtin_runner.base = RelocatableValue(segment_index=3, offset=0)
+    runner = SimpleNamespace(vm_memory=MemoryDict())
+    assert builtin_runner.get_range_check_usage(runner) is None
+
+    values = [5, inner_rc_bound + 2, inner_rc_bound ** n_parts - 1, 3 * inner_rc_bound ** 2 + 7]
+    for i, value in enumerate(values):
+        runner.vm_memory[builtin_runner.base + i] = value % builtin_runner.bound
+    # Cells of other segments are ignored.
+    runner.vm_memory[RelocatableValue(segment_index=2, offset=0)] = 1
+
+    parts = [
+        value // inner_rc_bound ** i % inner_rc_bound for value in values for i in range(n_parts)
+    ]
+    assert builtin_runner.get_range_check_usage(runner) == (min(parts), max(parts))
@@ -1,9 +1,15 @@
 import argparse
+import contextlib
+import copy
+import dataclasses
 import json
 import os
 import sys
+import tempfile
 import time
-from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Type, Union
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Type, Union
 
 from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
 from starkware.cairo.lang.compiler.assembler import assemble
@@ -11,6 +17,7 @@ from starkware.cairo.lang.compiler.constants import LIBS_DIR_ENVVAR, MAIN_SCOPE,
 from starkware.cairo.lang.compiler.error_handling import LocationError
 from starkware.cairo.lang.compiler.identifier_manager import IdentifierError
 from starkware.cairo.lang.compiler.identifier_utils import get_struct_definition
+from starkware.cairo.lang.compiler.module_cache import ModuleCache
 from starkware.cairo.lang.compiler.module_reader import ModuleReader
 from starkware.cairo.lang.compiler.preprocessor.auxiliary_info_collector import (
     AuxiliaryInfoCollector,
@@ -26,7 +33,7 @@ from starkware.cairo.lang.version import __version__
 
 def cairo_compile_add_common_args(parser: argparse.ArgumentParser):
     parser.add_argument("-v", "--version", action="version", version=f"%(prog)s {__version__}")
-    parser.add_argument("files", metavar="file", type=str, nargs="+", help="File names")
+    parser.add_argument("files", metavar="file", type=str, nargs="*", help="File names")
     parser.add_argument(
         "--prime", type=int, default=DEFAULT_PRIME, help="The size of the finite field."
     )
@@ -72,6 +79,36 @@ def cairo_compile_add_common_args(parser: argparse.ArgumentParser):
         default=True,
         help="Disables unused function optimization.",
     )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help=(
+            "Compile the targets listed in the given JSON manifest, instead of the given files. "
+            'The manifest is a list of objects of the form {"files": [...], "output": "..."}, '
+            "which may also override other arguments of the command (by their names)."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="The number of processes used to compile a --batch (default: the number of CPUs).",
+    )
+    parser.add_argument(
+        "--batch_report",
+        type=str,
+        help=(
+            "A file to which the result and compilation time of each --batch target are written "
+            "(as a JSON line), as soon as the target is compiled."
+        ),
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        help=(
+            "A directory in which the parsed modules are cached, so that they are not parsed again "
+            "by later compilations (e.g., the standard library modules)."
+        ),
+    )
 
 
 def cairo_compile_common(
@@ -139,6 +176,168 @@ def cairo_compile_common(
             )
 
 
+@dataclasses.dataclass
+class BatchTargetResult:
+    """
+    The result of the compilation of a single --batch target.
+    """
+
+    output: str
+    files: List[str]
+    compilation_time: float
+    # The compilation error, or None if the compilation succeeded.
+    error: Optional[str] = None
+
+
+class BatchCompilationError(Exception):
+    """
+    An error in the --batch arguments or manifest.
+    """
+
+
+def compile_batch_target(
+    compile_func: Callable[[argparse.Namespace], Any],
+    args: argparse.Namespace,
+    target: Dict[str, Any],
+    output_args: Sequence[str],
+) -> BatchTargetResult:
+    """
+    Compiles a single --batch target: runs compile_func on a copy of args, overridden by the
+    target's values. The target's values of output_args are paths of files to write to.
+    The outputs are written to temporary files, which replace the target's files only if the
+    compilation succeeds, so that a failed compilation leaves the previous outputs intact.
+    Runs on a worker process, so compile_func must be a module-level function.
+    """
+    start_time = time.time()
+    error: Optional[str] = None
+    # Maps the path of each temporary output file to the path it replaces.
+    temp_paths: Dict[str, str] = {}
+    try:
+        target_args = copy.copy(args)
+        target_args.batch = None
+        with contextlib.ExitStack() as stack:
+            for name, value in target.items():
+                if name in output_args and value is not None:
+                    fp = stack.enter_context(
+                        tempfile.NamedTemporaryFile(
+                            mode="w", dir=os.path.dirname(os.path.abspath(value)), delete=False
+                        )
+                    )
+                    temp_paths[fp.name] = value
+                    value = fp
+                setattr(target_args, name, value)
+            compile_func(target_args)
+        for temp_path, path in temp_paths.items():
+            os.replace(temp_path, path)
+    except LocationError as err:
+        error = str(err)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        for temp_path in temp_paths:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    return BatchTargetResult(
+        output=target["output"],
+        files=target["files"],
+        compilation_time=time.time() - start_time,
+        error=error,
+    )
+
+
+def load_batch_manifest(
+    manifest_path: str, args: argparse.Namespace, output_args: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """
+    Loads and validates the --batch manifest. Raises BatchCompilationError if it is invalid.
+    """
+    try:
+        with open(manifest_path) as fp:
+            targets = json.load(fp)
+    except (OSError, json.JSONDecodeError) as err:
+        raise BatchCompilationError(f"Failed to load the --batch manifest: {err}") from err
+
+    if not isinstance(targets, list):
+        raise BatchCompilationError("The --batch manifest must be a list of targets.")
+    # The paths written by each target. They must not be shared between targets, as the targets
+    # are compiled concurrently.
+    written_paths: Set[str] = set()
+    for target in targets:
+        if not isinstance(target, dict):
+            raise BatchCompilationError(f"Expected a target object. Found: {target}.")
+        if not isinstance(target.get("files"), list) or not isinstance(target.get("output"), str):
+            raise BatchCompilationError(
+                f"Each target must specify its files (a list) and output (a path). "
+                f"Found: {target}."
+            )
+        for name in target:
+            if name in ("batch", "jobs", "batch_report") or not hasattr(args, name):
+                raise BatchCompilationError(f"Unexpected argument {name} in the target: {target}.")
+        for name in [*output_args, "cairo_dependencies"]:
+            path = target.get(name)
+            if path is None:
+                continue
+            path = os.path.abspath(path)
+            if path in written_paths:
+                raise BatchCompilationError(
+                    f"The path {target[name]} is written by more than one target."
+                )
+            written_paths.add(path)
+    return targets
+
+
+def cairo_compile_batch(
+    args: argparse.Namespace,
+    compile_func: Callable[[argparse.Namespace], Any],
+    output_args: Sequence[str] = ("output",),
+) -> List[BatchTargetResult]:
+    """
+    Compiles the targets of the --batch manifest, using a pool of args.jobs processes.
+    Each worker process keeps its state (e.g., the lark grammar and the parse cache) between the
+    targets, so the startup cost is paid once per worker rather than once per target.
+    Each target's output is written by its worker. The results are reported (to stderr, and to
+    args.batch_report if given) as soon as they are ready, and returned in the manifest order.
+
+    compile_func compiles a single target, given the arguments of the target (as in the non-batch
+    mode). It must be a module-level function, as it is sent to the worker processes.
+    The output paths (output_args and cairo_dependencies) may only be given per target.
+    Raises BatchCompilationError if the arguments or the manifest are invalid.
+    """
+    if len(args.files) != 0:
+        raise BatchCompilationError("Files cannot be given with --batch.")
+    for name in [*output_args, "cairo_dependencies"]:
+        if getattr(args, name) is not None:
+            raise BatchCompilationError(
+                f"--{name} cannot be given with --batch. Specify it per target in the manifest."
+            )
+    targets = load_batch_manifest(manifest_path=args.batch, args=args, output_args=output_args)
+
+    results: Dict[int, BatchTargetResult] = {}
+    with contextlib.ExitStack() as stack:
+        report = (
+            None if args.batch_report is None else stack.enter_context(open(args.batch_report, "w"))
+        )
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=args.jobs))
+        futures = {
+            executor.submit(compile_batch_target, compile_func, args, target, output_args): i
+            for i, target in enumerate(targets)
+        }
+        for future in as_completed(futures):
+            result = results[futures[future]] = future.result()
+            status = "OK" if result.error is None else "FAILED"
+            print(
+                f"{status} {result.output} ({result.compilation_time:.2f}s)",
+                file=sys.stderr,
+            )
+            if result.error is not None:
+                print(result.error, file=sys.stderr)
+            if report is not None:
+                print(json.dumps(dataclasses.asdict(result)), file=report, flush=True)
+
+    return [results[i] for i in range(len(targets))]
+
+
 def get_module_reader(cairo_path: List[str]) -> ModuleReader:
     starkware_src = os.path.join(os.path.dirname(__file__), "../../../..")
     cairo_path = [
@@ -150,6 +349,13 @@ def get_module_reader(cairo_path: List[str]) -> ModuleReader:
     return ModuleReader(paths=cairo_path, cairo_suffix=".cairo")
 
 
+def get_module_cache(args: argparse.Namespace) -> Optional[ModuleCache]:
+    """
+    Returns the module cache requested by the --cache_dir argument, if any.
+    """
+    return None if args.cache_dir is None else ModuleCache(cache_dir=args.cache_dir)
+
+
 def get_codes(file_names: List[str]) -> List[Tuple[str, str]]:
     """
     Returns a list of pairs (file_content, file_name).
@@ -196,9 +402,11 @@ def compile_cairo_ex(
     add_start: bool = False,
     main_scope: Optional[ScopedName] = None,
     auxiliary_info_cls: Optional[Type[AuxiliaryInfoCollector]] = None,
+    module_cache: Optional[ModuleCache] = None,
 ) -> Tuple[Program, PreprocessedProgram]:
     """
     Same as compile_cairo, but returns the preprocessed program as well.
+    module_cache may be given only if pass_manager is not (see ModuleCache).
     """
     file_contents_for_debug_info = {}
 
@@ -218,11 +426,15 @@ def compile_cairo_ex(
         assert prime is not None, "Exactly one of prime and pass_manager must be given."
         module_reader = get_module_reader(cairo_path)
         pass_manager = default_pass_manager(
-            prime=prime, read_module=module_reader.read, auxiliary_info_cls=auxiliary_info_cls
+            prime=prime,
+            read_module=module_reader.read,
+            auxiliary_info_cls=auxiliary_info_cls,
+            module_cache=module_cache,
         )
     else:
         assert prime is None, "Exactly one of prime and pass_manager must be given."
         assert len(cairo_path) == 0, "cairo_path cannot be specified where pass_manager is used."
+        assert module_cache is None, "module_cache cannot be specified where pass_manager is used."
 
     if main_scope is None:
         main_scope = MAIN_SCOPE
@@ -368,6 +580,25 @@ def cairo_assemble_program(
     return program
 
 
+def cairo_pass_manager_factory(
+    args: argparse.Namespace, module_reader: ModuleReader
+) -> PassManager:
+    return default_pass_manager(
+        prime=args.prime,
+        read_module=module_reader.read,
+        opt_unused_functions=args.opt_unused_functions,
+        module_cache=get_module_cache(args),
+    )
+
+
+def cairo_compile_from_args(args: argparse.Namespace) -> PreprocessedProgram:
+    return cairo_compile_common(
+        args=args,
+        pass_manager_factory=cairo_pass_manager_factory,
+        assemble_func=cairo_assemble_program,
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="A tool to compile Cairo code.")
     parser.add_argument(
@@ -384,24 +615,21 @@ def main():
         help="Disable proof mode (see --proof_mode).",
     )
 
-    def pass_manager_factory(args: argparse.Namespace, module_reader: ModuleReader) -> PassManager:
-        return default_pass_manager(
-            prime=args.prime,
-            read_module=module_reader.read,
-            opt_unused_functions=args.opt_unused_functions,
-        )
-
     try:
         cairo_compile_add_common_args(parser)
         args = parser.parse_args()
-        cairo_compile_common(
-            args=args,
-            pass_manager_factory=pass_manager_factory,
-            assemble_func=cairo_assemble_program,
-        )
+        if args.batch is not None:
+            results = cairo_compile_batch(args=args, compile_func=cairo_compile_from_args)
+            return 0 if all(result.error is None for result in results) else 1
+        if len(args.files) == 0:
+            parser.error("At least one file (or --batch) must be given.")
+        cairo_compile_from_args(args)
     except LocationError as err:
         print(err, file=sys.stderr)
         return 1
+    except BatchCompilationError as err:
+        print(f"Error: {err}", file=sys.stderr)
+        return 1
     return 0
 
 
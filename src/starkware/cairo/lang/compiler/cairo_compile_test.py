@@ -1,8 +1,17 @@
+import argparse
+import json
+import os
 import re
 
 import pytest
 
-from starkware.cairo.lang.compiler.cairo_compile import compile_cairo
+from starkware.cairo.lang.compiler.cairo_compile import (
+    BatchCompilationError,
+    cairo_compile_add_common_args,
+    cairo_compile_batch,
+    cairo_compile_from_args,
+    compile_cairo,
+)
 
 PRIME = 2 ** 251 + 17 * 2 ** 192 + 1
 
@@ -63,3 +72,92 @@ end
 """,
             prime=PRIME,
         )
+
+
+def test_batch_compilation(tmp_path):
+    for name, code in [
+        ("good", "func main():\n    [ap] = 1; ap++\n    ret\nend\n"),
+        ("bad", "func main():\n    [ap] = x; ap++\n    ret\nend\n"),
+    ]:
+        with open(os.path.join(tmp_path, f"{name}.cairo"), "w") as fp:
+            fp.write(code)
+    targets = [
+        {"files": [os.path.join(tmp_path, f"{name}.cairo")], "output": os.path.join(tmp_path, name)}
+        for name in ["good", "bad", "good"]
+    ]
+    # A failed compilation does not overwrite the previous output.
+    with open(targets[1]["output"], "w") as fp:
+        fp.write("previous output")
+    # Target-specific arguments override the common arguments.
+    targets[2].update(output=os.path.join(tmp_path, "good_no_debug"), debug_info=False)
+    manifest_path = os.path.join(tmp_path, "manifest.json")
+    with open(manifest_path, "w") as fp:
+        json.dump(targets, fp)
+
+    parser = argparse.ArgumentParser()
+    cairo_compile_add_common_args(parser)
+    report_path = os.path.join(tmp_path, "report.json")
+    args = parser.parse_args(
+        ["--batch", manifest_path, "--jobs", "2", "--batch_report", report_path]
+    )
+    results = cairo_compile_batch(args=args, compile_func=cairo_compile_from_args)
+
+    assert [result.output for result in results] == [target["output"] for target in targets]
+    assert [result.error is None for result in results] == [True, False, True]
+    assert "Unknown identifier 'x'" in results[1].error
+
+    with open(targets[0]["output"]) as fp:
+        program = json.load(fp)
+    assert program["data"] == ["0x480680017fff8000", "0x1", "0x208b7fff7fff7ffe"]
+    assert program["debug_info"] is not None
+    with open(targets[2]["output"]) as fp:
+        assert json.load(fp)["debug_info"] is None
+    with open(targets[1]["output"]) as fp:
+        assert fp.read() == "previous output"
+    # No temporary files are left behind.
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["good.cairo", "bad.cairo", "good", "bad", "good_no_debug", "manifest.json", "report.json"]
+    )
+
+    with open(report_path) as fp:
+        report = [json.loads(line) for line in fp]
+    assert sorted(entry["output"] for entry in report) == sorted(
+        target["output"] for target in targets
+    )
+
+
+@pytest.mark.parametrize(
+    "targets, path_arg, error_message",
+    [
+        ({"files": []}, None, "must be a list of targets"),
+        ([{"files": []}], None, "must specify its files"),
+        ([{"files": [], "output": "out", "jobs": 1}], None, "Unexpected argument jobs"),
+        (
+            [{"files": [], "output": "out"}, {"files": [], "output": "out"}],
+            None,
+            "is written by more than one target",
+        ),
+        (
+            [{"files": [], "output": "out1", "cairo_dependencies": "deps"}] * 2,
+            None,
+            "is written by more than one target",
+        ),
+        ([{"files": [], "output": "out"}], "output", "--output cannot be given"),
+        (
+            [{"files": [], "output": "out"}],
+            "cairo_dependencies",
+            "--cairo_dependencies cannot be given",
+        ),
+    ],
+)
+def test_batch_compilation_invalid_arguments(tmp_path, targets, path_arg, error_message):
+    manifest_path = os.path.join(tmp_path, "manifest.json")
+    with open(manifest_path, "w") as fp:
+        json.dump(targets, fp)
+
+    parser = argparse.ArgumentParser()
+    cairo_compile_add_common_args(parser)
+    extra_args = [] if path_arg is None else [f"--{path_arg}", os.path.join(tmp_path, "path")]
+    args = parser.parse_args(["--batch", manifest_path, *extra_args])
+    with pytest.raises(BatchCompilationError, match=re.escape(error_message)):
+        cairo_compile_batch(args=args, compile_func=cairo_compile_from_args)
@@ -1,4 +1,4 @@
-from typing import MutableMapping, Optional
+from typing import Mapping, Optional
 
 from starkware.cairo.lang.compiler.ast.cairo_types import TypeFelt, TypePointer
 from starkware.cairo.lang.compiler.ast.expr import ExprConst, ExprDeref, Expression, ExprReg
@@ -21,7 +21,7 @@ class ExpressionEvaluator(ExpressionSimplifier):
         prime: int,
         ap: Optional[int],
         fp: int,
-        memory: MutableMapping[int, int],
+        memory: Mapping[int, int],
         identifiers: Optional[IdentifierManager] = None,
     ):
         super().__init__(prime=prime)
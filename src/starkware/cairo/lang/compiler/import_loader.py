@@ -9,12 +9,15 @@ from starkware.cairo.lang.compiler.ast.code_elements import (
 from starkware.cairo.lang.compiler.ast.module import CairoFile
 from starkware.cairo.lang.compiler.ast.visitor import Visitor, get_lang_from_file
 from starkware.cairo.lang.compiler.error_handling import Location, LocationError
+from starkware.cairo.lang.compiler.module_cache import ModuleCache
 from starkware.cairo.lang.compiler.module_reader import ModuleNotFoundException
 from starkware.cairo.lang.compiler.parser import parse_file
 
 
 def collect_imports(
-    curr_pkg_name: str, read_file: Callable[[str], Tuple[str, str]]
+    curr_pkg_name: str,
+    read_file: Callable[[str], Tuple[str, str]],
+    module_cache: Optional[ModuleCache] = None,
 ) -> Dict[str, CairoFile]:
     """
     Scans the graph of file imports (using DFS), starting with curr_pkg_name,
@@ -24,9 +27,10 @@ def collect_imports(
     'read_file' is a strategy to access code files. Given a package name
     (as written in the using directive) it returns a pair (file content, file name).
     curr_pkg_name must be provided in the same format.
+    If module_cache is given, the files are parsed through it.
     """
 
-    collector = ImportsCollector(read_file)
+    collector = ImportsCollector(read_file, module_cache=module_cache)
     collector.collect(curr_pkg_name)
     return collector.collected_data
 
@@ -54,11 +58,16 @@ class ImportLoaderError(LocationError):
 
 
 class ImportsCollector:
-    def __init__(self, read_file: Callable[[str], Tuple[str, str]]):
+    def __init__(
+        self,
+        read_file: Callable[[str], Tuple[str, str]],
+        module_cache: Optional[ModuleCache] = None,
+    ):
         self.curr_ancestors: List[str] = []
         self.collected_data: Dict[str, CairoFile] = {}
         self.lang: Dict[str, Optional[str]] = {}
         self.read_file = read_file
+        self.module_cache = module_cache
 
     def collect(self, curr_pkg_name: str, location: Optional[Location] = None):
         # Check for circular dependencies.
@@ -78,7 +87,11 @@ class ImportsCollector:
                 f"Could not load module '{curr_pkg_name}'.\nError: {e}", location=location
             )
 
-        parsed_file: CairoFile = parse_file(code, filename=filename)
+        parsed_file: CairoFile = (
+            parse_file(code, filename=filename)
+            if self.module_cache is None
+            else self.module_cache.parse_file(code, filename=filename)
+        )
 
         lang = get_lang_from_file(parsed_file)
 
@@ -0,0 +1,91 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from typing import Optional
+
+from starkware.cairo.lang.compiler.ast.module import CairoFile
+from starkware.cairo.lang.compiler.parser import parse_file
+from starkware.cairo.lang.version import __version__
+
+logger = logging.getLogger(__name__)
+
+
+class ModuleCache:
+    """
+    A persistent cache of parsed Cairo files, shared between compilations (and processes).
+
+    Each entry holds the pickled CairoFile of one file, keyed by a hash of the compiler version, the
+    file name (which appears in the locations of the AST) and the file content. Hence, a modified
+    file, or a different compiler version, simply misses the cache. Entries are written atomically,
+    so concurrent compilations may share the same directory.
+
+    Note that entries are unpickled, so the cache directory must not be writable by untrusted users.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(code: str, filename: str) -> str:
+        key = hashlib.sha256()
+        for part in (__version__, filename, code):
+            encoded = part.encode("utf-8")
+            key.update(len(encoded).to_bytes(8, "big"))
+            key.update(encoded)
+        return key.hexdigest()
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def get(self, code: str, filename: str) -> Optional[CairoFile]:
+        """
+        Returns the cached CairoFile of the given file, or None if it is not in the cache.
+        """
+        path = self.get_path(self.get_key(code=code, filename=filename))
+        try:
+            with open(path, "rb") as fp:
+                parsed_file = pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # The entry may have been written by an incompatible version of the AST classes.
+            logger.debug(f"Failed to load the cache entry {path}.", exc_info=True)
+            return None
+
+        return parsed_file if isinstance(parsed_file, CairoFile) else None
+
+    def set(self, code: str, filename: str, parsed_file: CairoFile):
+        path = self.get_path(self.get_key(code=code, filename=filename))
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(parsed_file, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def parse_file(self, code: str, filename: str) -> CairoFile:
+        """
+        Same as parser.parse_file(), except that the result is taken from (or added to) the cache.
+        """
+        parsed_file = self.get(code=code, filename=filename)
+        if parsed_file is not None:
+            self.hits += 1
+            return parsed_file
+
+        self.misses += 1
+        parsed_file = parse_file(code, filename=filename)
+        try:
+            self.set(code=code, filename=filename, parsed_file=parsed_file)
+        except OSError:
+            # Failing to write the cache should not fail the compilation.
+            logger.warning(
+                f"Failed to write to the module cache at {self.cache_dir}.", exc_info=True
+            )
+        return parsed_file
@@ -0,0 +1,62 @@
+import os
+
+from starkware.cairo.lang.compiler.cairo_compile import compile_cairo_ex
+from starkware.cairo.lang.compiler.module_cache import ModuleCache
+from starkware.cairo.lang.compiler.parser import parse_file
+
+CODE = """
+func foo(x) -> (y):
+    return (y=x + 1)
+end
+"""
+
+
+def test_module_cache(tmp_path):
+    cache_dir = os.path.join(tmp_path, "cache")
+    cache = ModuleCache(cache_dir=cache_dir)
+    parsed_file = cache.parse_file(CODE, filename="a.cairo")
+    assert parsed_file == parse_file(CODE, filename="a.cairo")
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # A new cache on the same directory (e.g., in another process) reads the entry.
+    cache = ModuleCache(cache_dir=cache_dir)
+    cached_file = cache.parse_file(CODE, filename="a.cairo")
+    assert cached_file == parsed_file
+    assert cached_file is not parsed_file
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    # Changing the file name or content misses the cache.
+    cache.parse_file(CODE, filename="b.cairo")
+    cache.parse_file(CODE + "\n", filename="a.cairo")
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_module_cache_corrupted_entry(tmp_path):
+    cache = ModuleCache(cache_dir=str(tmp_path))
+    with open(cache.get_path(cache.get_key(code=CODE, filename="a.cairo")), "wb") as fp:
+        fp.write(b"not a pickle")
+
+    assert cache.parse_file(CODE, filename="a.cairo") == parse_file(CODE, filename="a.cairo")
+    assert cache.misses == 1
+    # The entry was rewritten.
+    assert cache.get(code=CODE, filename="a.cairo") is not None
+
+
+def test_compile_with_module_cache(tmp_path):
+    code = """
+from starkware.cairo.common.math import assert_nn
+
+func foo{range_check_ptr}():
+    assert_nn(1)
+    return ()
+end
+"""
+    cache = ModuleCache(cache_dir=str(tmp_path))
+    program, _ = compile_cairo_ex(code=code, prime=2 ** 64 + 13, module_cache=cache)
+    assert cache.hits == 0 and cache.misses > 1
+
+    n_modules = cache.misses
+    cache = ModuleCache(cache_dir=str(tmp_path))
+    cached_program, _ = compile_cairo_ex(code=code, prime=2 ** 64 + 13, module_cache=cache)
+    assert (cache.hits, cache.misses) == (n_modules, 0)
+    assert cached_program.data == program.data
@@ -1,3 +1,4 @@
+import itertools
 import os
 from functools import lru_cache
 from typing import List, Optional
@@ -172,37 +173,34 @@ def wrap_lark_error(err: LarkError, input_file: InputFile) -> Exception:
     return ParserError(err_str, location=location)
 
 
+# The maximal number of parse trees of Cairo files kept in the parse cache (see parse_file()).
+PARSE_CACHE_SIZE = 1024
+
+
 def parse(
     filename: Optional[str],
     code: str,
     code_type: str,
     expected_type,
     parser_context: Optional[ParserContext] = None,
+    use_parse_cache: bool = False,
 ):
     """
     Parses the given string and returns an AST tree based on the classes in ast/*.py.
     code_type is the ebnf rule to start from (e.g., 'expr' or 'cairo_file').
+    If use_parse_cache is True, the lark tree of the code is taken from (or added to) a cache
+    keyed by the code and code_type. The AST is built from the tree on each call, so the returned
+    objects are never shared between calls.
     """
     input_file = InputFile(filename=filename, content=code)
     parser_transformer = ParserTransformer(input_file, parser_context=parser_context)
 
-    parser = gram_parser.parse_interactive(code, start=code_type)
-    parser_state = parser.parser_state
     try:
-        token = None
-        for token in parser.lexer_state.lex(parser_state):
-            old_state_stack = list(parser_state.state_stack)
-            old_value_stack = list(parser_state.value_stack)
-            parser.feed_token(token)
-        old_state_stack = list(parser_state.state_stack)
-        old_value_stack = list(parser_state.value_stack)
-        tree = parser.feed_eof(last_token=token)
-    except UnexpectedToken as err:
-        # Restore the old state stack.
-        parser_state.state_stack = old_state_stack
-        parser_state.value_stack = old_value_stack
-        err.interactive_parser = parser
-        raise wrap_lark_error(err, input_file) from None
+        tree = (
+            parse_to_cached_tree(code=code, code_type=code_type)
+            if use_parse_cache
+            else parse_to_tree(code=code, code_type=code_type)
+        )
     except LarkError as err:
         raise wrap_lark_error(err, input_file) from None
 
@@ -220,6 +218,52 @@ def parse(
     return parsed
 
 
+def parse_to_tree(code: str, code_type: str) -> lark.Tree:
+    """
+    Runs the lark parser on the given code and returns the lark tree.
+    Raises the LarkError of the parser on failure. For UnexpectedToken errors, err.interactive_parser
+    is set to the state of the parser before the unexpected token was fed.
+    """
+    parser = gram_parser.parse_interactive(code, start=code_type)
+    # The number of tokens that were fed to the parser successfully.
+    n_tokens = 0
+    try:
+        token = None
+        for token in parser.lexer_state.lex(parser.parser_state):
+            parser.feed_token(token)
+            n_tokens += 1
+        return parser.feed_eof(last_token=token)
+    except UnexpectedToken as err:
+        # The parser may have performed reductions before it failed on the token, so its state
+        # stack is no longer the one that was used to look the token up. Since the lexer does not
+        # depend on the parser state, the state is reconstructed by feeding the same tokens again.
+        # This is done only on failure, so that the successful path does not copy the parser stacks
+        # for every token.
+        err.interactive_parser = get_parser_before_token(
+            code=code, code_type=code_type, n_tokens=n_tokens
+        )
+        raise
+
+
+def get_parser_before_token(code: str, code_type: str, n_tokens: int):
+    """
+    Returns an interactive lark parser that was fed with the first n_tokens tokens of the code.
+    """
+    parser = gram_parser.parse_interactive(code, start=code_type)
+    for token in itertools.islice(parser.lexer_state.lex(parser.parser_state), n_tokens):
+        parser.feed_token(token)
+    return parser
+
+
+@lru_cache(PARSE_CACHE_SIZE)
+def parse_to_cached_tree(code: str, code_type: str) -> lark.Tree:
+    """
+    A cached version of parse_to_tree(). Lark trees are not modified by ParserTransformer, so they
+    may be shared between calls. Failures are not cached.
+    """
+    return parse_to_tree(code=code, code_type=code_type)
+
+
 def lex(code: str) -> List[lark.lexer.Token]:
     """
     Runs the lexer on the given code and returns the lark-parser tokens.
@@ -232,11 +276,20 @@ def parse_file(
 ) -> CairoFile:
     """
     Parses the given string and returns a CairoFile instance.
+    The parse trees of files are cached (see parse()), as the same library files are parsed again
+    for each compiled program.
     """
     # If code does not end with '\n', add it.
     if not code.endswith("\n"):
         code += "\n"
-    return parse(filename, code, "cairo_file", CairoFile, parser_context=parser_context)
+    return parse(
+        filename,
+        code,
+        "cairo_file",
+        CairoFile,
+        parser_context=parser_context,
+        use_parse_cache=True,
+    )
 
 
 def parse_instruction(code: str) -> InstructionAst:
@@ -38,7 +38,9 @@ from starkware.cairo.lang.compiler.parser import (
     parse,
     parse_code_element,
     parse_expr,
+    parse_file,
     parse_instruction,
+    parse_to_cached_tree,
     parse_type,
 )
 from starkware.cairo.lang.compiler.parser_test_utils import verify_exception
@@ -829,3 +831,28 @@ def test_pointer():
         exprs.append(exprs[-1].pointee)
     for expr, mark in safe_zip(exprs, marks):
         assert get_location_marks(code, expr.location) == code + "\n" + mark
+
+
+def test_parse_file_cache():
+    code = """\
+func foo(x) -> (y):
+    return (y=x + 1)
+end
+"""
+    misses_before = parse_to_cached_tree.cache_info().misses
+    file1 = parse_file(code, filename="a.cairo")
+    file2 = parse_file(code, filename="b.cairo")
+    assert parse_to_cached_tree.cache_info().misses == misses_before + 1
+
+    # The ASTs are equal, but are not shared, and refer to their own files.
+    assert file1.format() == file2.format()
+    assert file1.code_block is not file2.code_block
+    func1 = file1.code_block.code_elements[0].code_elm
+    func2 = file2.code_block.code_elements[0].code_elm
+    assert func1.identifier.location.input_file.filename == "a.cairo"
+    assert func2.identifier.location.input_file.filename == "b.cairo"
+
+    # Syntax errors are reported on each call.
+    for _ in range(2):
+        with pytest.raises(ParserError, match="Unexpected token"):
+            parse_file("func foo(:\nend\n")
@@ -2,6 +2,7 @@ from typing import Callable, Dict, Optional, Sequence, Set, Tuple, Type
 
 from starkware.cairo.lang.compiler.ast.module import CairoModule
 from starkware.cairo.lang.compiler.import_loader import collect_imports
+from starkware.cairo.lang.compiler.module_cache import ModuleCache
 from starkware.cairo.lang.compiler.preprocessor.auxiliary_info_collector import (
     AuxiliaryInfoCollector,
 )
@@ -28,9 +29,12 @@ def default_pass_manager(
     auxiliary_info_cls: Optional[Type[AuxiliaryInfoCollector]] = None,
     preprocessor_kwargs: Optional[Dict] = None,
     additional_scopes_to_compile: Optional[Set[ScopedName]] = None,
+    module_cache: Optional[ModuleCache] = None,
 ) -> PassManager:
     manager = PassManager()
-    manager.add_stage("module_collector", ModuleCollector(read_module=read_module))
+    manager.add_stage(
+        "module_collector", ModuleCollector(read_module=read_module, module_cache=module_cache)
+    )
     manager.add_stage(
         "unique_label_creator", VisitorStage(lambda context: UniqueLabelCreator(), modify_ast=True)
     )
@@ -96,15 +100,23 @@ class ModuleCollector(Stage):
         self,
         read_module: Callable[[str], Tuple[str, str]],
         additional_modules: Optional[Sequence[str]] = None,
+        module_cache: Optional[ModuleCache] = None,
     ):
+        """
+        If module_cache is given, the parsed modules are taken from (and added to) it. Only the
+        parsing is cached: the later stages depend on the entire program.
+        """
         self.read_module = read_module
         self.additional_modules = [] if additional_modules is None else list(additional_modules)
+        self.module_cache = module_cache
 
     def run(self, context: PassManagerContext):
         visited_modules = set()
 
         for additional_module in self.additional_modules:
-            files = collect_imports(additional_module, read_file=self.read_module)
+            files = collect_imports(
+                additional_module, read_file=self.read_module, module_cache=self.module_cache
+            )
             for module_name, ast in files.items():
                 if module_name in visited_modules:
                     continue
@@ -118,7 +130,9 @@ class ModuleCollector(Stage):
             def read_file_fixed(name):
                 return (code, filename) if name == filename else self.read_module(name)
 
-            files = collect_imports(filename, read_file=read_file_fixed)
+            files = collect_imports(
+                filename, read_file=read_file_fixed, module_cache=self.module_cache
+            )
             for module_name, ast in files.items():
                 # Check if the module is one of the files given in 'context.codes'.
                 is_main_scope = module_name == filename
@@ -8,14 +8,101 @@ protoc --proto_path src/starkware/cairo/lang/tracer/third_party/
 
 import gzip
 import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 from starkware.cairo.lang.compiler.debug_info import InstructionLocation
 from starkware.cairo.lang.compiler.identifier_definition import LabelDefinition
+from starkware.cairo.lang.compiler.program import Program
 from starkware.cairo.lang.tracer.third_party.profile_pb2 import Profile
 from starkware.cairo.lang.tracer.tracer_data import TracerData
+from starkware.cairo.lang.vm.relocatable import MaybeRelocatable
 from starkware.cairo.lang.vm.trace_entry import TraceEntry
 
 
+class ShadowCallStack:
+    """
+    Keeps the call stack of a run (the return pcs along the fp chain, as in
+    ProfileBuilder.get_call_stack()), and updates it incrementally as fp changes.
+
+    A call (a new fp whose saved fp is the current fp) pushes a frame and a return (going back to
+    the fp of the caller) pops one, so the memory is read only on calls. Other changes of fp
+    rebuild the stack by walking the fp chain.
+    Each distinct stack is interned as a node of a tree of return pcs, so that the current stack is
+    identified by an int (self.node) without copying it.
+    """
+
+    # The node of the empty stack.
+    ROOT = 0
+
+    def __init__(self, initial_fp: MaybeRelocatable, memory):
+        self.initial_fp = initial_fp
+        self.memory = memory
+        self.fp = initial_fp
+        # The (parent node, return pc) of each node, and the node of each (parent node, return pc).
+        self._nodes: List[Tuple[int, Optional[MaybeRelocatable]]] = [(-1, None)]
+        self._node_ids: Dict[Tuple[int, MaybeRelocatable], int] = {}
+        # The fps of the frames of the current stack (outermost first), and the nodes of the
+        # prefixes of the current stack (self._node_stack[i] is the node of the first i frames).
+        self._frame_fps: List[MaybeRelocatable] = []
+        self._node_stack: List[int] = [self.ROOT]
+
+    @property
+    def node(self) -> int:
+        return self._node_stack[-1]
+
+    def update(self, fp: MaybeRelocatable):
+        """
+        Updates the stack to the given fp.
+        """
+        if fp == self.fp:
+            return
+
+        if not fp > self.initial_fp:
+            del self._frame_fps[:]
+            del self._node_stack[1:]
+        elif len(self._frame_fps) >= 2 and fp == self._frame_fps[-2]:
+            # Return.
+            self._frame_fps.pop()
+            self._node_stack.pop()
+        elif self.memory[fp - 2] == self.fp:
+            # Call.
+            self._push(fp=fp, return_pc=self.memory[fp - 1])
+        else:
+            self._rebuild(fp)
+        self.fp = fp
+
+    def _push(self, fp: MaybeRelocatable, return_pc: MaybeRelocatable):
+        key = (self.node, return_pc)
+        node = self._node_ids.get(key)
+        if node is None:
+            node = self._node_ids[key] = len(self._nodes)
+            self._nodes.append(key)
+        self._frame_fps.append(fp)
+        self._node_stack.append(node)
+
+    def _rebuild(self, fp: MaybeRelocatable):
+        frames = []
+        while fp > self.initial_fp:
+            frames.append((fp, self.memory[fp - 1]))
+            fp = self.memory[fp - 2]
+        del self._frame_fps[:]
+        del self._node_stack[1:]
+        for frame_fp, return_pc in reversed(frames):
+            self._push(fp=frame_fp, return_pc=return_pc)
+
+    def get_call_stack(self, node: int, pc: MaybeRelocatable) -> List[MaybeRelocatable]:
+        """
+        Returns the call stack pc values (innermost first) of the stack of the given node, when
+        the current pc is pc.
+        """
+        frame_pcs = [pc]
+        while node != self.ROOT:
+            node, return_pc = self._nodes[node]
+            assert return_pc is not None, "Only the root node has no return pc."
+            frame_pcs.append(return_pc)
+        return frame_pcs
+
+
 class ProfileBuilder:
     """
     Builds a profile protobuf from trace samples of a specific run.
@@ -25,24 +112,38 @@ class ProfileBuilder:
 
     initial_fp - First fp in the program.
     memory - memory object of the run.
+    relocate_value - a function applied to the pcs of the samples (see add_sample()) to get the pcs
+      of the locations. By default, the pcs are used as is.
+
+    Samples with the same call stack are aggregated into a single weighted sample, which is added
+    to the profile on dump().
     """
 
-    def __init__(self, initial_fp, memory):
+    def __init__(
+        self,
+        initial_fp,
+        memory,
+        relocate_value: Optional[Callable[[MaybeRelocatable], int]] = None,
+    ):
         self._profile = Profile()
         # A map from a string to its id in the string table.
-        self._string_to_id = {}
+        self._string_to_id: Dict[str, int] = {}
         # First string in the table must be ''.
         self.string_id("")
         # A map from a filename to its id in the mapping table.
-        self._filename_to_mapping_id = {}
+        self._filename_to_mapping_id: Dict[str, int] = {}
         # A map from a function name to its id in the function table.
         # Current implementation uses the string id of the function name as a function id.
-        self._func_name_to_id = {}
+        self._func_name_to_id: Dict[str, int] = {}
         # A map from a pc value to the location id at that pc.
-        self._pc_to_location_id = {}
+        self._pc_to_location_id: Dict[int, int] = {}
 
         self.initial_fp = initial_fp
         self.memory = memory
+        self.relocate_value = relocate_value
+        self.call_stack = ShadowCallStack(initial_fp=initial_fp, memory=memory)
+        # The number of steps of each (call stack node, pc) that were not added to the profile yet.
+        self._sample_counts: Dict[Tuple[int, MaybeRelocatable], int] = {}
 
         # Global fields.
         sample_type = self._profile.sample_type.add()
@@ -144,48 +245,101 @@ class ProfileBuilder:
 
     def add_sample(self, trace_entry: TraceEntry):
         """
-        Adds a sample to the profile.
+        Adds a sample (of one step) to the profile.
+        The samples must be added in the order of the run. They may be added while the run is in
+        progress (e.g., with unrelocated values, see relocate_value), as only the memory cells of
+        the frames that were already entered are read.
+        """
+        self.call_stack.update(trace_entry.fp)
+        key = (self.call_stack.node, trace_entry.pc)
+        self._sample_counts[key] = self._sample_counts.get(key, 0) + 1
+
+    def _flush_samples(self):
+        """
+        Adds the aggregated samples to the profile.
         """
-        frame_pcs = self.get_call_stack(fp=trace_entry.fp, pc=trace_entry.pc)
-        sample = self._profile.sample.add()
-        for pc in frame_pcs:
-            sample.location_id.append(self._pc_to_location_id[pc])
-        sample.value.append(1)  # 1 step.
+        for (node, pc), n_steps in self._sample_counts.items():
+            frame_pcs = self.call_stack.get_call_stack(node=node, pc=pc)
+            if self.relocate_value is not None:
+                frame_pcs = [self.relocate_value(frame_pc) for frame_pc in frame_pcs]
+            sample = self._profile.sample.add()
+            for frame_pc in frame_pcs:
+                sample.location_id.append(self._pc_to_location_id[frame_pc])
+            sample.value.append(n_steps)
+        self._sample_counts = {}
 
     def dump(self) -> bytes:
         """
         Dumps the current profile. Returns the serialized bytes.
         """
+        self._flush_samples()
         data = self._profile.SerializeToString()
         return gzip.compress(data)
 
 
-def profile_from_tracer_data(tracer_data: TracerData):
+def add_program_to_profile(
+    builder: ProfileBuilder, program: Program, get_pc_from_offset: Callable[[int], int]
+):
     """
-    Computes the profile file data given a TracerData instance.
-    Can be read by pprof.
+    Adds the functions and locations of the program to the profile.
     """
-    builder = ProfileBuilder(initial_fp=tracer_data.trace[0].fp, memory=tracer_data.memory)
+    assert program.debug_info is not None
 
     # Functions.
-    identifiers_dict = tracer_data.program.identifiers.as_dict()
-    assert tracer_data.program.debug_info is not None
+    identifiers_dict = program.identifiers.as_dict()
     for name, ident in identifiers_dict.items():
         if not isinstance(ident, LabelDefinition):
             continue
         builder.function_id(
             name=str(name),
-            inst_location=tracer_data.program.debug_info.instruction_locations[ident.pc],
+            inst_location=program.debug_info.instruction_locations[ident.pc],
         )
 
     # Locations.
-    for pc_offset, inst_location in tracer_data.program.debug_info.instruction_locations.items():
-        builder.location_id(
-            pc=tracer_data.get_pc_from_offset(pc_offset), inst_location=inst_location
-        )
+    for pc_offset, inst_location in program.debug_info.instruction_locations.items():
+        builder.location_id(pc=get_pc_from_offset(pc_offset), inst_location=inst_location)
+
+
+def profile_from_tracer_data(tracer_data: TracerData):
+    """
+    Computes the profile file data given a TracerData instance.
+    Can be read by pprof.
+    """
+    builder = ProfileBuilder(initial_fp=tracer_data.trace[0].fp, memory=tracer_data.memory)
+    add_program_to_profile(
+        builder=builder,
+        program=tracer_data.program,
+        get_pc_from_offset=tracer_data.get_pc_from_offset,
+    )
 
     # Samples.
     for trace_entry in tracer_data.trace:
         builder.add_sample(trace_entry)
 
     return builder.dump()
+
+
+def profile_from_runner(runner) -> bytes:
+    """
+    Computes the profile file data of the run of the given CairoRunner, from its (unrelocated)
+    trace and memory, without writing them to files.
+    runner.relocate() must be called first (the locations use relocated pcs).
+    Can be read by pprof.
+    """
+    assert isinstance(runner.program, Program), "Profiling requires a program with debug info."
+    builder = ProfileBuilder(
+        initial_fp=runner.vm.trace[0].fp,
+        memory=runner.vm_memory,
+        relocate_value=runner.relocate_value,
+    )
+    program_base = runner.relocate_value(runner.program_base)
+    add_program_to_profile(
+        builder=builder,
+        program=runner.program,
+        get_pc_from_offset=lambda pc_offset: program_base + pc_offset,
+    )
+
+    for trace_entry in runner.vm.trace:
+        builder.add_sample(trace_entry)
+
+    return builder.dump()
@@ -0,0 +1,78 @@
+import gzip
+from collections import Counter
+
+from starkware.cairo.lang.compiler.cairo_compile import compile_cairo
+from starkware.cairo.lang.tracer.profile import (
+    ProfileBuilder,
+    profile_from_runner,
+    profile_from_tracer_data,
+)
+from starkware.cairo.lang.tracer.third_party.profile_pb2 import Profile
+from starkware.cairo.lang.tracer.tracer_data import TracerData
+from starkware.cairo.lang.vm.cairo_runner import CairoRunner
+
+PRIME = 2 ** 251 + 17 * 2 ** 192 + 1
+
+CODE = """
+func fib(n) -> (res):
+    alloc_locals
+    if n == 0:
+        return (res=1)
+    end
+    if n == 1:
+        return (res=1)
+    end
+    let (local a) = fib(n - 1)
+    let (b) = fib(n - 2)
+    return (res=a + b)
+end
+
+func main():
+    fib(5)
+    fib(3)
+    ret
+end
+"""
+
+
+def get_stack_counts(data: bytes) -> Counter:
+    """
+    Returns the number of steps of each call stack (a tuple of location ids) in the given profile.
+    """
+    profile = Profile()
+    profile.ParseFromString(gzip.decompress(data))
+    counts: Counter = Counter()
+    for sample in profile.sample:
+        counts[tuple(sample.location_id)] += sample.value[0]
+    return counts
+
+
+def test_profile():
+    program = compile_cairo(code=CODE, prime=PRIME, debug_info=True)
+    runner = CairoRunner(program, layout="plain")
+    runner.initialize_segments()
+    end = runner.initialize_main_entrypoint()
+    runner.initialize_vm(hint_locals={})
+    runner.run_until_pc(end)
+    runner.end_run()
+    runner.relocate()
+
+    tracer_data = TracerData(
+        program=program,
+        memory=runner.relocated_memory,
+        trace=runner.relocated_trace,
+        program_base=runner.relocate_value(runner.program_base),
+    )
+    # Compute the expected call stacks by walking the fp chain at each step.
+    builder = ProfileBuilder(initial_fp=tracer_data.trace[0].fp, memory=tracer_data.memory)
+    expected_counts = Counter(
+        tuple(pc + 1 for pc in builder.get_call_stack(fp=entry.fp, pc=entry.pc))
+        for entry in tracer_data.trace
+    )
+    assert max(len(stack) for stack in expected_counts) > 3
+
+    tracer_data_counts = get_stack_counts(profile_from_tracer_data(tracer_data))
+    assert tracer_data_counts == expected_counts
+    # Samples with the same call stack are aggregated.
+    assert sum(tracer_data_counts.values()) == len(tracer_data.trace)
+    assert get_stack_counts(profile_from_runner(runner)) == expected_counts
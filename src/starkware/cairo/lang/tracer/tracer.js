@@ -3,9 +3,19 @@
 */
 var current_step;
 
-var trace;
+/*
+  The number of steps in the trace, and the number of steps in each page of the trace.
+*/
+var n_steps;
+var page_size;
+
+/*
+  The loaded pages of the trace. Maps a page index to a list of objects
+  {pc: ..., ap: ..., fp: ..., dst: ..., op0: ..., op1: ...} where dst, op0 and op1 are the
+  addresses of the memory accesses of the step.
+*/
+var trace_pages = {};
 var memory;
-var memory_accesses;
 
 /*
   A list of objects {watch_expr: ..., watch_result: ...} where watch_expr is the <input> element
@@ -20,9 +30,9 @@ const MAX_STACK_TRACE = 100;
 
 function load_json() {
     $.getJSON('data.json', function (data) {
-        trace = data.trace;
+        n_steps = data.n_steps;
+        page_size = data.page_size;
         memory = data.memory;
-        memory_accesses = data.memory_accesses;
         for (const filename in data.code) {
             $('#code_div')
                 .append($('<div>').addClass('filename').text(filename))
@@ -47,7 +57,7 @@ function create_slider() {
         id: 'slider',
         type: 'range',
         min: 0,
-        max: trace.length - 1,
+        max: n_steps - 1,
         value: 0,
     });
 
@@ -80,8 +90,15 @@ function mark_public_memory(public_memory) {
     }
 }
 
+/*
+  Returns the trace entry of the given step. The page of the step must be loaded.
+*/
+function get_entry(step) {
+    return trace_pages[Math.floor(step / page_size)][step % page_size];
+}
+
 function update_current_instruction_view() {
-    const entry = trace[current_step];
+    const entry = get_entry(current_step);
     const pc = entry.pc;
     const ap = entry.ap;
     const fp = entry.fp;
@@ -92,10 +109,9 @@ function update_current_instruction_view() {
     $('#ap').text(ap);
     $('#fp').text(fp);
 
-    const mem_accesses = memory_accesses[current_step];
-    $('#dst_addr').text(mem_accesses.dst);
-    $('#op0_addr').text(mem_accesses.op0);
-    $('#op1_addr').text(mem_accesses.op1);
+    $('#dst_addr').text(entry.dst);
+    $('#op0_addr').text(entry.op0);
+    $('#op1_addr').text(entry.op1);
 
     $('.mem_row').removeClass('current_pc_mem');
     $('#mem_row' + pc).addClass('current_pc_mem');
@@ -159,8 +175,8 @@ function getScrollParent(node) {
 }
 
 function update_stack_trace_view() {
-    const entry = trace[current_step];
-    const initial_fp = trace[0].fp;
+    const entry = get_entry(current_step);
+    const initial_fp = get_entry(0).fp;
 
     $('.mem_row').css('border-top', '');
 
@@ -268,21 +284,61 @@ function toggle_breakpoint(event) {
     event.stopPropagation();
 }
 
-function has_breakpoint(step) {
-    return $('.inst' + trace[step].pc).hasClass('breakpoint') ||
-        $('#mem_row' + memory_accesses[step].dst).hasClass('breakpoint') ||
-        $('#mem_row' + memory_accesses[step].op0).hasClass('breakpoint') ||
-        $('#mem_row' + memory_accesses[step].op1).hasClass('breakpoint');
+/*
+  Returns the pcs of the instructions and the addresses of the memory cells that have breakpoints.
+*/
+function get_breakpoints() {
+    const pcs = [];
+    $('.instruction.breakpoint').each(function () {
+        for (const class_name of this.classList) {
+            const match = class_name.match(/^inst(\d+)$/);
+            if (match !== null) {
+                pcs.push(match[1]);
+            }
+        }
+    });
+    const addrs = $('.mem_row.breakpoint').map(function () {
+        return this.id.substring('mem_row'.length);
+    }).get();
+    return { pc: pcs, addr: addrs };
+}
+
+/*
+  Goes to the first step from start (inclusive) to end (exclusive, may be smaller than start), in
+  which fp is one of fps, or which has a breakpoint (if use_breakpoints is true).
+  The search is done by the server, so that the entire trace does not have to be loaded.
+*/
+function find_step(start, end, fps, use_breakpoints) {
+    const query = { start: start, end: end, fp: fps };
+    if (use_breakpoints) {
+        Object.assign(query, get_breakpoints());
+    }
+    $.getJSON('find_step.json?' + $.param(query, true), function (data) {
+        if (data.step !== null) {
+            goto_step(data.step);
+        }
+    });
 }
 
 function goto_step(i) {
+    const page = Math.floor(i / page_size);
+    if (!(page in trace_pages) || !(0 in trace_pages)) {
+        // Load the page of the step (and the first page, for the initial fp) first.
+        const missing_page = page in trace_pages ? 0 : page;
+        $.getJSON('trace.json?start=' + missing_page * page_size, function (data) {
+            trace_pages[missing_page] = data.trace;
+            goto_step(i);
+        });
+        return;
+    }
+
     // Update global variable.
     current_step = i;
     update_current_instruction_view();
 }
 
 function step() {
-    if (current_step < trace.length - 1) {
+    if (current_step < n_steps - 1) {
         goto_step(current_step + 1);
     }
 }
@@ -294,53 +350,30 @@ function previous_step() {
 }
 
 function step_over() {
-    const current_fp = trace[current_step].fp;
-    for (var i = current_step + 1; i < trace.length; i++) {
-        if (trace[i].fp == current_fp || has_breakpoint(i)) {
-            goto_step(i);
-            return;
-        }
-    }
+    const current_fp = get_entry(current_step).fp;
+    find_step(current_step + 1, n_steps, [current_fp], true);
 }
 
 function previous_step_over() {
-    const current_fp = trace[current_step].fp;
-    for (var i = current_step - 1; i >= 0; i--) {
-        if (trace[i].fp == current_fp) {
-            goto_step(i);
-            return;
-        }
-    }
+    const current_fp = get_entry(current_step).fp;
+    find_step(current_step - 1, -1, [current_fp], false);
 }
 
 function step_out() {
-    const current_fp = trace[current_step].fp;
+    const current_fp = get_entry(current_step).fp;
     const previous_fp = memory[current_fp - 2];
-    for (var i = current_step + 1; i < trace.length; i++) {
-        if (trace[i].fp == previous_fp) {
-            goto_step(i);
-            return;
-        }
+    if (previous_fp === undefined) {
+        return;
     }
+    find_step(current_step + 1, n_steps, [previous_fp], false);
 }
 
 function next_breakpoint() {
-    for (var i = current_step + 1; i < trace.length; i++) {
-        if (has_breakpoint(i)) {
-            goto_step(i);
-            return;
-        }
-    }
+    find_step(current_step + 1, n_steps, [], true);
 }
 
 function previous_breakpoint() {
-    const current_fp = trace[current_step].fp;
-    for (var i = current_step - 1; i >= 0; i--) {
-        if (has_breakpoint(i)) {
-            goto_step(i);
-            return;
-        }
-    }
+    find_step(current_step - 1, -1, [], true);
 }
 
 $(document).ready(function () {
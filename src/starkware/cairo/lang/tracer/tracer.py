@@ -11,6 +11,9 @@ import urllib.parse
 
 from starkware.cairo.lang.tracer.tracer_data import TracerData, WatchEvaluator, field_element_repr
 
+# The number of steps in each page of the trace sent to the browser.
+TRACE_PAGE_SIZE = 1000
+
 
 def trace_runner(runner):
     runner.vm_memory.relocate_memory()
@@ -42,12 +45,31 @@ class SimpleTCPServer(socketserver.TCPServer):
 
 
 def run_tracer(tracer_data: TracerData):
-    # Change directory for the SimpleHTTPRequestHandler.
-    os.chdir(os.path.abspath(os.path.dirname(__file__)))
+    # The source files, converted to HTML on the first request.
+    code_html = None
+
+    def get_code_html():
+        nonlocal code_html
+        if code_html is None:
+            code_html = {
+                filename: input_file.to_html()
+                for filename, input_file in tracer_data.input_files.items()
+            }
+        return code_html
 
     # Create a simple web server which allows loading *.js files and other static file as well as
-    # a dynamically generated data.json file which is loaded using AJAX.
+    # dynamically generated json files which are loaded using AJAX:
+    #   data.json - the source code, the memory and the number of steps.
+    #   trace.json?start=... - a page of the trace, with the memory accesses of each step.
+    #   find_step.json?start=...&end=...[&fp=...][&pc=...][&addr=...] - the first step in the range
+    #     (see TracerData.find_step()).
+    #   eval.json?step=...&expr=... - the values of watch expressions.
     class Handler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            # Serve the static files from the directory of this file, without changing the working
+            # directory (which is needed to read the source files).
+            super().__init__(*args, directory=os.path.abspath(os.path.dirname(__file__)), **kwargs)
+
         def do_GET(self):
             parsed_path = urllib.parse.urlparse(self.path)
             query = urllib.parse.parse_qs(parsed_path.query)
@@ -55,22 +77,40 @@ def run_tracer(tracer_data: TracerData):
                 # Create the returned json file.
                 self.write_json(
                     {
-                        "code": {
-                            filename: input_file.to_html()
-                            for filename, input_file in tracer_data.input_files.items()
-                        },
-                        "trace": [
-                            {"pc": entry.pc, "ap": entry.ap, "fp": entry.fp}
-                            for entry in tracer_data.trace
-                        ],
+                        "code": get_code_html(),
+                        "n_steps": len(tracer_data.trace),
+                        "page_size": TRACE_PAGE_SIZE,
                         "memory": {
                             addr: field_element_repr(val, tracer_data.program.prime)
                             for addr, val in tracer_data.memory.items()
                         },
                         "public_memory": tracer_data.public_memory,
-                        "memory_accesses": tracer_data.memory_accesses,
                     }
                 )
+            elif parsed_path.path == "/trace.json":
+                start = int(query["start"][0])
+                steps = range(start, min(start + TRACE_PAGE_SIZE, len(tracer_data.trace)))
+                self.write_json(
+                    {
+                        "start": start,
+                        "trace": [
+                            {"pc": entry.pc, "ap": entry.ap, "fp": entry.fp, **memory_accesses}
+                            for entry, memory_accesses in zip(
+                                tracer_data.trace[steps.start : steps.stop],
+                                tracer_data.memory_accesses[steps.start : steps.stop],
+                            )
+                        ],
+                    }
+                )
+            elif parsed_path.path == "/find_step.json":
+                step = tracer_data.find_step(
+                    start=int(query["start"][0]),
+                    end=int(query["end"][0]),
+                    fps=[int(fp) for fp in query.get("fp", [])],
+                    pcs=[int(pc) for pc in query.get("pc", [])],
+                    addresses=[int(addr) for addr in query.get("addr", [])],
+                )
+                self.write_json({"step": step})
             elif parsed_path.path == "/eval.json":
                 evaluator = WatchEvaluator(
                     tracer_data, entry=tracer_data.trace[int(query["step"][0])]
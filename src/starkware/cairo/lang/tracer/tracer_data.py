@@ -1,7 +1,12 @@
 import dataclasses
 import json
 import math
-from typing import Dict, List, Optional
+import mmap
+import os
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union, cast
+
+import numpy as np
 
 from starkware.cairo.lang.compiler.ast.cairo_types import TypeStruct
 from starkware.cairo.lang.compiler.ast.expr import ExprConst, ExprIdentifier
@@ -9,6 +14,7 @@ from starkware.cairo.lang.compiler.debug_info import DebugInfo
 from starkware.cairo.lang.compiler.encode import decode_instruction
 from starkware.cairo.lang.compiler.expression_evaluator import ExpressionEvaluator
 from starkware.cairo.lang.compiler.identifier_definition import ConstDefinition, ReferenceDefinition
+from starkware.cairo.lang.compiler.instruction import Instruction
 from starkware.cairo.lang.compiler.offset_reference import OffsetReferenceDefinition
 from starkware.cairo.lang.compiler.parser import parse_expr
 from starkware.cairo.lang.compiler.program import Program
@@ -21,8 +27,14 @@ from starkware.cairo.lang.compiler.scoped_name import ScopedName
 from starkware.cairo.lang.compiler.substitute_identifiers import substitute_identifiers
 from starkware.cairo.lang.compiler.type_system_visitor import simplify_type_system
 from starkware.cairo.lang.vm.air_public_input import PublicInput
-from starkware.cairo.lang.vm.memory_dict import MemoryDict
+from starkware.cairo.lang.vm.memory_dict import (
+    InconsistentMemoryError,
+    MemoryDict,
+    deserialize_values,
+    read_memory_pairs,
+)
 from starkware.cairo.lang.vm.memory_segments import FIRST_MEMORY_ADDR as PROGRAM_BASE
+from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, RelocatableValue
 from starkware.cairo.lang.vm.trace_entry import TraceEntry
 from starkware.cairo.lang.vm.vm import RunContext
 
@@ -52,6 +64,8 @@ class InputCodeFile:
     def __init__(self, content):
         self.content = content
         self.lines = self.content.splitlines()
+        # The sum of the lengths of the first i lines, for each i.
+        self.line_length_sums = [0, *accumulate(map(len, self.lines))]
         self.marks: List[TextMark] = []
         # A list of tuples (offset, -size, tag) where offset is the position of the beginning of
         # the tag and size is the size of the content. size is negative to allow sorting the tags
@@ -75,33 +89,163 @@ class InputCodeFile:
             )
         )
 
-        # Find the offset of (line_start, col_start) inside the file, by computing the sum of the
-        # lengths of the previous lines and adding col_start. Note that '\n's are not counted in
-        # the sum, so we add line_start to the result. We have to subtract 2 since both
-        # line_start and col_start are 1-based rather than 0-based.
-        offset_start = sum(map(len, self.lines[: line_start - 1])) + line_start + col_start - 2
-        # Do the same for (line_end, col_end).
-        offset_end = sum(map(len, self.lines[: line_end - 1])) + line_end + col_end - 2
+        offset_start = self.get_offset(line=line_start, col=col_start)
+        offset_end = self.get_offset(line=line_end, col=col_end)
         self.tags.append((offset_start, -offset_end, f'<span class="{" ".join(classes)}">'))
         self.tags.append((offset_end, -float("inf"), "</span>"))
 
+    def get_offset(self, line: int, col: int) -> int:
+        """
+        Returns the offset of (line, col) inside the file, by computing the sum of the lengths of
+        the previous lines and adding col. Note that '\n's are not counted in the sum, so we add
+        line to the result. We have to subtract 2 since both line and col are 1-based rather than
+        0-based.
+        """
+        n_previous_lines = min(line - 1, len(self.lines))
+        return self.line_length_sums[n_previous_lines] + line + col - 2
+
     def to_html(self):
         """
         Returns the content of the file with the added HTML tags.
         Replaces spaces with '&nbsp;' and '\n' with '<br/>'.
         """
-        res = self.content.replace(" ", "\0")
-        for pos, size, tag_content in sorted(self.tags, reverse=True):
-            res = res[:pos] + tag_content + res[pos:]
-        return res.replace("\0", "&nbsp;").replace("\n", "<br/>\n")
+        content = self.content.replace(" ", "\0")
+        parts = []
+        prev_pos = 0
+        # Tags at the same position are written in increasing order.
+        for pos, size, tag_content in sorted(self.tags):
+            parts.append(content[prev_pos:pos])
+            parts.append(tag_content)
+            prev_pos = pos
+        parts.append(content[prev_pos:])
+        return "".join(parts).replace("\0", "&nbsp;").replace("\n", "<br/>\n")
+
+
+class MappedTrace(Sequence[TraceEntry[int]]):
+    """
+    A read-only relocated trace, backed by the output of TraceEntry.serialize() (e.g., a
+    memory-mapped trace file). Entries are deserialized only when accessed.
+    """
+
+    ENTRY_DTYPE = np.dtype([("ap", "<u8"), ("fp", "<u8"), ("pc", "<u8")])
+
+    def __init__(self, data):
+        assert len(data) % TraceEntry.serialization_size() == 0, "Size of trace file is invalid."
+        self.entries = np.frombuffer(data, dtype=self.ENTRY_DTYPE)
+
+    @classmethod
+    def from_file(cls, trace_path: str) -> "MappedTrace":
+        return cls(data=map_file(trace_path))
+
+    def get_column(self, register: str) -> np.ndarray:
+        """
+        Returns the values of the given register ("pc", "ap" or "fp") in all the steps.
+        """
+        return self.entries[register]
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        ap, fp, pc = self.entries[index].tolist()
+        return TraceEntry(pc=pc, ap=ap, fp=fp)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class MappedMemory(Mapping[int, MaybeRelocatable]):
+    """
+    A read-only relocated memory (where the addresses are ints), backed by the output of
+    MemoryDict.serialize() (e.g., a memory-mapped memory file). The addresses are indexed on
+    construction, and the values are deserialized only when accessed.
+    """
+
+    def __init__(self, data, field_bytes: int):
+        self.pairs = read_memory_pairs(data=data, field_bytes=field_bytes)
+        addresses = np.ascontiguousarray(self.pairs["addr"]).view("<u8")[:, 0]
+        assert not (addresses >> 63).any(), "The memory addresses must be relocated."
+        # The rows of the pairs, sorted by address, and the sorted addresses.
+        self.rows = np.argsort(addresses, kind="stable")
+        self.addresses = addresses[self.rows]
+
+        # Verify that memory cells are consistent.
+        for i in np.flatnonzero(self.addresses[1:] == self.addresses[:-1]).tolist():
+            old_value, new_value = (self._get_value(row) for row in self.rows[i : i + 2].tolist())
+            if old_value != new_value:
+                raise InconsistentMemoryError(int(self.addresses[i]), old_value, new_value)
+
+    @classmethod
+    def from_file(cls, memory_path: str, field_bytes: int) -> "MappedMemory":
+        return cls(data=map_file(memory_path), field_bytes=field_bytes)
+
+    def _get_row(self, addr) -> Optional[int]:
+        """
+        Returns the row of the pair of the given address, or None if the address is not set.
+        """
+        if not isinstance(addr, int) or not 0 <= addr < 2 ** 63:
+            return None
+        index = int(np.searchsorted(self.addresses, addr))
+        if index == len(self.addresses) or self.addresses[index] != addr:
+            return None
+        return int(self.rows[index])
+
+    def _get_value(self, row: int) -> MaybeRelocatable:
+        return RelocatableValue.from_bytes(self.pairs["value"][row].tobytes(), "little")
+
+    def __getitem__(self, addr) -> MaybeRelocatable:
+        row = self._get_row(addr)
+        if row is None:
+            raise KeyError(addr)
+        return self._get_value(row)
+
+    def __contains__(self, addr) -> bool:
+        return self._get_row(addr) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.addresses.tolist())
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def items(self) -> Iterator[Tuple[int, MaybeRelocatable]]:  # type: ignore
+        """
+        Returns the memory cells, ordered by address. The values are deserialized at once.
+        """
+        return zip(self.addresses.tolist(), deserialize_values(self.pairs["value"][self.rows]))
+
+
+class LazyMemoryAccesses(Sequence[Dict[str, int]]):
+    """
+    The memory accesses of each step of a trace (see TracerData.get_memory_accesses()), computed
+    only when accessed.
+    """
+
+    def __init__(self, tracer_data: "TracerData"):
+        self.tracer_data = tracer_data
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self.tracer_data.get_memory_accesses(step=index)
+
+    def __len__(self) -> int:
+        return len(self.tracer_data.trace)
 
 
 class TracerData:
+    """
+    The data of a run, as shown by the tracer.
+    Everything that is computed per step (memory accesses and identifier values) is computed only
+    when requested, so that a large trace may be given as a MappedTrace and a MappedMemory.
+    """
+
     def __init__(
         self,
         program: Program,
-        memory: MemoryDict,
-        trace: List[TraceEntry],
+        memory: Union[MemoryDict, MappedMemory],
+        trace: Sequence[TraceEntry],
         program_base: int,
         air_public_input: Optional[PublicInput] = None,
         debug_info: Optional[DebugInfo] = None,
@@ -112,6 +256,9 @@ class TracerData:
         """
         self.program = program
         self.memory = memory
+        # RunContext is only used to decode instructions and compute operand addresses, which only
+        # read the memory, so a MappedMemory may be used in place of a MemoryDict.
+        self._run_context_memory = cast(MemoryDict, memory)
         self.trace = trace
         self.program_base = program_base
         self.debug_info = debug_info if debug_info is not None else program.debug_info
@@ -122,8 +269,25 @@ class TracerData:
         else:
             self.public_memory = []
 
-        self.input_files: Dict[str, InputCodeFile] = {}
+        # The annotated source files (see input_files), the decoded instruction at each pc, the
+        # values of each register in all the steps and the pc to steps index.
+        self._input_files: Optional[Dict[str, InputCodeFile]] = None
+        self._instructions: Dict[int, Instruction] = {}
+        self._trace_columns: Dict[str, np.ndarray] = {}
+        self._pc_index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        self.memory_accesses = LazyMemoryAccesses(tracer_data=self)
+
+    @property
+    def input_files(self) -> Dict[str, InputCodeFile]:
+        """
+        The source files of the program, where each instruction is surrounded by a <span> tag.
+        Computed on the first access.
+        """
+        if self._input_files is not None:
+            return self._input_files
 
+        self._input_files = {}
         if self.debug_info is not None:
             # Process each instruction in the program and surround it by a <span> tag.
             for pc_offset, instruction_location in self.debug_info.instruction_locations.items():
@@ -131,9 +295,9 @@ class TracerData:
                 filename = loc.input_file.filename
                 assert filename is not None
                 # If filename was not loaded yet, create a new InputCodeFile instance.
-                if filename not in self.input_files:
-                    self.input_files[filename] = InputCodeFile(loc.input_file.get_content())
-                input_file = self.input_files[filename]
+                if filename not in self._input_files:
+                    self._input_files[filename] = InputCodeFile(loc.input_file.get_content())
+                input_file = self._input_files[filename]
 
                 # Surround the instruction code with a <span> tag.
                 input_file.mark_text(
@@ -143,24 +307,122 @@ class TracerData:
                     loc.end_col,
                     [f"inst{pc_offset}", "instruction"],
                 )
+        return self._input_files
 
-        # Find memory accesses for each step.
-        self.memory_accesses = []
-        for trace_entry in self.trace:
+    def get_instruction(self, pc: int) -> Instruction:
+        """
+        Returns the decoded instruction at the given pc.
+        """
+        instruction = self._instructions.get(pc)
+        if instruction is None:
             run_context = RunContext(
-                pc=trace_entry.pc,
-                ap=trace_entry.ap,
-                fp=trace_entry.fp,
-                memory=self.memory,
-                prime=self.program.prime,
+                pc=pc, ap=0, fp=0, memory=self._run_context_memory, prime=self.program.prime
             )
-            instruction_encoding, imm = run_context.get_instruction_encoding()
-            instruction = decode_instruction(instruction_encoding, imm)
+            instruction = self._instructions[pc] = decode_instruction(
+                *run_context.get_instruction_encoding()
+            )
+        return instruction
 
-            dst_addr = run_context.compute_dst_addr(instruction)
-            op0_addr = run_context.compute_op0_addr(instruction)
-            op1_addr = run_context.compute_op1_addr(instruction, self.memory.get(op0_addr))
-            self.memory_accesses.append({"dst": dst_addr, "op0": op0_addr, "op1": op1_addr})
+    def get_memory_accesses(self, step: int) -> Dict[str, int]:
+        """
+        Returns the addresses of the memory cells accessed by the instruction of the given step,
+        as a dict with the keys "dst", "op0" and "op1".
+        """
+        trace_entry = self.trace[step]
+        run_context = RunContext(
+            pc=trace_entry.pc,
+            ap=trace_entry.ap,
+            fp=trace_entry.fp,
+            memory=self._run_context_memory,
+            prime=self.program.prime,
+        )
+        instruction = self.get_instruction(trace_entry.pc)
+        dst_addr = run_context.compute_dst_addr(instruction)
+        op0_addr = run_context.compute_op0_addr(instruction)
+        op1_addr = run_context.compute_op1_addr(instruction, self.memory.get(op0_addr))
+        return {"dst": dst_addr, "op0": op0_addr, "op1": op1_addr}
+
+    def get_trace_column(self, register: str) -> np.ndarray:
+        """
+        Returns the values of the given register ("pc", "ap" or "fp") in all the steps.
+        """
+        if isinstance(self.trace, MappedTrace):
+            return self.trace.get_column(register)
+        column = self._trace_columns.get(register)
+        if column is None:
+            column = self._trace_columns[register] = np.fromiter(
+                (getattr(entry, register) for entry in self.trace),
+                dtype=np.uint64,
+                count=len(self.trace),
+            )
+        return column
+
+    def get_steps_by_pc(self, pc: int) -> np.ndarray:
+        """
+        Returns the steps in which the given pc was executed, in increasing order.
+        """
+        if self._pc_index is None:
+            pcs = self.get_trace_column("pc")
+            steps = np.argsort(pcs, kind="stable")
+            self._pc_index = (pcs[steps], steps)
+        sorted_pcs, steps = self._pc_index
+        if not 0 <= pc < 2 ** 64:
+            return steps[:0]
+        start = np.searchsorted(sorted_pcs, pc, side="left")
+        end = np.searchsorted(sorted_pcs, pc, side="right")
+        return steps[start:end]
+
+    def find_step(
+        self,
+        start: int,
+        end: int,
+        fps: Iterable[int] = (),
+        pcs: Iterable[int] = (),
+        addresses: Iterable[int] = (),
+    ) -> Optional[int]:
+        """
+        Returns the first step from start (inclusive) to end (exclusive), going backwards if
+        end < start, in which fp is one of fps, pc is one of pcs or one of the memory accesses is in
+        addresses. Returns None if there is no such step.
+        """
+        start, end = max(min(start, len(self.trace)), -1), max(min(end, len(self.trace)), -1)
+        direction = 1 if end >= start else -1
+        # The steps in the direction of the search, and the step that was found so far.
+        steps = range(start, end, direction)
+        found: Optional[int] = None
+
+        def update(step: int):
+            nonlocal found, steps
+            if step in steps and (found is None or (step - found) * direction < 0):
+                found = step
+                steps = range(start, found, direction)
+
+        fps = list(fps)
+        if len(steps) > 0 and len(fps) > 0:
+            lo, hi = min(steps[0], steps[-1]), max(steps[0], steps[-1]) + 1
+            (matches,) = np.nonzero(np.isin(self.get_trace_column("fp")[lo:hi], fps))
+            if len(matches) > 0:
+                update(lo + int(matches[0] if direction == 1 else matches[-1]))
+
+        for pc in pcs:
+            pc_steps = self.get_steps_by_pc(pc)
+            if direction == 1:
+                index = int(np.searchsorted(pc_steps, start, side="left"))
+            else:
+                index = int(np.searchsorted(pc_steps, start, side="right")) - 1
+            if 0 <= index < len(pc_steps):
+                update(int(pc_steps[index]))
+
+        addresses = set(addresses)
+        if len(addresses) > 0:
+            # Memory accesses are not indexed, so the steps before the step that was found are
+            # scanned.
+            for step in steps:
+                if not addresses.isdisjoint(self.get_memory_accesses(step).values()):
+                    update(step)
+                    break
+
+        return found
 
     def get_pc_offset(self, pc: int) -> int:
         """
@@ -201,11 +463,13 @@ class TracerData:
     ):
         """
         Factory method constructing TracerData from files.
+        The trace and memory files are memory-mapped, rather than read (see MappedTrace and
+        MappedMemory).
         """
         program = Program.Schema().load(json.load(open(program_path)))
         field_bytes = math.ceil(program.prime.bit_length() / 8)
-        memory = read_memory(memory_path, field_bytes)
-        trace = read_trace(trace_path)
+        memory = MappedMemory.from_file(memory_path=memory_path, field_bytes=field_bytes)
+        trace = MappedTrace.from_file(trace_path=trace_path)
         program_base = PROGRAM_BASE
 
         # Read AIR public input, if available and extract public memory addresses.
@@ -231,6 +495,17 @@ class TracerData:
         )
 
 
+def map_file(path: str):
+    """
+    Returns the content of the given file as a read-only memory map.
+    """
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            # Empty files cannot be mapped.
+            return b""
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def read_memory(memory_path: str, field_bytes: int) -> MemoryDict:
     """
     Returns the memory (as a MemoryDict).
@@ -274,9 +549,14 @@ def field_element_repr(val: int, prime: int) -> str:
 
 
 class WatchEvaluator(ExpressionEvaluator):
+    ap: int
+
     def __init__(self, tracer_data: TracerData, entry: TraceEntry[int]):
         super().__init__(
-            prime=tracer_data.program.prime, ap=entry.ap, fp=entry.fp, memory=tracer_data.memory
+            prime=tracer_data.program.prime,
+            ap=entry.ap,
+            fp=entry.fp,
+            memory=cast(Mapping[int, int], tracer_data.memory),
         )
         self.tracer_data = tracer_data
         self.pc = entry.pc
@@ -1,7 +1,18 @@
+import json
+import math
+import os
+
 import pytest
 
 from starkware.cairo.lang.compiler.cairo_compile import Program, compile_cairo
-from starkware.cairo.lang.tracer.tracer_data import InputCodeFile, TracerData, WatchEvaluator
+from starkware.cairo.lang.tracer.tracer_data import (
+    InputCodeFile,
+    MappedMemory,
+    MappedTrace,
+    TracerData,
+    WatchEvaluator,
+)
+from starkware.cairo.lang.vm.cairo_run import write_binary_memory, write_binary_trace
 from starkware.cairo.lang.vm.cairo_runner import CairoRunner
 
 PRIME = 2 ** 251 + 17 * 2 ** 192 + 1
@@ -100,3 +111,103 @@ end
         "y": "3000",
         "__temp0": "1234",
     }
+
+
+def test_tracer_data_from_files(tmp_path):
+    code = """
+func foo(x) -> (y):
+    [ap] = x + 1; ap++
+    return (y=[ap - 1])
+end
+
+func loop(n):
+    if n == 0:
+        return ()
+    end
+    foo(n)
+    foo(n)
+    return loop(n - 1)
+end
+
+func main():
+    loop(3)
+    ret
+end
+"""
+    program: Program = compile_cairo(code=code, prime=PRIME, debug_info=True)
+    runner = CairoRunner(program, layout="plain")
+    runner.initialize_segments()
+    end = runner.initialize_main_entrypoint()
+    runner.initialize_vm(hint_locals={})
+    runner.run_until_pc(end)
+    runner.end_run()
+    runner.relocate()
+
+    program_path = os.path.join(tmp_path, "program.json")
+    trace_path = os.path.join(tmp_path, "trace.bin")
+    memory_path = os.path.join(tmp_path, "memory.bin")
+    with open(program_path, "w") as fp:
+        json.dump(Program.Schema().dump(program), fp)
+    with open(trace_path, "wb") as fp:
+        write_binary_trace(fp, runner.relocated_trace)
+    with open(memory_path, "wb") as fp:
+        write_binary_memory(fp, runner.relocated_memory, math.ceil(PRIME.bit_length() / 8))
+
+    tracer_data = TracerData(
+        program=program,
+        memory=runner.relocated_memory,
+        trace=runner.relocated_trace,
+        program_base=runner.relocate_value(runner.program_base),
+    )
+    mapped_tracer_data = TracerData.from_files(
+        program_path=program_path,
+        memory_path=memory_path,
+        trace_path=trace_path,
+        air_public_input=None,
+    )
+    trace, mapped_trace = tracer_data.trace, mapped_tracer_data.trace
+    assert isinstance(mapped_trace, MappedTrace)
+    assert isinstance(mapped_tracer_data.memory, MappedMemory)
+    n_steps = len(trace)
+    assert list(mapped_trace) == trace
+    assert mapped_trace[-1] == trace[-1]
+    assert mapped_trace[2:5] == trace[2:5]
+    assert dict(mapped_tracer_data.memory.items()) == dict(tracer_data.memory.items())
+    assert mapped_tracer_data.memory[trace[0].pc] == tracer_data.memory[trace[0].pc]
+    assert 0 not in mapped_tracer_data.memory
+    with pytest.raises(KeyError):
+        mapped_tracer_data.memory[0]
+    assert list(mapped_tracer_data.memory_accesses) == list(tracer_data.memory_accesses)
+
+    for data in (tracer_data, mapped_tracer_data):
+        for pc in {entry.pc for entry in trace} | {0}:
+            assert data.get_steps_by_pc(pc).tolist() == [
+                step for step, entry in enumerate(trace) if entry.pc == pc
+            ]
+
+        def expected_step(start, end, fps=(), pcs=(), addresses=()):
+            steps = range(start, end, 1 if end >= start else -1)
+            for step in steps:
+                accesses = data.memory_accesses[step].values()
+                if (
+                    trace[step].fp in fps
+                    or trace[step].pc in pcs
+                    or any(addr in addresses for addr in accesses)
+                ):
+                    return step
+            return None
+
+        foo_pc = trace[0].pc + program.get_label("foo")
+        initial_fp = trace[0].fp
+        accessed_addr = data.memory_accesses[n_steps // 2]["dst"]
+        for start, end in ((0, n_steps), (3, n_steps), (n_steps - 1, -1), (n_steps // 2, 2)):
+            for kwargs in (
+                {"fps": [initial_fp]},
+                {"pcs": [foo_pc]},
+                {"addresses": [accessed_addr]},
+                {"fps": [initial_fp + 3], "pcs": [foo_pc], "addresses": [accessed_addr]},
+                {},
+            ):
+                assert data.find_step(start=start, end=end, **kwargs) == expected_step(
+                    start=start, end=end, **kwargs
+                ), (start, end, kwargs)
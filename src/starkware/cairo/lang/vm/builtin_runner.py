@@ -242,9 +242,7 @@ class SimpleBuiltinRunner(BuiltinRunner):
 
     def run_security_checks(self, runner):
         offsets = {
-            addr.offset
-            for addr in runner.vm_memory.keys()
-            if isinstance(addr, RelocatableValue) and addr.segment_index == self.base.segment_index
+            offset for offset, _ in runner.vm_memory.get_segment_items(self.base.segment_index)
         }
         n = (max(offsets) // self.cells_per_instance + 1) if len(offsets) > 0 else 0
 
@@ -16,7 +16,7 @@ import marshmallow.fields as mfields
 import marshmallow_dataclass
 
 from starkware.cairo.lang.compiler.program import StrippedProgram, is_valid_builtin_name
-from starkware.cairo.lang.vm.memory_dict import MemoryDict
+from starkware.cairo.lang.vm.memory_dict import LazyMemoryDict, MemoryDict
 from starkware.cairo.lang.vm.relocatable import RelocatableValue
 from starkware.python.utils import add_counters, sub_counters
 
@@ -204,10 +204,13 @@ class CairoPie:
     MAX_SIZE = 1024 ** 3
 
     @classmethod
-    def from_file(cls, fileobj) -> "CairoPie":
+    def from_file(cls, fileobj, lazy_memory: bool = False) -> "CairoPie":
         """
         Loads an instance of CairoPie from a file.
         `fileobj` can be a path or a file object.
+        If lazy_memory is True, the memory is deserialized only when it is accessed (see
+        LazyMemoryDict), so the metadata, execution resources and additional data are available
+        without deserializing the memory.
         """
 
         if isinstance(fileobj, str):
@@ -223,10 +226,14 @@ class CairoPie:
                     json.loads(fp.read(cls.MAX_SIZE).decode("ascii"))
                 )
             with zf.open(cls.MEMORY_FILENAME, "r") as fp:
-                memory = MemoryDict.deserialize(
-                    data=fp.read(cls.MAX_SIZE),
-                    field_bytes=metadata.field_bytes,
+                memory_data = fp.read(cls.MAX_SIZE)
+            memory: MemoryDict
+            if lazy_memory:
+                memory = LazyMemoryDict(
+                    read_data=lambda: memory_data, field_bytes=metadata.field_bytes
                 )
+            else:
+                memory = MemoryDict.deserialize(data=memory_data, field_bytes=metadata.field_bytes)
             with zf.open(cls.ADDITIONAL_DATA_FILENAME, "r") as fp:
                 additional_data = json.loads(fp.read(cls.MAX_SIZE).decode("ascii"))
             with zf.open(cls.EXECUTION_RESOURCES_FILENAME, "r") as fp:
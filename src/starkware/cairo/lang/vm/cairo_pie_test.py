@@ -12,7 +12,7 @@ from starkware.cairo.lang.vm.cairo_pie import (
     SegmentInfo,
 )
 from starkware.cairo.lang.vm.cairo_runner import get_runner_from_code
-from starkware.cairo.lang.vm.memory_dict import MemoryDict
+from starkware.cairo.lang.vm.memory_dict import LazyMemoryDict, MemoryDict, UnknownMemoryError
 from starkware.cairo.lang.vm.relocatable import RelocatableValue
 from starkware.python.utils import add_counters
 
@@ -184,3 +184,35 @@ def test_add_execution_resources():
 
     assert total_execution_resources.builtin_instance_counter == total_builtin_instance_counter
     assert total_execution_resources.n_steps == total_steps
+
+
+def test_cairo_pie_lazy_memory(cairo_pie: CairoPie):
+    fileobj = io.BytesIO()
+    cairo_pie.to_file(fileobj)
+    lazy_cairo_pie = CairoPie.from_file(fileobj, lazy_memory=True)
+    assert isinstance(lazy_cairo_pie.memory, LazyMemoryDict)
+    assert lazy_cairo_pie.metadata == cairo_pie.metadata
+    assert lazy_cairo_pie.execution_resources == cairo_pie.execution_resources
+    assert not lazy_cairo_pie.memory.is_loaded()
+
+    # Reading a segment does not deserialize the entire memory.
+    program_segment = lazy_cairo_pie.metadata.program_segment
+    assert lazy_cairo_pie.get_segment(program_segment) == cairo_pie.get_segment(program_segment)
+    assert RelocatableValue(segment_index=program_segment.index, offset=0) in lazy_cairo_pie.memory
+    assert lazy_cairo_pie.memory.get(RelocatableValue(segment_index=100, offset=0)) is None
+    with pytest.raises(UnknownMemoryError):
+        lazy_cairo_pie.memory[RelocatableValue(segment_index=100, offset=0)]
+    assert not lazy_cairo_pie.memory.is_loaded()
+
+    assert lazy_cairo_pie == cairo_pie
+    assert lazy_cairo_pie.memory.is_loaded()
+    lazy_cairo_pie.run_validity_checks()
+
+
+def test_cairo_pie_lazy_memory_closed_file(cairo_pie: CairoPie):
+    fileobj = io.BytesIO()
+    cairo_pie.to_file(fileobj)
+    lazy_cairo_pie = CairoPie.from_file(fileobj, lazy_memory=True)
+    # The memory is read when the file is loaded, so it does not depend on the file afterwards.
+    fileobj.close()
+    assert lazy_cairo_pie == cairo_pie
@@ -6,20 +6,22 @@ import subprocess
 import sys
 import tempfile
 import time
-from typing import IO, Dict, List, Tuple
+from typing import IO, Dict, List, Tuple, Union
 
 import starkware.python.python_dependencies as python_dependencies
 from starkware.cairo.lang.compiler.debug_info import DebugInfo
 from starkware.cairo.lang.compiler.program import Program, ProgramBase
 from starkware.cairo.lang.instances import LAYOUTS
+from starkware.cairo.lang.tracer.profile import profile_from_runner
 from starkware.cairo.lang.version import __version__
 from starkware.cairo.lang.vm.air_public_input import PublicInput, PublicMemoryEntry
 from starkware.cairo.lang.vm.cairo_pie import CairoPie
 from starkware.cairo.lang.vm.cairo_runner import CairoRunner
 from starkware.cairo.lang.vm.crypto import get_crypto_lib_context_manager
 from starkware.cairo.lang.vm.memory_dict import MemoryDict
+from starkware.cairo.lang.vm.memory_dict_backend import MEMORY_DICT_BACKENDS
 from starkware.cairo.lang.vm.security import verify_secure_runner
-from starkware.cairo.lang.vm.trace_entry import TraceEntry
+from starkware.cairo.lang.vm.trace_entry import CompactRelocatedTrace, TraceEntry
 from starkware.cairo.lang.vm.utils import MemorySegmentAddresses, RunResources
 from starkware.cairo.lang.vm.vm_exceptions import VmException
 
@@ -114,6 +116,12 @@ def main():
         type=argparse.FileType("wb"),
         help="Output file name for the execution trace.",
     )
+    parser.add_argument(
+        "--compact_trace",
+        action="store_true",
+        help="Keep the execution trace in a compact array instead of a list of objects and write "
+        "it to --trace_file in large chunks. Reduces the memory usage of long runs.",
+    )
     parser.add_argument(
         "--run_from_cairo_pie",
         type=argparse.FileType("rb"),
@@ -146,6 +154,13 @@ def main():
         default="plain",
         help="The layout of the Cairo AIR.",
     )
+    parser.add_argument(
+        "--memory_backend",
+        choices=MEMORY_DICT_BACKENDS.keys(),
+        default="dict",
+        help="The data structure used to store the VM memory. 'segmented' keeps a list per "
+        "segment, which uses less memory for large runs.",
+    )
     parser.add_argument("--tracer", action="store_true", help="Run the tracer.")
     parser.add_argument(
         "--profile_output",
@@ -217,27 +232,27 @@ def load_program(program) -> ProgramBase:
 
 
 def cairo_run(args):
-    trace_needed = args.tracer or args.profile_output is not None
+    trace_needed = args.tracer
     trace_file = args.trace_file
     if trace_file is None and trace_needed:
-        # If --tracer or --profile_output is used, use a temporary file as trace_file.
+        # If --tracer is used, use a temporary file as trace_file.
         trace_file = tempfile.NamedTemporaryFile(mode="wb")
 
     memory_file = args.memory_file
     if memory_file is None and trace_needed:
-        # If --tracer or --profile_output is used, use a temporary file as memory_file.
+        # If --tracer is used, use a temporary file as memory_file.
         memory_file = tempfile.NamedTemporaryFile(mode="wb")
 
     debug_info_file = args.debug_info_file
     if debug_info_file is None and trace_needed:
-        # If --tracer or --profile_output is used, use a temporary file as debug_info_file.
+        # If --tracer is used, use a temporary file as debug_info_file.
         debug_info_file = tempfile.NamedTemporaryFile(mode="w")
 
     ret_code = 0
     cairo_pie_input = None
     if args.program is not None:
         program: ProgramBase = load_program(args.program)
-        initial_memory = MemoryDict()
+        initial_memory = MemoryDict(backend=MEMORY_DICT_BACKENDS[args.memory_backend])
         steps_input = args.steps
     else:
         assert args.run_from_cairo_pie is not None
@@ -264,6 +279,7 @@ def cairo_run(args):
         memory=initial_memory,
         proof_mode=args.proof_mode,
         allow_missing_builtins=args.proof_mode,
+        compact_trace=args.compact_trace,
     )
 
     runner.initialize_segments()
@@ -428,32 +444,22 @@ def cairo_run(args):
         )
 
     if args.profile_output is not None:
-        CAIRO_PROFILER = "starkware.cairo.lang.tracer.profiler"
-        subprocess.call(
-            list(
-                filter(
-                    None,
-                    [
-                        sys.executable,
-                        "-m",
-                        CAIRO_PROFILER,
-                        f"--program={args.program.name}",
-                        f"--trace={trace_file.name}",
-                        f"--memory={memory_file.name}",
-                        f"--air_public_input={args.air_public_input.name}"
-                        if args.air_public_input
-                        else None,
-                        f"--debug_info={debug_info_file.name}",
-                        f"--profile_output={args.profile_output}",
-                    ],
-                )
-            )
-        )
+        # The profile is computed from the trace and memory of the runner, so there is no need to
+        # write them to files and load them back.
+        with open(args.profile_output, "wb") as fp:
+            fp.write(profile_from_runner(runner))
 
     return ret_code
 
 
-def write_binary_trace(trace_file: IO[bytes], trace: List[TraceEntry[int]]):
+def write_binary_trace(
+    trace_file: IO[bytes], trace: Union[List[TraceEntry[int]], CompactRelocatedTrace]
+):
+    if isinstance(trace, CompactRelocatedTrace):
+        trace.write(trace_file)
+        trace_file.flush()
+        return
+
     for trace_entry in trace:
         trace_file.write(trace_entry.serialize())
     trace_file.flush()
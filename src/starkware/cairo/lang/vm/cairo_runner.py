@@ -29,7 +29,7 @@ from starkware.cairo.lang.vm.memory_dict import MemoryDict
 from starkware.cairo.lang.vm.memory_segments import MemorySegmentManager
 from starkware.cairo.lang.vm.output_builtin_runner import OutputBuiltinRunner
 from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, RelocatableValue, relocate_value
-from starkware.cairo.lang.vm.trace_entry import relocate_trace
+from starkware.cairo.lang.vm.trace_entry import CompactTrace, relocate_trace
 from starkware.cairo.lang.vm.utils import MemorySegmentAddresses, ResourcesError, RunResources
 from starkware.cairo.lang.vm.vm import RunContext, VirtualMachine, get_perm_range_check_limits
 from starkware.crypto.signature.signature import inv_mod_curve_size
@@ -66,11 +66,17 @@ class CairoRunner:
         memory: MemoryDict = None,
         proof_mode: Optional[bool] = None,
         allow_missing_builtins: Optional[bool] = None,
+        compact_trace: bool = False,
     ):
+        """
+        compact_trace - if True, the VM trace is kept in a CompactTrace instead of a list of
+          TraceEntry objects, which reduces the memory usage of long runs.
+        """
         self.program = program
         self.layout = layout
         self.builtin_runners: Dict[str, BuiltinRunner] = {}
         self.original_steps = None
+        self.compact_trace = compact_trace
         self.proof_mode = False if proof_mode is None else proof_mode
         self.allow_missing_builtins = (
             False if allow_missing_builtins is None else allow_missing_builtins
@@ -258,6 +264,8 @@ class CairoRunner:
             builtin_runners=self.builtin_runners,
             program_base=self.program_base,
         )
+        if self.compact_trace:
+            self.vm.trace = CompactTrace()  # type: ignore
 
         for builtin_runner in self.builtin_runners.values():
             builtin_runner.add_validation_rules(self)
@@ -429,7 +437,12 @@ class CairoRunner:
         }
 
     def get_perm_range_check_limits(self):
-        rc_min, rc_max = get_perm_range_check_limits(self.vm.trace, self.vm_memory)
+        instruction_offset_limits = self.vm.get_instruction_offset_limits()
+        rc_min, rc_max = (
+            get_perm_range_check_limits(self.vm.trace, self.vm_memory)
+            if instruction_offset_limits is None
+            else instruction_offset_limits
+        )
         for builtin_runner in self.builtin_runners.values():
             range_check_usage = builtin_runner.get_range_check_usage(self)
             if range_check_usage is None:
@@ -2,6 +2,8 @@ import contextlib
 
 from starkware.crypto.signature.fast_pedersen_hash import pedersen_hash  # noqa
 from starkware.crypto.signature.fast_pedersen_hash import pedersen_hash_func  # noqa
+from starkware.crypto.signature.fast_pedersen_hash import pedersen_hash_func_many  # noqa
+from starkware.crypto.signature.fast_pedersen_hash import pedersen_hash_many  # noqa
 from starkware.crypto.signature.signature import verify as verify_ecdsa  # noqa
 
 
@@ -1,4 +1,6 @@
-from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type, Union, cast
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union, cast
+
+import numpy as np
 
 from starkware.cairo.lang.vm.memory_dict_backend import MemoryDictBackend
 from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, RelocatableValue
@@ -49,6 +51,7 @@ class MemoryDict:
             values = []
         elif isinstance(values, dict):
             values = values.items()
+        self.backend = backend
         self.data = backend(values)
 
         self._frozen: bool = False
@@ -57,6 +60,9 @@ class MemoryDict:
         # See add_relocation_rule for more details.
         self.relocation_rules: Dict[int, RelocatableValue] = {}
 
+        # The cells of each segment, built once the memory is frozen (see get_segment_items()).
+        self._segment_items: Optional[Dict[int, List[Tuple[int, MaybeRelocatable]]]] = None
+
     def get(
         self, addr, default_value: Optional[MaybeRelocatable] = None
     ) -> Optional[MaybeRelocatable]:
@@ -68,6 +74,36 @@ class MemoryDict:
     def keys(self):
         return self.data.keys()
 
+    def get_segment_items(self, segment_index: int) -> Sequence[Tuple[int, MaybeRelocatable]]:
+        """
+        Returns the (offset, value) pairs of the cells of the given segment, ordered by offset.
+        As in items(), the values are not relocated.
+
+        Once the memory is frozen, the cells of all the segments are indexed in a single pass over
+        the memory (on the first call), so that, e.g., each builtin runner may go over the cells of
+        its own segment without scanning the entire memory.
+        The returned sequence must not be modified.
+        """
+        if hasattr(self.data, "get_segment_items"):
+            # The backend keeps the cells by segment.
+            return self.data.get_segment_items(segment_index)
+
+        if not self._frozen:
+            return self._build_segment_items().get(segment_index, [])
+
+        if self._segment_items is None:
+            self._segment_items = self._build_segment_items()
+        return self._segment_items.get(segment_index, [])
+
+    def _build_segment_items(self) -> Dict[int, List[Tuple[int, MaybeRelocatable]]]:
+        segment_items: Dict[int, List[Tuple[int, MaybeRelocatable]]] = {}
+        for addr, value in self.items():
+            if isinstance(addr, RelocatableValue):
+                segment_items.setdefault(addr.segment_index, []).append((addr.offset, value))
+        for items in segment_items.values():
+            items.sort(key=lambda item: item[0])
+        return segment_items
+
     def __iter__(self):
         return iter(self.data)
 
@@ -137,6 +173,7 @@ class MemoryDict:
         This function should only be used in tests.
         """
         self._frozen = False
+        self._segment_items = None
 
     def is_frozen(self) -> bool:
         return self._frozen
@@ -169,9 +206,9 @@ class MemoryDict:
         if len(self.relocation_rules) == 0:
             return
 
-        self.data = {
-            self.relocate_value(addr): self.relocate_value(value) for addr, value in self.items()
-        }
+        self.data = self.backend(
+            (self.relocate_value(addr), self.relocate_value(value)) for addr, value in self.items()
+        )
         self.relocation_rules = {}
 
     def __getitem__(self, addr: MaybeRelocatable) -> MaybeRelocatable:
@@ -211,17 +248,29 @@ class MemoryDict:
         This function should only be used in tests.
         """
         self.data[addr] = value
+        self._segment_items = None
 
     def serialize(self, field_bytes):
         assert (
             len(self.relocation_rules) == 0
         ), "Cannot serialize a MemoryDict with active segment relocation rules."
 
-        return b"".join(
-            RelocatableValue.to_bytes(addr, ADDR_SIZE_IN_BYTES, "little")
-            + RelocatableValue.to_bytes(value, field_bytes, "little")
-            for addr, value in self.items()
-        )
+        addresses: List[MaybeRelocatable] = []
+        values: List[MaybeRelocatable] = []
+        for addr, value in self.items():
+            addresses.append(addr)
+            values.append(value)
+
+        # Serialize all the addresses and all the values at once, and interleave them using a
+        # structured array.
+        pairs = np.empty(len(addresses), dtype=memory_pair_dtype(field_bytes))
+        pairs["addr"] = np.frombuffer(
+            serialize_values(addresses, ADDR_SIZE_IN_BYTES), dtype=np.uint8
+        ).reshape(len(addresses), ADDR_SIZE_IN_BYTES)
+        pairs["value"] = np.frombuffer(
+            serialize_values(values, field_bytes), dtype=np.uint8
+        ).reshape(len(values), field_bytes)
+        return pairs.tobytes()
 
     def get_range(self, addr, size) -> List[MaybeRelocatable]:
         return [self[addr + i] for i in range(size)]
@@ -237,17 +286,174 @@ class MemoryDict:
 
     @classmethod
     def deserialize(cls, data, field_bytes):
-        pair_size = ADDR_SIZE_IN_BYTES + field_bytes
-        assert (
-            len(data) % (pair_size) == 0
-        ), f"Data must consist of pairs of address (8 bytes) and value ({field_bytes} bytes)."
-        pair_stream = (
-            data[pair_size * i : pair_size * (i + 1)] for i in range(len(data) // pair_size)
-        )
-        return cls(
-            (
-                RelocatableValue.from_bytes(pair[:ADDR_SIZE_IN_BYTES], "little"),
-                RelocatableValue.from_bytes(pair[ADDR_SIZE_IN_BYTES:], "little"),
+        pairs = read_memory_pairs(data=data, field_bytes=field_bytes)
+        return cls(zip(deserialize_values(pairs["addr"]), deserialize_values(pairs["value"])))
+
+
+class LazyMemoryDict(MemoryDict):
+    """
+    A MemoryDict that is deserialized from the output of MemoryDict.serialize() only when needed.
+    Reading a cell (using getitem, get or in) deserializes only the cells of its segment.
+    Any other operation (e.g., writing, iterating or comparing) deserializes the entire memory.
+    """
+
+    # The segment index used for cells whose address is not a RelocatableValue.
+    NON_RELOCATABLE_SEGMENT = -1
+
+    def __init__(self, read_data: Callable[[], bytes], field_bytes: int, backend=MemoryDictBackend):
+        """
+        read_data - a function returning the serialized memory. Called at most once.
+        """
+        super().__init__(backend=backend)
+        # The entire memory, once deserialized.
+        self._data = None
+        self._read_data = read_data
+        self._field_bytes = field_bytes
+        # The serialized (address, value) pairs, and the segment index of each pair.
+        self._pairs: Optional[np.ndarray] = None
+        self._pair_segment_indices: Optional[np.ndarray] = None
+        # The deserialized cells of each segment (see _get_segment_cells()).
+        self._segment_cells: Dict[int, Dict[MaybeRelocatable, MaybeRelocatable]] = {}
+
+    @property  # type: ignore
+    def data(self):
+        if self._data is None:
+            pairs = self._get_pairs()
+            self._data = self.backend(
+                zip(deserialize_values(pairs["addr"]), deserialize_values(pairs["value"]))
+            )
+            # The partial data is no longer needed.
+            self._pairs = self._pair_segment_indices = None
+            self._segment_cells = {}
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    def _get_pairs(self) -> np.ndarray:
+        if self._pairs is None:
+            self._pairs = read_memory_pairs(data=self._read_data(), field_bytes=self._field_bytes)
+            # Compute the segment indices of all the addresses at once (see
+            # RelocatableValue.to_bytes()).
+            addresses = np.ascontiguousarray(self._pairs["addr"]).view("<u8")[:, 0]
+            segment_indices = (addresses >> RelocatableValue.OFFSET_BITS) & (
+                2 ** RelocatableValue.SEGMENT_BITS - 1
             )
-            for pair in pair_stream
+            self._pair_segment_indices = np.where(
+                addresses >> 63 == 1, segment_indices.astype(np.int64), self.NON_RELOCATABLE_SEGMENT
+            )
+        return self._pairs
+
+    def _get_segment_cells(self, addr) -> Dict[MaybeRelocatable, MaybeRelocatable]:
+        """
+        Returns the deserialized cells of the segment of addr.
+        """
+        segment_index = (
+            addr.segment_index
+            if isinstance(addr, RelocatableValue)
+            else self.NON_RELOCATABLE_SEGMENT
         )
+        cells = self._segment_cells.get(segment_index)
+        if cells is None:
+            pairs = self._get_pairs()
+            rows = np.flatnonzero(self._pair_segment_indices == segment_index)
+            cells = self._segment_cells[segment_index] = dict(
+                zip(
+                    deserialize_values(pairs["addr"][rows]),
+                    deserialize_values(pairs["value"][rows]),
+                )
+            )
+        return cells
+
+    def is_loaded(self) -> bool:
+        """
+        Returns True if the entire memory was deserialized.
+        """
+        return self._data is not None
+
+    def get(
+        self, addr, default_value: Optional[MaybeRelocatable] = None
+    ) -> Optional[MaybeRelocatable]:
+        if self.is_loaded():
+            return super().get(addr, default_value)
+        return self.relocate_value(self._get_segment_cells(addr).get(addr, default_value))
+
+    def __contains__(self, addr):
+        if self.is_loaded():
+            return super().__contains__(addr)
+        return addr in self._get_segment_cells(addr)
+
+    def __getitem__(self, addr: MaybeRelocatable) -> MaybeRelocatable:
+        if self.is_loaded():
+            return super().__getitem__(addr)
+        self._check_element(addr, "Memory address", KeyError)
+        try:
+            value = self._get_segment_cells(addr)[addr]
+        except KeyError:
+            raise UnknownMemoryError(addr) from None
+
+        return self.relocate_value(value)
+
+
+def read_memory_pairs(data, field_bytes: int) -> np.ndarray:
+    """
+    Returns a structured array (see memory_pair_dtype()) of the (address, value) pairs in the
+    output of MemoryDict.serialize().
+    """
+    pair_size = ADDR_SIZE_IN_BYTES + field_bytes
+    assert (
+        len(data) % (pair_size) == 0
+    ), f"Data must consist of pairs of address (8 bytes) and value ({field_bytes} bytes)."
+    return np.frombuffer(data, dtype=memory_pair_dtype(field_bytes))
+
+
+def memory_pair_dtype(field_bytes: int) -> np.dtype:
+    """
+    Returns the NumPy dtype of a serialized (address, value) memory pair.
+    """
+    return np.dtype(
+        [("addr", np.uint8, (ADDR_SIZE_IN_BYTES,)), ("value", np.uint8, (field_bytes,))]
+    )
+
+
+def serialize_values(values: Sequence[MaybeRelocatable], n_bytes: int) -> bytes:
+    """
+    Returns the concatenation of RelocatableValue.to_bytes(value, n_bytes, "little") for the given
+    values.
+    """
+    # Check the bound of the int values once, so that each value is serialized by its own
+    # to_bytes() method, without going through RelocatableValue.to_bytes().
+    int_bound = 2 ** (8 * n_bytes - 1)
+    assert all(value < int_bound for value in values if isinstance(value, int))
+    return b"".join(value.to_bytes(n_bytes, "little") for value in values)
+
+
+def deserialize_values(data: np.ndarray) -> List[MaybeRelocatable]:
+    """
+    Given an array of shape (n_values, n_bytes) of serialized values (see serialize_values()),
+    returns the list of values. Equivalent to calling RelocatableValue.from_bytes() on each row.
+    """
+    n_values, n_bytes = data.shape
+    n_limbs = -(-n_bytes // 8)
+    # Split each value to little-endian 64-bit limbs.
+    padded_data = np.zeros((n_values, 8 * n_limbs), dtype=np.uint8)
+    padded_data[:, :n_bytes] = data
+    limbs = padded_data.view("<u8")
+
+    nums = limbs[:, 0].astype(object)
+    for i in range(1, n_limbs):
+        nums += limbs[:, i].astype(object) << (64 * i)
+    values = nums.tolist()
+
+    # The most significant bit marks relocatable values. Since SEGMENT_BITS + OFFSET_BITS < 64,
+    # the segment index and the offset are in the lowest limb.
+    is_relocatable = data[:, n_bytes - 1] >> 7 == 1
+    if is_relocatable.any():
+        offsets = (limbs[:, 0] & (2 ** RelocatableValue.OFFSET_BITS - 1)).tolist()
+        segment_indices = (
+            (limbs[:, 0] >> RelocatableValue.OFFSET_BITS) & (2 ** RelocatableValue.SEGMENT_BITS - 1)
+        ).tolist()
+        for i in np.flatnonzero(is_relocatable).tolist():
+            values[i] = RelocatableValue(segment_index=segment_indices[i], offset=offsets[i])
+    return values
@@ -1 +1,182 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, RelocatableValue
+
 MemoryDictBackend = dict
+
+
+class SegmentedMemoryDictBackend:
+    """
+    A MemoryDict backend that keeps the cells of each segment in a list indexed by the offset,
+    instead of a dict keyed by RelocatableValue objects.
+
+    Cells of non-temporary segments are stored in self.segments[segment_index] and cells of
+    temporary segments (negative segment indices) are stored in
+    self.temp_segments[-segment_index - 1]. Unset cells are represented by None.
+    Addresses that are not RelocatableValues (e.g., relocated int addresses), as well as cells that
+    are too far from the end of their segment, are kept in a regular dict (self.sparse).
+    """
+
+    # The maximal number of holes that may be added to a segment list by a single write.
+    # Farther cells are stored in self.sparse.
+    MAX_GAP = 2 ** 16
+
+    def __init__(self, values: Iterable[Tuple[MaybeRelocatable, MaybeRelocatable]] = ()):
+        self.segments: List[List[Optional[MaybeRelocatable]]] = []
+        self.temp_segments: List[List[Optional[MaybeRelocatable]]] = []
+        self.sparse: Dict[MaybeRelocatable, MaybeRelocatable] = {}
+        # The number of cells stored in self.segments and self.temp_segments.
+        self.n_segment_cells = 0
+        for addr, value in values:
+            self[addr] = value
+
+    def _get_segment(
+        self, segment_index: int, create: bool = False
+    ) -> Optional[List[Optional[MaybeRelocatable]]]:
+        if segment_index >= 0:
+            segments, index = self.segments, segment_index
+        else:
+            segments, index = self.temp_segments, -segment_index - 1
+        if index >= len(segments):
+            if not create:
+                return None
+            segments.extend([] for _ in range(index + 1 - len(segments)))
+        return segments[index]
+
+    def _get_from_segment(self, addr: RelocatableValue) -> Optional[MaybeRelocatable]:
+        """
+        Returns the value stored in the segment lists for addr, or None if there is no such value.
+        """
+        segment_index = addr.segment_index
+        if segment_index >= 0:
+            segments, index = self.segments, segment_index
+        else:
+            segments, index = self.temp_segments, -segment_index - 1
+        if index >= len(segments):
+            return None
+        segment = segments[index]
+        offset = addr.offset
+        if not 0 <= offset < len(segment):
+            return None
+        return segment[offset]
+
+    def get(self, addr: Any, default: Any = None) -> Any:
+        if isinstance(addr, RelocatableValue):
+            value = self._get_from_segment(addr)
+            if value is not None:
+                return value
+        return self.sparse.get(addr, default)
+
+    def __getitem__(self, addr: Any) -> MaybeRelocatable:
+        if isinstance(addr, RelocatableValue):
+            value = self._get_from_segment(addr)
+            if value is not None:
+                return value
+        return self.sparse[addr]
+
+    def __contains__(self, addr: Any) -> bool:
+        if isinstance(addr, RelocatableValue) and self._get_from_segment(addr) is not None:
+            return True
+        return addr in self.sparse
+
+    def setdefault(self, addr: Any, value: MaybeRelocatable) -> MaybeRelocatable:
+        """
+        Writes value to addr if addr is not set, and returns the value stored at addr.
+        """
+        if not isinstance(addr, RelocatableValue) or addr.offset < 0:
+            return self.sparse.setdefault(addr, value)
+
+        segment = self._get_segment(addr.segment_index, create=True)
+        assert segment is not None
+        offset = addr.offset
+        if offset < len(segment):
+            current = segment[offset]
+            if current is not None:
+                return current
+        elif offset - len(segment) <= self.MAX_GAP:
+            segment.extend([None] * (offset + 1 - len(segment)))
+        else:
+            return self.sparse.setdefault(addr, value)
+
+        # The cell may have been written to self.sparse before the segment grew to cover it.
+        if len(self.sparse) > 0 and addr in self.sparse:
+            return self.sparse[addr]
+        segment[offset] = value
+        self.n_segment_cells += 1
+        return value
+
+    def __setitem__(self, addr: Any, value: MaybeRelocatable):
+        if isinstance(addr, RelocatableValue) and addr not in self.sparse:
+            segment = self._get_segment(addr.segment_index)
+            if segment is not None and 0 <= addr.offset < len(segment):
+                if segment[addr.offset] is None:
+                    self.n_segment_cells += 1
+                segment[addr.offset] = value
+            else:
+                # The cell is not set, so setdefault() writes the value.
+                self.setdefault(addr, value)
+            return
+        self.sparse[addr] = value
+
+    def get_segment_items(self, segment_index: int) -> List[Tuple[int, MaybeRelocatable]]:
+        """
+        Returns the (offset, value) pairs of the cells of the given segment, ordered by offset.
+        """
+        segment = self._get_segment(segment_index)
+        items = (
+            []
+            if segment is None
+            else [(offset, value) for offset, value in enumerate(segment) if value is not None]
+        )
+        if len(self.sparse) > 0:
+            sparse_items = [
+                (addr.offset, value)
+                for addr, value in self.sparse.items()
+                if isinstance(addr, RelocatableValue) and addr.segment_index == segment_index
+            ]
+            if len(sparse_items) > 0:
+                items = sorted(items + sparse_items, key=lambda item: item[0])
+        return items
+
+    def items(self) -> Iterator[Tuple[MaybeRelocatable, MaybeRelocatable]]:
+        """
+        Returns the stored cells, ordered by segment and offset (temporary segments last),
+        followed by the cells of self.sparse in insertion order.
+        """
+        for segment_indices, segments in (
+            (range(len(self.segments)), self.segments),
+            (range(-1, -len(self.temp_segments) - 1, -1), self.temp_segments),
+        ):
+            for segment_index, segment in zip(segment_indices, segments):
+                for offset, value in enumerate(segment):
+                    if value is not None:
+                        yield RelocatableValue(segment_index=segment_index, offset=offset), value
+        yield from self.sparse.items()
+
+    def keys(self) -> Iterator[MaybeRelocatable]:
+        return (addr for addr, _ in self.items())
+
+    def values(self) -> Iterator[MaybeRelocatable]:
+        return (value for _, value in self.items())
+
+    def __iter__(self) -> Iterator[MaybeRelocatable]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        return self.n_segment_cells + len(self.sparse)
+
+    def __eq__(self, other):
+        if isinstance(other, SegmentedMemoryDictBackend):
+            other = dict(other.items())
+        if not isinstance(other, dict):
+            return NotImplemented
+        return len(self) == len(other) and dict(self.items()) == other
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+MEMORY_DICT_BACKENDS = {
+    "dict": MemoryDictBackend,
+    "segmented": SegmentedMemoryDictBackend,
+}
@@ -1,3 +1,5 @@
+from typing import Dict
+
 import pytest
 
 from starkware.cairo.lang.vm.memory_dict import (
@@ -5,7 +7,8 @@ from starkware.cairo.lang.vm.memory_dict import (
     MemoryDict,
     UnknownMemoryError,
 )
-from starkware.cairo.lang.vm.relocatable import RelocatableValue
+from starkware.cairo.lang.vm.memory_dict_backend import SegmentedMemoryDictBackend
+from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, RelocatableValue
 
 
 def test_memory_dict_items():
@@ -158,3 +161,100 @@ def test_segment_relocation_failures():
         memory.add_relocation_rule(
             src_ptr=RelocatableValue(segment_index=-3, offset=0), dest_ptr=relocation_target
         )
+
+
+def test_segmented_backend():
+    memory = MemoryDict(backend=SegmentedMemoryDictBackend)
+    temp_segment = RelocatableValue(segment_index=-2, offset=0)
+    memory[RelocatableValue(segment_index=1, offset=3)] = 5
+    memory[RelocatableValue(segment_index=0, offset=0)] = temp_segment + 1
+    memory[temp_segment + 4] = 7
+    memory[12] = 13
+    # A cell which is too far from the end of its segment.
+    far_addr = RelocatableValue(segment_index=1, offset=SegmentedMemoryDictBackend.MAX_GAP + 10)
+    memory[far_addr] = 14
+
+    assert len(memory) == 5
+    assert memory[RelocatableValue(segment_index=1, offset=3)] == 5
+    assert memory[far_addr] == 14
+    assert RelocatableValue(segment_index=1, offset=2) not in memory
+    assert RelocatableValue(segment_index=5, offset=0) not in memory
+    assert memory.get(RelocatableValue(segment_index=-1, offset=0), "default") == "default"
+    assert memory.get(RelocatableValue(segment_index=1, offset=-2)) is None
+    with pytest.raises(UnknownMemoryError):
+        memory[RelocatableValue(segment_index=1, offset=4)]
+
+    # Check write-once semantics.
+    memory[RelocatableValue(segment_index=1, offset=3)] = 5
+    with pytest.raises(InconsistentMemoryError):
+        memory[RelocatableValue(segment_index=1, offset=3)] = 6
+    with pytest.raises(InconsistentMemoryError):
+        memory[far_addr] = 15
+
+    # Cells are ordered by segment and offset, with temporary segments last.
+    assert list(memory.items()) == [
+        (RelocatableValue(segment_index=0, offset=0), temp_segment + 1),
+        (RelocatableValue(segment_index=1, offset=3), 5),
+        (temp_segment + 4, 7),
+        (12, 13),
+        (far_addr, 14),
+    ]
+    assert memory == MemoryDict(dict(memory.items()))
+
+    relocation_target = RelocatableValue(segment_index=2, offset=10)
+    memory.add_relocation_rule(src_ptr=temp_segment, dest_ptr=relocation_target)
+    assert memory[RelocatableValue(segment_index=0, offset=0)] == relocation_target + 1
+    memory.relocate_memory()
+    assert isinstance(memory.data, SegmentedMemoryDictBackend)
+    assert memory[relocation_target + 4] == 7
+    assert temp_segment + 4 not in memory
+    assert len(memory) == 5
+
+
+@pytest.mark.parametrize("backend", [dict, SegmentedMemoryDictBackend])
+def test_get_segment_items(backend):
+    memory = MemoryDict(backend=backend)
+    far_offset = SegmentedMemoryDictBackend.MAX_GAP + 10
+    for segment_index, offset, value in [
+        (1, far_offset, 4),
+        (1, 3, 2),
+        (0, 0, 1),
+        (1, 0, 5),
+        (-1, 2, 6),
+    ]:
+        memory[RelocatableValue(segment_index=segment_index, offset=offset)] = value
+    memory[12] = 13
+
+    expected_items = [(0, 5), (3, 2), (far_offset, 4)]
+    assert list(memory.get_segment_items(1)) == expected_items
+    assert list(memory.get_segment_items(-1)) == [(2, 6)]
+    assert list(memory.get_segment_items(7)) == []
+
+    # Once frozen, the cells are indexed once.
+    memory.freeze()
+    assert list(memory.get_segment_items(1)) == expected_items
+
+    # Writes (which are only possible in tests) invalidate the index.
+    memory.set_without_checks(RelocatableValue(segment_index=1, offset=1), 7)
+    assert list(memory.get_segment_items(1)) == [(0, 5), (1, 7), (3, 2), (far_offset, 4)]
+
+
+@pytest.mark.parametrize("field_bytes", [8, 32])
+def test_memory_dict_serialize_relocatable(field_bytes: int):
+    values: Dict[MaybeRelocatable, MaybeRelocatable] = {
+        RelocatableValue(segment_index=0, offset=0): 2 ** (8 * field_bytes - 1) - 1,
+        RelocatableValue(segment_index=2, offset=7): RelocatableValue(segment_index=1, offset=5),
+        RelocatableValue(segment_index=3, offset=2 ** 40): 0,
+        12: RelocatableValue(segment_index=2 ** 16 - 1, offset=2 ** 47 - 1),
+    }
+    memory = MemoryDict(values)
+    serialized = memory.serialize(field_bytes)
+    assert serialized == b"".join(
+        addr.to_bytes(8, "little") + value.to_bytes(field_bytes, "little")
+        for addr, value in memory.items()
+    )
+    assert MemoryDict.deserialize(serialized, field_bytes) == memory
+    assert MemoryDict.deserialize(b"", field_bytes) == MemoryDict()
+
+    with pytest.raises(AssertionError):
+        MemoryDict([(1, 2 ** (8 * field_bytes - 1))]).serialize(field_bytes)
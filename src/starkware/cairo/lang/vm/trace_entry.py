@@ -1,8 +1,10 @@
 import dataclasses
 import struct
-from typing import Dict, Generic, List, TypeVar
+import sys
+from array import array
+from typing import IO, Dict, Generic, Iterable, Iterator, List, Sequence, Tuple, TypeVar, Union
 
-from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, relocate_value
+from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, RelocatableValue, relocate_value
 
 T = TypeVar("T", int, MaybeRelocatable)
 
@@ -47,12 +49,149 @@ class TraceEntry(Generic[T]):
         return 3 * 8
 
 
+class CompactTrace(Sequence[TraceEntry[MaybeRelocatable]]):
+    """
+    A memory efficient replacement for List[TraceEntry[MaybeRelocatable]].
+    Instead of keeping a TraceEntry object (and its register values) alive for every step,
+    each entry is stored as 6 signed 64-bit integers in an array:
+      [ pc.segment_index | pc.offset | ap.segment_index | ap.offset | fp.segment_index | fp.offset ]
+    Register values which are integers are stored with segment_index = INT_SEGMENT_INDEX.
+    """
+
+    INT_SEGMENT_INDEX = -(2 ** 63)
+    VALUES_PER_ENTRY = 6
+
+    def __init__(self, entries: Iterable[TraceEntry[MaybeRelocatable]] = ()):
+        self.data = array("q")
+        for entry in entries:
+            self.append(entry)
+
+    @classmethod
+    def _encode(cls, value: MaybeRelocatable) -> Tuple[int, int]:
+        if isinstance(value, RelocatableValue):
+            return value.segment_index, value.offset
+        assert (
+            cls.INT_SEGMENT_INDEX < value < 2 ** 63
+        ), f"Register value {value} is out of range for CompactTrace."
+        return cls.INT_SEGMENT_INDEX, value
+
+    @classmethod
+    def _decode(cls, segment_index: int, offset: int) -> MaybeRelocatable:
+        if segment_index == cls.INT_SEGMENT_INDEX:
+            return offset
+        return RelocatableValue(segment_index=segment_index, offset=offset)
+
+    def append(self, entry: TraceEntry[MaybeRelocatable]):
+        self.data.extend(
+            (*self._encode(entry.pc), *self._encode(entry.ap), *self._encode(entry.fp))
+        )
+
+    def _get_entry(self, index: int) -> TraceEntry[MaybeRelocatable]:
+        pc_segment, pc_offset, ap_segment, ap_offset, fp_segment, fp_offset = self.data[
+            index * self.VALUES_PER_ENTRY : (index + 1) * self.VALUES_PER_ENTRY
+        ]
+        return TraceEntry(
+            pc=self._decode(pc_segment, pc_offset),
+            ap=self._decode(ap_segment, ap_offset),
+            fp=self._decode(fp_segment, fp_offset),
+        )
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self._get_entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactTrace index out of range.")
+        return self._get_entry(index)
+
+    def __len__(self) -> int:
+        return len(self.data) // self.VALUES_PER_ENTRY
+
+    def __iter__(self) -> Iterator[TraceEntry[MaybeRelocatable]]:
+        return (self._get_entry(i) for i in range(len(self)))
+
+    def relocate(self, segment_offsets: Dict[int, int], prime: int) -> "CompactRelocatedTrace":
+        """
+        Relocates the trace without creating a TraceEntry object per step.
+        """
+
+        def relocated_values() -> Iterator[int]:
+            data = self.data
+            for i in range(0, len(data), self.VALUES_PER_ENTRY):
+                # The relocated trace is ordered as in the binary trace format: ap, fp, pc.
+                for j in (i + 2, i + 4, i):
+                    segment_index, offset = data[j], data[j + 1]
+                    if segment_index == self.INT_SEGMENT_INDEX:
+                        yield offset
+                        continue
+                    segment_offset = segment_offsets.get(segment_index)
+                    assert (
+                        segment_offset is not None
+                    ), f"Failed to relocate {segment_index}:{offset}. Missing segment offset."
+                    yield segment_offset + offset
+
+        relocated_trace = CompactRelocatedTrace(data=array("Q", relocated_values()))
+        assert len(relocated_trace) == 0 or max(relocated_trace.data) < prime
+        return relocated_trace
+
+
+class CompactRelocatedTrace(Sequence[TraceEntry[int]]):
+    """
+    A memory efficient replacement for List[TraceEntry[int]].
+    The entries are stored in an array of unsigned 64-bit integers, in the same order as in the
+    binary trace format (see TraceEntry.serialize()), so the trace can be written to a file in large
+    chunks.
+    """
+
+    VALUES_PER_ENTRY = 3
+    # The number of entries written to a file in a single write() call.
+    WRITE_CHUNK_SIZE = 2 ** 16
+
+    def __init__(self, data: "array[int]"):
+        assert data.typecode == "Q"
+        self.data = data
+
+    def _get_entry(self, index: int) -> TraceEntry[int]:
+        ap, fp, pc = self.data[index * self.VALUES_PER_ENTRY : (index + 1) * self.VALUES_PER_ENTRY]
+        return TraceEntry(pc=pc, ap=ap, fp=fp)
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [self._get_entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactRelocatedTrace index out of range.")
+        return self._get_entry(index)
+
+    def __len__(self) -> int:
+        return len(self.data) // self.VALUES_PER_ENTRY
+
+    def __iter__(self) -> Iterator[TraceEntry[int]]:
+        return (self._get_entry(i) for i in range(len(self)))
+
+    def write(self, trace_file: IO[bytes]):
+        """
+        Writes the trace to trace_file in the binary trace format.
+        """
+        chunk_values = self.WRITE_CHUNK_SIZE * self.VALUES_PER_ENTRY
+        for i in range(0, len(self.data), chunk_values):
+            chunk = self.data[i : i + chunk_values]
+            if sys.byteorder != "little":
+                chunk.byteswap()
+            trace_file.write(chunk.tobytes())
+
+
 def relocate_trace(
-    trace: List[TraceEntry[MaybeRelocatable]],
+    trace: Union[List[TraceEntry[MaybeRelocatable]], CompactTrace],
     segment_offsets: Dict[int, T],
     prime: int,
     allow_missing_segments: bool = False,
-) -> List[TraceEntry[T]]:
+) -> Union[List[TraceEntry[T]], CompactRelocatedTrace]:
+    if isinstance(trace, CompactTrace) and not allow_missing_segments:
+        return trace.relocate(segment_offsets=segment_offsets, prime=prime)  # type: ignore
+
     new_trace: List[TraceEntry[T]] = []
 
     def relocate_val(x):
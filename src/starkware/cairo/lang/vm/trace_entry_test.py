@@ -1,4 +1,9 @@
-from starkware.cairo.lang.vm.trace_entry import TraceEntry
+import io
+
+import pytest
+
+from starkware.cairo.lang.vm.relocatable import RelocatableValue
+from starkware.cairo.lang.vm.trace_entry import CompactTrace, TraceEntry
 
 
 def test_trace_entry_serialization():
@@ -22,3 +27,33 @@ def test_trace_entry_serialization():
 
     # Test deserialization.
     assert TraceEntry.deserialize(serialized).serialize() == serialized
+
+
+def test_compact_trace():
+    entries = [
+        TraceEntry(pc=RelocatableValue(0, 5), ap=RelocatableValue(1, 3), fp=RelocatableValue(1, 2)),
+        TraceEntry(pc=RelocatableValue(0, 7), ap=RelocatableValue(-1, 0), fp=12),
+    ]
+    trace = CompactTrace(entries)
+    assert len(trace) == 2
+    assert list(trace) == entries
+    assert trace[-1] == entries[-1]
+    assert trace[:1] == entries[:1]
+    with pytest.raises(IndexError):
+        trace[2]
+
+    segment_offsets = {0: 1, 1: 10, -1: 20}
+    relocated_trace = trace.relocate(segment_offsets=segment_offsets, prime=2 ** 64)
+    expected_trace = [
+        TraceEntry(pc=6, ap=13, fp=12),
+        TraceEntry(pc=8, ap=20, fp=12),
+    ]
+    assert list(relocated_trace) == expected_trace
+    assert relocated_trace[1] == expected_trace[1]
+
+    trace_file = io.BytesIO()
+    relocated_trace.write(trace_file)
+    assert trace_file.getvalue() == b"".join(entry.serialize() for entry in expected_trace)
+
+    with pytest.raises(AssertionError, match="Failed to relocate 1:3"):
+        trace.relocate(segment_offsets={0: 1}, prime=2 ** 64)
@@ -1,7 +1,7 @@
 import dataclasses
 import sys
 from abc import ABC
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from starkware.cairo.lang.compiler.debug_info import DebugInfo, InstructionLocation
 from starkware.cairo.lang.compiler.encode import is_call_instruction
@@ -132,6 +132,10 @@ class VirtualMachineBase(ABC):
         self.exec_scopes: List[dict] = []
         self.enter_scope(dict(hint_locals))
         self.hints: Dict[MaybeRelocatable, List[CompiledHint]] = {}
+        # A map from a segment index to the offsets of the pcs in that segment that have hints.
+        # Allows step() to skip the lookup in self.hints (which requires hashing the pc) for pcs
+        # without hints.
+        self.hint_pc_offsets: Dict[int, Set[int]] = {}
         # A map from hint id to pc and index (index is required when there is more than one hint
         # for a single pc).
         self.hint_pc_and_index: Dict[int, Tuple[MaybeRelocatable, int]] = {}
@@ -152,7 +156,14 @@ class VirtualMachineBase(ABC):
 
         from starkware.python import math_utils
 
-        self.static_locals = static_locals.copy() if static_locals is not None else {}
+        # The vm_* functions are kept in static_locals, so that step() can add all the static
+        # values to the scope of a hint with a single update().
+        self.static_locals = {
+            "vm_load_program": self.load_program,
+            "vm_enter_scope": self.enter_scope,
+            "vm_exit_scope": self.exit_scope,
+            **(static_locals if static_locals is not None else {}),
+        }
         self.static_locals.update(
             {
                 "PRIME": self.prime,
@@ -202,7 +213,10 @@ class VirtualMachineBase(ABC):
                         ),
                     )
                 )
-            self.hints[pc + program_base] = compiled_hints
+            hint_pc = pc + program_base
+            self.hints[hint_pc] = compiled_hints
+            if isinstance(hint_pc, RelocatableValue):
+                self.hint_pc_offsets.setdefault(hint_pc.segment_index, set()).add(hint_pc.offset)
 
     def load_debug_info(self, debug_info: Optional[DebugInfo], program_base: MaybeRelocatable):
         if debug_info is None:
@@ -247,29 +261,26 @@ class VirtualMachineBase(ABC):
     def step(self):
         self.skip_instruction_execution = False
         # Execute hints.
-        for hint_index, hint in enumerate(self.hints.get(self.run_context.pc, [])):
-            exec_locals = self.exec_scopes[-1]
-            exec_locals["memory"] = memory = self.validated_memory
-            exec_locals["ap"] = ap = self.run_context.ap
-            exec_locals["fp"] = fp = self.run_context.fp
-            exec_locals["pc"] = pc = self.run_context.pc
-            exec_locals["current_step"] = self.current_step
-            exec_locals["ids"] = hint.consts(pc, ap, fp, memory)
-
-            exec_locals["vm_load_program"] = self.load_program
-            exec_locals["vm_enter_scope"] = self.enter_scope
-            exec_locals["vm_exit_scope"] = self.exit_scope
-            exec_locals.update(self.static_locals)
-
-            self.exec_hint(hint.compiled, exec_locals, hint_index=hint_index)
-
-            # Clear ids (which will be rewritten by the next hint anyway) to make the VM instance
-            # smaller and faster to copy.
-            del exec_locals["ids"]
-            del exec_locals["memory"]
-
-            if self.skip_instruction_execution:
-                return
+        if self.has_hints(self.run_context.pc):
+            for hint_index, hint in enumerate(self.hints[self.run_context.pc]):
+                exec_locals = self.exec_scopes[-1]
+                exec_locals["memory"] = memory = self.validated_memory
+                exec_locals["ap"] = ap = self.run_context.ap
+                exec_locals["fp"] = fp = self.run_context.fp
+                exec_locals["pc"] = pc = self.run_context.pc
+                exec_locals["current_step"] = self.current_step
+                exec_locals["ids"] = hint.consts(pc, ap, fp, memory)
+                exec_locals.update(self.static_locals)
+
+                self.exec_hint(hint.compiled, exec_locals, hint_index=hint_index)
+
+                # Clear ids (which will be rewritten by the next hint anyway) to make the VM
+                # instance smaller and faster to copy.
+                del exec_locals["ids"]
+                del exec_locals["memory"]
+
+                if self.skip_instruction_execution:
+                    return
 
         # Decode.
         instruction = self.decode_current_instruction()
@@ -277,6 +288,15 @@ class VirtualMachineBase(ABC):
         # Run.
         self.run_instruction(instruction)
 
+    def has_hints(self, pc: MaybeRelocatable) -> bool:
+        """
+        Returns True if there are hints that should be executed before the instruction at pc.
+        """
+        if isinstance(pc, RelocatableValue):
+            hint_offsets = self.hint_pc_offsets.get(pc.segment_index)
+            return hint_offsets is not None and pc.offset in hint_offsets
+        return pc in self.hints
+
     def compile_hint(self, source, filename, hint_index: int):
         """
         Compiles the given python source code.
@@ -423,9 +443,10 @@ def get_perm_range_check_limits(
     """
     Returns the minimum value and maximum value in the perm_range_check component.
     """
+    # Decode each distinct instruction once.
+    encoded_instructions = {memory[entry.pc] for entry in trace}
     offsets: List[int] = []
-    for entry in trace:
-        encoded_instruction = memory[entry.pc]
+    for encoded_instruction in encoded_instructions:
         _, off0, off1, off2 = decode_instruction_values(encoded_instruction)
         offsets += [off0, off1, off2]
     return min(offsets), max(offsets)
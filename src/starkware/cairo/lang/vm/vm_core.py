@@ -4,7 +4,7 @@ from functools import lru_cache
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from starkware.cairo.lang.compiler.encode import decode_instruction
-from starkware.cairo.lang.compiler.instruction import Instruction, Register
+from starkware.cairo.lang.compiler.instruction import OFFSET_BITS, Instruction, Register
 from starkware.cairo.lang.compiler.program import ProgramBase
 from starkware.cairo.lang.vm.builtin_runner import BuiltinRunner
 from starkware.cairo.lang.vm.memory_dict import MemoryDict
@@ -111,6 +111,11 @@ class VirtualMachine(VirtualMachineBase):
         program_base - The pc of the first instruction in program (default is run_context.pc).
         """
         self.run_context = copy.copy(run_context)  # Shallow copy.
+        # A cache of the decoded instructions, indexed by the segment index and the offset of their
+        # pc. Since memory is write-once, the instruction at a given address never changes once it
+        # was decoded (this includes code loaded later using vm_load_program()).
+        # Temporary segments are not cached, as their cells are moved by relocate_memory().
+        self.instruction_cache: Dict[int, List[Optional[Instruction]]] = {}
         if program_base is None:
             program_base = run_context.pc
         if builtin_runners is None:
@@ -132,6 +137,10 @@ class VirtualMachine(VirtualMachineBase):
         }
 
         self.trace: List[TraceEntry[MaybeRelocatable]] = []
+        # The minimal and maximal offsets (off0, off1 and off2) of the executed instructions, kept
+        # up to date by run_instruction() (see get_instruction_offset_limits()).
+        self.min_instruction_offset = 2 ** (OFFSET_BITS - 1)
+        self.max_instruction_offset = -(2 ** (OFFSET_BITS - 1)) - 1
 
         # Current step.
         self.current_step = 0
@@ -372,6 +381,19 @@ class VirtualMachine(VirtualMachineBase):
         return decode_instruction(encoded_inst, imm)
 
     def decode_current_instruction(self) -> Instruction:
+        pc = self.run_context.pc
+        segment_cache: Optional[List[Optional[Instruction]]] = None
+        offset = -1
+        if isinstance(pc, RelocatableValue) and pc.segment_index >= 0:
+            offset = pc.offset
+            segment_cache = self.instruction_cache.get(pc.segment_index)
+            if segment_cache is None:
+                segment_cache = self.instruction_cache[pc.segment_index] = []
+            elif offset < len(segment_cache):
+                cached_instruction = segment_cache[offset]
+                if cached_instruction is not None:
+                    return cached_instruction
+
         try:
             instruction_encoding, imm = self.run_context.get_instruction_encoding()
         except Exception as exc:
@@ -379,6 +401,11 @@ class VirtualMachine(VirtualMachineBase):
 
         instruction = self.decode_instruction(instruction_encoding, imm)
 
+        if segment_cache is not None and offset >= 0:
+            if offset >= len(segment_cache):
+                segment_cache.extend([None] * (offset + 1 - len(segment_cache)))
+            segment_cache[offset] = instruction
+
         return instruction
 
     def opcode_assertions(self, instruction: Instruction, operands: Operands):
@@ -433,6 +460,13 @@ class VirtualMachine(VirtualMachineBase):
         self.accessed_addresses.update(operands_mem_addresses)
         self.accessed_addresses.add(self.run_context.pc)
 
+        off_min = min(instruction.off0, instruction.off1, instruction.off2)
+        if off_min < self.min_instruction_offset:
+            self.min_instruction_offset = off_min
+        off_max = max(instruction.off0, instruction.off1, instruction.off2)
+        if off_max > self.max_instruction_offset:
+            self.max_instruction_offset = off_max
+
         try:
             # Update registers.
             self.update_registers(instruction, operands)
@@ -441,6 +475,18 @@ class VirtualMachine(VirtualMachineBase):
 
         self.current_step += 1
 
+    def get_instruction_offset_limits(self) -> Optional[Tuple[int, int]]:
+        """
+        Returns the minimal and maximal encoded (biased) offsets of the executed instructions, which
+        are the limits of their contribution to the perm_range_check component, or None if no
+        instruction was executed.
+        Same as get_perm_range_check_limits(self.trace, memory), without going over the trace.
+        """
+        if self.current_step == 0:
+            return None
+        bias = 2 ** (OFFSET_BITS - 1)
+        return self.min_instruction_offset + bias, self.max_instruction_offset + bias
+
     def check_eq(self, val0, val1):
         """
         Called when an instruction encounters an assertion that two values should be equal.
@@ -10,7 +10,7 @@ from starkware.cairo.lang.vm.memory_dict import (
     UnknownMemoryError,
 )
 from starkware.cairo.lang.vm.relocatable import MaybeRelocatable, RelocatableValue
-from starkware.cairo.lang.vm.vm import RunContext, VirtualMachine
+from starkware.cairo.lang.vm.vm import RunContext, VirtualMachine, get_perm_range_check_limits
 from starkware.cairo.lang.vm.vm_exceptions import InconsistentAutoDeductionError, VmException
 from starkware.python.test_utils import maybe_raises
 
@@ -250,6 +250,13 @@ end
     # Check that address fp + 2, whose value was only set in a hint, is not counted as accessed.
     assert [202 + i in vm.accessed_addresses for i in range(3)] == [True, True, False]
 
+    # Check that has_hints() agrees with the hints dict.
+    pc_offsets = range(len(vm.program.data) + 20)
+    assert [vm.has_hints(RelocatableValue(0, i)) for i in pc_offsets] == [
+        RelocatableValue(0, i) in vm.hints for i in pc_offsets
+    ]
+    assert vm.hint_pc_offsets.keys() == {0}
+
 
 def test_hint_between_references():
     code = """
@@ -634,6 +641,43 @@ def test_jmp_segment():
     assert vm.get_location(vm.run_context.pc) is not None
 
 
+def test_instruction_cache():
+    code = """
+loop:
+    [ap] = [ap - 1] + 1; ap++
+    jmp loop
+    """
+    vm = run_single(code, 6, ap=102, extra_mem={101: 0})
+    assert [vm.run_context.memory[102 + i] for i in range(3)] == [1, 2, 3]
+    memory = vm.run_context.memory
+    assert vm.instruction_cache == {
+        0: [None] * 10
+        + [
+            vm.decode_instruction(*memory.get_range(RelocatableValue(0, 10), 2)),
+            None,
+            vm.decode_instruction(*memory.get_range(RelocatableValue(0, 12), 2)),
+        ]
+    }
+
+
+def test_instruction_offset_limits():
+    code = """
+    [ap] = [ap - 1] + 2; ap++
+    [ap + 3] = [fp - 7]
+    jmp rel 4
+    [ap] = [ap - 20] + 5; ap++  # Skipped.
+    [ap] = [ap - 1] * 3; ap++
+    """
+    vm = run_single(code, 0, pc=10, ap=102, extra_mem={93: 0, 101: 1})
+    assert vm.get_instruction_offset_limits() is None
+
+    vm = run_single(code, 4, pc=10, ap=102, extra_mem={93: 0, 101: 1})
+    limits = vm.get_instruction_offset_limits()
+    assert limits == get_perm_range_check_limits(vm.trace, vm.run_context.memory)
+    # The skipped instruction (with the offset -20) does not affect the limits.
+    assert limits == (2 ** 15 - 7, 2 ** 15 + 3)
+
+
 def test_simple_deductions():
     code = """
     # 2 = 3 * ?.
@@ -1,6 +1,10 @@
+import functools
+from typing import Iterable, List, Optional, Sequence, Tuple
+
 from fastecdsa.curve import Curve
 from fastecdsa.point import Point
 
+from starkware.crypto.signature.math_utils import ECPoint, div_mod
 from starkware.crypto.signature.signature import (
     ALPHA,
     BETA,
@@ -22,6 +26,17 @@ P_1 = Point(*CONSTANT_POINTS[2 + LOW_PART_BITS], curve=curve)
 P_2 = Point(*CONSTANT_POINTS[2 + N_ELEMENT_BITS_HASH], curve=curve)
 P_3 = Point(*CONSTANT_POINTS[2 + N_ELEMENT_BITS_HASH + LOW_PART_BITS], curve=curve)
 
+# The number of bits of an element that are handled by a single lookup in the precomputed tables.
+WINDOW_BITS = 8
+WINDOW_MASK = 2 ** WINDOW_BITS - 1
+
+# A point (X, Y, Z) in Jacobian coordinates, representing the affine point (X / Z^2, Y / Z^3).
+# None represents the point at infinity.
+JacobianPoint = Tuple[int, int, int]
+# A fixed-base table of a point P: table[i][d] is the affine point d * 2^(WINDOW_BITS * i) * P.
+# table[i][0] (the point at infinity) is never used and is None.
+FixedBaseTable = List[List[Optional[ECPoint]]]
+
 
 def process_single_element(element: int, p1, p2) -> Point:
     assert element < FIELD_PRIME, "Element integer value >= FIELD_PRIME"
@@ -31,6 +46,143 @@ def process_single_element(element: int, p1, p2) -> Point:
     return low_part * p1 + high_nibble * p2
 
 
+def jacobian_double(point: JacobianPoint) -> Optional[JacobianPoint]:
+    """
+    Returns 2 * point.
+    """
+    x, y, z = point
+    if y == 0:
+        return None
+    yy = y * y % FIELD_PRIME
+    zz = z * z % FIELD_PRIME
+    s = 4 * x * yy % FIELD_PRIME
+    m = (3 * x * x + ALPHA * zz * zz) % FIELD_PRIME
+    res_x = (m * m - 2 * s) % FIELD_PRIME
+    res_y = (m * (s - res_x) - 8 * yy * yy) % FIELD_PRIME
+    return res_x, res_y, 2 * y * z % FIELD_PRIME
+
+
+def jacobian_add_affine(point: Optional[JacobianPoint], other: ECPoint) -> Optional[JacobianPoint]:
+    """
+    Returns point + other, where other is given in affine coordinates.
+    """
+    if point is None:
+        return other[0], other[1], 1
+    x1, y1, z1 = point
+    x2, y2 = other
+    z1z1 = z1 * z1 % FIELD_PRIME
+    h = (x2 * z1z1 - x1) % FIELD_PRIME
+    r = (y2 * z1 * z1z1 - y1) % FIELD_PRIME
+    if h == 0:
+        # The points have the same x coordinate: they are either equal or opposite.
+        return jacobian_double(point) if r == 0 else None
+    hh = h * h % FIELD_PRIME
+    hhh = h * hh % FIELD_PRIME
+    v = x1 * hh % FIELD_PRIME
+    res_x = (r * r - hhh - 2 * v) % FIELD_PRIME
+    res_y = (r * (v - res_x) - y1 * hhh) % FIELD_PRIME
+    return res_x, res_y, z1 * h % FIELD_PRIME
+
+
+def jacobian_to_affine_batch(points: Sequence[JacobianPoint]) -> List[ECPoint]:
+    """
+    Converts the given points to affine coordinates, using a single field inversion for all of them
+    (Montgomery's trick).
+    """
+    # prefix_products[i] is the product of the Z coordinates of points[:i].
+    prefix_products = []
+    product = 1
+    for _, _, z in points:
+        prefix_products.append(product)
+        product = product * z % FIELD_PRIME
+    assert product != 0, "Cannot convert the point at infinity to affine coordinates."
+
+    # inverse is the inverse of the product of the Z coordinates of points[:i + 1].
+    inverse = div_mod(1, product, FIELD_PRIME)
+    res: List[ECPoint] = [(0, 0)] * len(points)
+    for i in reversed(range(len(points))):
+        x, y, z = points[i]
+        z_inverse = inverse * prefix_products[i] % FIELD_PRIME
+        inverse = inverse * z % FIELD_PRIME
+        z_inverse_squared = z_inverse * z_inverse % FIELD_PRIME
+        res[i] = (
+            x * z_inverse_squared % FIELD_PRIME,
+            y * z_inverse_squared * z_inverse % FIELD_PRIME,
+        )
+    return res
+
+
+def build_fixed_base_table(point: ECPoint, n_bits: int) -> FixedBaseTable:
+    """
+    Returns the fixed-base table of the given point, for scalars of at most n_bits bits.
+    """
+    table: FixedBaseTable = []
+    base = point
+    for window_start in range(0, n_bits, WINDOW_BITS):
+        n_multiples = 2 ** min(WINDOW_BITS, n_bits - window_start)
+        # multiples[d - 1] = d * base, for d = 1, ..., n_multiples (the last one is the base of the
+        # next window).
+        multiples: List[JacobianPoint] = [(base[0], base[1], 1)]
+        for _ in range(n_multiples - 1):
+            multiple = jacobian_add_affine(multiples[-1], base)
+            assert multiple is not None
+            multiples.append(multiple)
+        affine_multiples = jacobian_to_affine_batch(multiples)
+        table.append([None, *affine_multiples[:-1]])
+        base = affine_multiples[-1]
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def get_fixed_base_tables() -> Tuple[Tuple[FixedBaseTable, FixedBaseTable], ...]:
+    """
+    Returns the fixed-base tables of (P_0, P_1) and (P_2, P_3), used to process the low and high
+    parts of the first and second hash inputs respectively.
+    The tables are computed on the first call.
+    """
+    high_part_bits = N_ELEMENT_BITS_HASH - LOW_PART_BITS
+    return tuple(
+        (
+            build_fixed_base_table(point=(low_point.x, low_point.y), n_bits=LOW_PART_BITS),
+            build_fixed_base_table(point=(high_point.x, high_point.y), n_bits=high_part_bits),
+        )
+        for low_point, high_point in ((P_0, P_1), (P_2, P_3))
+    )
+
+
+def add_fixed_base_multiple(
+    point: Optional[JacobianPoint], table: FixedBaseTable, scalar: int
+) -> Optional[JacobianPoint]:
+    """
+    Returns point + scalar * P, where table is the fixed-base table of P.
+    """
+    for window in table:
+        if scalar == 0:
+            break
+        digit = scalar & WINDOW_MASK
+        if digit != 0:
+            multiple = window[digit]
+            assert multiple is not None
+            point = jacobian_add_affine(point, multiple)
+        scalar >>= WINDOW_BITS
+    return point
+
+
+def pedersen_hash_jacobian(x: int, y: int) -> JacobianPoint:
+    """
+    Returns the point whose x coordinate is the Pedersen hash of x and y (see pedersen_hash()),
+    in Jacobian coordinates.
+    """
+    point: Optional[JacobianPoint] = (SHIFT_POINT[0], SHIFT_POINT[1], 1)
+    for element, (low_table, high_table) in zip((x, y), get_fixed_base_tables()):
+        assert element < FIELD_PRIME, "Element integer value >= FIELD_PRIME"
+        assert element >= 0, "Element integer value is negative"
+        point = add_fixed_base_multiple(point, low_table, element & LOW_PART_MASK)
+        point = add_fixed_base_multiple(point, high_table, element >> LOW_PART_BITS)
+    assert point is not None, "Unhashable input."
+    return point
+
+
 def pedersen_hash(x: int, y: int) -> int:
     """
     Computes the Starkware version of the Pedersen hash of x and y.
@@ -38,10 +190,23 @@ def pedersen_hash(x: int, y: int) -> int:
         shift_point + x_low * P_0 + x_high * P1 + y_low * P2  + y_high * P3
     where x_low is the 248 low bits of x, x_high is the 4 high bits of x and similarly for y.
     shift_point, P_0, P_1, P_2, P_3 are constant points generated from the digits of pi.
+
+    The multiples of P_0, P_1, P_2, P_3 are computed using precomputed fixed-base tables, so each
+    hash is a sequence of table lookups and point additions.
+    """
+    res_x, _, res_z = pedersen_hash_jacobian(x, y)
+    return div_mod(res_x, res_z * res_z % FIELD_PRIME, FIELD_PRIME)
+
+
+def pedersen_hash_many(pairs: Iterable[Tuple[int, int]]) -> List[int]:
     """
-    return (
-        HASH_SHIFT_POINT + process_single_element(x, P_0, P_1) + process_single_element(y, P_2, P_3)
-    ).x
+    Computes the Pedersen hashes of the given (x, y) pairs. Equivalent to
+    [pedersen_hash(x, y) for x, y in pairs], but uses a single field inversion for all the hashes.
+    """
+    points = [pedersen_hash_jacobian(x, y) for x, y in pairs]
+    if len(points) == 0:
+        return []
+    return [res_x for res_x, _ in jacobian_to_affine_batch(points)]
 
 
 def pedersen_hash_func(x: bytes, y: bytes) -> bytes:
@@ -50,3 +215,14 @@ def pedersen_hash_func(x: bytes, y: bytes) -> bytes:
     """
     assert len(x) == len(y) == 32, "Unexpected element length."
     return to_bytes(pedersen_hash(*(from_bytes(element) for element in (x, y))))
+
+
+def pedersen_hash_func_many(pairs: Iterable[Tuple[bytes, bytes]]) -> List[bytes]:
+    """
+    A variant of 'pedersen_hash_many', where the elements and the resulting hashes are in bytes.
+    """
+    int_pairs = []
+    for x, y in pairs:
+        assert len(x) == len(y) == 32, "Unexpected element length."
+        int_pairs.append((from_bytes(x), from_bytes(y)))
+    return [to_bytes(res) for res in pedersen_hash_many(int_pairs)]
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from starkware.crypto.signature.fast_pedersen_hash import (
+    pedersen_hash,
+    pedersen_hash_func,
+    pedersen_hash_func_many,
+    pedersen_hash_many,
+)
+from starkware.crypto.signature.signature import FIELD_PRIME
+from starkware.crypto.signature.signature import pedersen_hash as reference_pedersen_hash
+from starkware.python.utils import to_bytes
+
+EDGE_CASE_ELEMENTS = [0, 1, 2 ** 248 - 1, 2 ** 248, FIELD_PRIME - 1]
+
+
+@pytest.mark.parametrize("x", EDGE_CASE_ELEMENTS)
+@pytest.mark.parametrize("y", EDGE_CASE_ELEMENTS)
+def test_pedersen_hash_edge_cases(x: int, y: int):
+    assert pedersen_hash(x, y) == reference_pedersen_hash(x, y)
+
+
+def test_pedersen_hash_random():
+    rand = random.Random(0)
+    for _ in range(10):
+        x, y = rand.randrange(FIELD_PRIME), rand.randrange(FIELD_PRIME)
+        assert pedersen_hash(x, y) == reference_pedersen_hash(x, y)
+
+
+def test_pedersen_hash_many():
+    rand = random.Random(0)
+    pairs = [(rand.randrange(FIELD_PRIME), rand.randrange(FIELD_PRIME)) for _ in range(20)]
+    assert pedersen_hash_many(pairs) == [pedersen_hash(x, y) for x, y in pairs]
+    assert pedersen_hash_many([]) == []
+
+    bytes_pairs = [(to_bytes(x), to_bytes(y)) for x, y in pairs]
+    assert pedersen_hash_func_many(bytes_pairs) == [
+        pedersen_hash_func(x, y) for x, y in bytes_pairs
+    ]
+
+
+def test_pedersen_hash_invalid_element():
+    with pytest.raises(AssertionError, match="Element integer value >= FIELD_PRIME"):
+        pedersen_hash(FIELD_PRIME, 0)
+    with pytest.raises(AssertionError, match="Element integer value is negative"):
+        pedersen_hash(0, -1)
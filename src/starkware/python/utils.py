@@ -1,13 +1,29 @@
 import asyncio
+import copy
 import itertools
 import os
 import random
 import re
 import subprocess
-from collections import UserDict
-from typing import Any, AsyncIterable, Awaitable, Iterable, List, Optional, TypeVar
+from collections import ChainMap, UserDict
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    TypeVar,
+    cast,
+)
 
 T = TypeVar("T")
+K = TypeVar("K")
+V = TypeVar("V")
 HASH_BYTES = 32
 
 
@@ -172,6 +188,263 @@ class WriteOnceDict(UserDict):
         self.data[key] = value
 
 
+# Marks a key that did not appear in a LayeredDict before it was written.
+_MISSING = object()
+
+
+class LayeredDict(MutableMapping[K, V]):
+    """
+    A mapping with cheap nested copies ("layers"), used instead of a ChainMap when the layers may
+    be nested deeply.
+    new_child() opens a new layer on top of this one. The writes made through a layer are either
+    kept (apply_to_parent()) or reverted (discard()) when it is closed.
+
+    A layer is opened in one of two ways:
+    * Journaled: if the layer has no open children, the new child shares its flat mapping, so a
+      lookup costs O(1) regardless of the number of layers. The child records the previous values
+      of the keys it writes, so that applying or discarding it costs the number of keys written.
+      While it is open, its parent must not be accessed directly.
+    * Overlay: if the layer already has an open child (e.g., concurrent copies of the same state),
+      the new child keeps its writes in a mapping of its own, on top of a view of its parent that
+      does not include the writes of the other open children (as in a ChainMap).
+    """
+
+    def __init__(self, data: Optional[MutableMapping[K, V]] = None):
+        """
+        Creates a LayeredDict on top of the given mapping (which is not copied).
+        """
+        self.data: MutableMapping[K, V] = {} if data is None else data
+        # The mapping that the writes go to: self.data, unless the layer is (or is opened on top
+        # of) an overlay layer, in which case self.data is ChainMap(self.writes, <parent view>).
+        self.writes: MutableMapping[K, V] = self.data
+        self.parent: Optional["LayeredDict[K, V]"] = None
+        self.is_overlay = False
+        # The open journaled child, and the number of open overlay children.
+        self.open_child: Optional["LayeredDict[K, V]"] = None
+        self.n_open_overlays = 0
+        # The values in self.writes of the keys written in this layer, before the layer was opened
+        # (_MISSING for keys that did not appear). Not maintained in layers without a parent,
+        # which cannot be discarded.
+        self.undo_log: Dict[K, Any] = {}
+
+    def new_child(self) -> "LayeredDict[K, V]":
+        """
+        Opens a new layer on top of this one.
+        """
+        if self.open_child is None and self.n_open_overlays == 0:
+            child: LayeredDict[K, V] = LayeredDict(data=self.data)
+            child.writes = self.writes
+            self.open_child = child
+        else:
+            overlay: Dict[K, V] = {}
+            # The view is read-only; a ChainMap only writes to its first mapping.
+            view = cast(MutableMapping[K, V], _CommittedView(layer=self))
+            child = LayeredDict(data=ChainMap(overlay, view))
+            child.writes = overlay
+            child.is_overlay = True
+            self.n_open_overlays += 1
+        child.parent = self
+        return child
+
+    def apply_to_parent(self):
+        """
+        Closes this layer, keeping its writes in the parent layer.
+        """
+        parent = self._close()
+        if self.is_overlay:
+            for key, value in self.writes.items():
+                parent._apply_write(key=key, value=value)
+        elif parent.parent is not None:
+            for key, previous_value in self.undo_log.items():
+                parent.undo_log.setdefault(key, previous_value)
+        self.undo_log = {}
+
+    def discard(self):
+        """
+        Closes this layer, reverting its writes.
+        """
+        self._close()
+        if not self.is_overlay:
+            for key, previous_value in self.undo_log.items():
+                if previous_value is _MISSING:
+                    self.writes.pop(key, None)
+                else:
+                    self.writes[key] = previous_value
+        self.undo_log = {}
+
+    def _close(self) -> "LayeredDict[K, V]":
+        parent = self.parent
+        assert parent is not None, "The layer is not open."
+        assert (
+            self.open_child is None and self.n_open_overlays == 0
+        ), "Cannot close a layer that has an open child."
+        if self.is_overlay:
+            assert parent.n_open_overlays > 0, "The layer is not open."
+            parent.n_open_overlays -= 1
+        else:
+            assert parent.open_child is self, "The layer is not open."
+            parent.open_child = None
+        self.parent = None
+        return parent
+
+    def _record_write(self, key: K):
+        if self.parent is not None and key not in self.undo_log:
+            self.undo_log[key] = self.writes.get(key, _MISSING)
+
+    def _get_uncommitted_layer(self, key: object) -> Optional["LayeredDict[K, V]"]:
+        """
+        Returns the outermost open journaled descendant of this layer that wrote the given key, or
+        None if there is no such layer.
+        """
+        layer = self.open_child
+        while layer is not None:
+            if key in layer.undo_log:
+                return layer
+            layer = layer.open_child
+        return None
+
+    def _get_uncommitted_writes(self) -> Dict[K, Any]:
+        """
+        Returns the keys written by the open journaled descendants of this layer, mapped to their
+        values in self.writes before they were written (_MISSING for keys that did not appear).
+        """
+        previous_values: Dict[K, Any] = {}
+        layer = self.open_child
+        while layer is not None:
+            for key, previous_value in layer.undo_log.items():
+                previous_values.setdefault(key, previous_value)
+            layer = layer.open_child
+        return previous_values
+
+    def _apply_write(self, key: K, value: V):
+        """
+        Writes a value that was written by an overlay child to this layer.
+        """
+        uncommitted_layer = self._get_uncommitted_layer(key=key)
+        if uncommitted_layer is None:
+            self[key] = value
+            return
+
+        # The key was written by an open journaled child, whose value hides the value of this
+        # layer. Update the value that the child reverts to instead.
+        if self.parent is not None and key not in self.undo_log:
+            self.undo_log[key] = uncommitted_layer.undo_log[key]
+        uncommitted_layer.undo_log[key] = value
+
+    def __getitem__(self, key: K) -> V:
+        if key in self.data:
+            return self.data[key]
+
+        # The underlying mapping may create the missing value (e.g., a defaultdict).
+        value = self.data[key]
+        if self.parent is not None:
+            self.undo_log.setdefault(key, _MISSING)
+        return value
+
+    def get(self, key: K, default: Any = None) -> Any:
+        # Same as ChainMap.get(); does not create missing values.
+        return self[key] if key in self.data else default
+
+    def __setitem__(self, key: K, value: V):
+        self._record_write(key)
+        self.data[key] = value
+
+    def __delitem__(self, key: K):
+        self._record_write(key)
+        del self.data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.data
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "LayeredDict[K, V]":
+        """
+        Returns a copy of the contents of this layer (not including the writes of its open
+        children), as a new LayeredDict without a parent.
+        """
+        writes = copy.deepcopy(self.writes, memo)
+        for key, previous_value in self._get_uncommitted_writes().items():
+            if previous_value is _MISSING:
+                writes.pop(key, None)
+            else:
+                writes[key] = copy.deepcopy(previous_value, memo)
+
+        if isinstance(self.data, ChainMap):
+            # The layer is on top of an overlay; copy the view below it as well.
+            view = self.data.maps[1]
+            assert isinstance(view, _CommittedView)
+            base = copy.deepcopy(view.layer, memo)
+            base.data.update(writes)
+            writes = base.data
+
+        result: LayeredDict[K, V] = LayeredDict(data=writes)
+        memo[id(self)] = result
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(_CommittedView(layer=self))!r})"
+
+
+class _CommittedView(Mapping[K, V]):
+    """
+    A read-only view of a LayeredDict, not including the writes of its open journaled children.
+    Used as the base of overlay layers.
+    """
+
+    def __init__(self, layer: LayeredDict[K, V]):
+        self.layer = layer
+
+    def _get_base(self) -> Optional[Mapping[K, V]]:
+        """
+        Returns the mapping below self.layer.writes, if any.
+        """
+        data = self.layer.data
+        return data.maps[1] if isinstance(data, ChainMap) else None
+
+    def __getitem__(self, key: K) -> V:
+        uncommitted_layer = self.layer._get_uncommitted_layer(key=key)
+        if uncommitted_layer is None:
+            return self.layer.data[key]
+
+        previous_value = uncommitted_layer.undo_log[key]
+        if previous_value is not _MISSING:
+            return previous_value
+        base = self._get_base()
+        if base is None:
+            raise KeyError(key)
+        return base[key]
+
+    def __contains__(self, key: object) -> bool:
+        uncommitted_layer = self.layer._get_uncommitted_layer(key=key)
+        if uncommitted_layer is None:
+            return key in self.layer.data
+        if uncommitted_layer.undo_log[key] is not _MISSING:  # type: ignore
+            return True
+        base = self._get_base()
+        return base is not None and key in base
+
+    def __iter__(self) -> Iterator[K]:
+        uncommitted_writes = self.layer._get_uncommitted_writes()
+        keys = {key for key in self.layer.writes if uncommitted_writes.get(key) is not _MISSING}
+        keys.update(
+            key
+            for key, previous_value in uncommitted_writes.items()
+            if previous_value is not _MISSING
+        )
+        base = self._get_base()
+        if base is not None:
+            keys.update(base)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 def camel_to_snake_case(camel_case_name: str) -> str:
     """
     Converts a name with Capital first letters to lower case with '_' as separators.
@@ -1,8 +1,11 @@
+import copy
 import re
+from collections import defaultdict
 
 import pytest
 
 from starkware.python.utils import (
+    LayeredDict,
     WriteOnceDict,
     all_subclasses,
     blockify,
@@ -132,3 +135,91 @@ def test_all_subclasses():
     all_subclasses_set = set(all_subclass_objects)
     assert len(all_subclass_objects) == len(all_subclasses_set)
     assert all_subclasses_set == {A, C, D, E, F}
+
+
+def test_layered_dict():
+    d: LayeredDict[str, int] = LayeredDict({"a": 1, "b": 2})
+    child = d.new_child()
+    child["a"] = 10
+    del child["b"]
+    child["c"] = 3
+    assert dict(child) == {"a": 10, "c": 3}
+
+    grandchild = child.new_child()
+    grandchild["a"] = 100
+    grandchild["d"] = 4
+    grandchild.discard()
+    assert dict(child) == {"a": 10, "c": 3}
+
+    grandchild = child.new_child()
+    grandchild["c"] = 30
+    grandchild.apply_to_parent()
+    assert dict(child) == {"a": 10, "c": 30}
+
+    # Discarding the child reverts the writes of its applied children as well.
+    child.discard()
+    assert dict(d) == {"a": 1, "b": 2}
+    assert d.undo_log == {}
+
+    child = d.new_child()
+    child["a"] = 10
+    child.apply_to_parent()
+    assert dict(d) == {"a": 10, "b": 2}
+    with pytest.raises(AssertionError, match="The layer is not open."):
+        child.discard()
+
+
+def test_layered_dict_siblings():
+    d: LayeredDict[str, int] = LayeredDict({"a": 1, "b": 2})
+    child = d.new_child()
+    child["a"] = 10
+    child["c"] = 3
+    grandchild = child.new_child()
+    grandchild["b"] = 20
+
+    # A sibling does not see the writes of the open children.
+    sibling = d.new_child()
+    assert sibling.is_overlay
+    assert dict(sibling) == {"a": 1, "b": 2}
+    assert "c" not in sibling and sibling.get("c") is None
+    sibling["a"] = 100
+    sibling["d"] = 4
+    sibling_child = sibling.new_child()
+    assert not sibling_child.is_overlay
+    sibling_child["b"] = 200
+    sibling_child.discard()
+    assert dict(sibling) == {"a": 100, "b": 2, "d": 4}
+    assert dict(child) == {"a": 10, "b": 20, "c": 3}
+
+    # Copies do not include the writes of the open children.
+    assert copy.deepcopy(d) == {"a": 1, "b": 2}
+    assert copy.deepcopy(child) == {"a": 10, "c": 3, "b": 2}
+    assert copy.deepcopy(sibling) == {"a": 100, "b": 2, "d": 4}
+
+    # The sibling is applied below the writes of the open children, which are then discarded.
+    sibling.apply_to_parent()
+    assert dict(child) == {"a": 10, "b": 20, "c": 3, "d": 4}
+    grandchild.apply_to_parent()
+    child.discard()
+    assert dict(d) == {"a": 100, "b": 2, "d": 4}
+
+    # A sibling that is applied after the open child overrides its writes.
+    child = d.new_child()
+    sibling = d.new_child()
+    child["a"] = 10
+    sibling["a"] = 1000
+    child.apply_to_parent()
+    sibling.apply_to_parent()
+    assert dict(d) == {"a": 1000, "b": 2, "d": 4}
+    assert d.open_child is None and d.n_open_overlays == 0
+
+
+def test_layered_dict_with_default_values():
+    d: LayeredDict[str, int] = LayeredDict(defaultdict(int))
+    child = d.new_child()
+    assert child.get("a") is None
+    assert "a" not in child
+    assert child["a"] == 0
+    assert "a" in child
+    child.discard()
+    assert "a" not in d
@@ -0,0 +1,457 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import cachetools
+
+from starkware.cairo.lang.vm.crypto import pedersen_hash_func
+from starkware.starknet.business_logic.state import BlockInfo, CarriedState, SharedState
+from starkware.starknet.business_logic.state_objects import ContractCarriedState
+from starkware.starknet.definitions.general_config import StarknetGeneralConfig
+from starkware.starknet.services.api.contract_definition import ContractDefinition
+from starkware.starkware_utils.error_handling import StarkException
+from starkware.storage.storage import FactCache, FactFetchingContext, Storage
+
+logger = logging.getLogger(__name__)
+
+# The maximal number of contract definitions kept by each worker process.
+MAX_CACHED_CONTRACT_DEFINITIONS = 256
+
+
+class ContractCallExecutorError(Exception):
+    """
+    Raised in a worker process when the process that owns a call fails to serve a request.
+    """
+
+
+@dataclasses.dataclass(frozen=True)
+class _CallContext:
+    """
+    What the owning process needs in order to serve the requests of a call.
+    """
+
+    storage: Storage
+    contract_states: MutableMapping[int, ContractCarriedState]
+    contract_definitions: Mapping[bytes, ContractDefinition]
+    loop: asyncio.AbstractEventLoop
+
+
+@dataclasses.dataclass(frozen=True)
+class _CarriedStateSnapshot:
+    """
+    The parts of a CarriedState that are sent to a worker process with a call. Only the states of
+    the called contract are sent; the states of other contracts, the contract definitions and the
+    contract storage are read on demand.
+    """
+
+    shared_state: SharedState
+    block_info: BlockInfo
+    # The addresses of all the contract states of the carried state.
+    contract_addresses: Set[int]
+    contract_states: Dict[int, ContractCarriedState]
+    contract_hashes: List[bytes]
+
+
+@dataclasses.dataclass(frozen=True)
+class _CallResult:
+    retdata: Optional[List[int]] = None
+    # The (code, message) of the StarkException raised by the call, if any.
+    error: Optional[Tuple[Any, Optional[str]]] = None
+
+
+class ProcessPoolCallExecutor:
+    """
+    Runs read-only contract calls (see InternalInvokeFunction.call()) in a persistent pool of worker
+    processes, so that concurrent calls are not serialized by the GIL.
+
+    A call is sent to a worker with the states of the called contract. The worker reads the other
+    contract states, the contract definitions and the storage (commitment tree facts) it needs from
+    the process that owns the state, through a connection it opens on startup, so the state is
+    never copied as a whole. Facts and contract definitions are immutable, so each worker keeps
+    them across calls. Changes made by a call (including those of internal calls) are discarded.
+    The worker processes are spawned (rather than forked), as this process runs other threads.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None):
+        """
+        n_workers - the number of worker processes. Defaults to the number of CPUs.
+        """
+        self.n_workers = n_workers
+        self.authkey = os.urandom(32)
+        self.listener = multiprocessing.connection.Listener(authkey=self.authkey)
+        # The calls in progress, by call id.
+        self.calls: Dict[int, _CallContext] = {}
+        self.call_ids = itertools.count()
+        threading.Thread(
+            target=self._accept_connections, name="contract_call_executor", daemon=True
+        ).start()
+
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.listener.address, self.authkey),
+        )
+        # Start the worker processes now, rather than on the first calls.
+        n_workers = n_workers if n_workers is not None else os.cpu_count() or 1
+        for _ in range(n_workers):
+            self.pool.submit(_warm_up)
+
+    async def call(
+        self, tx, state: CarriedState, general_config: StarknetGeneralConfig
+    ) -> List[int]:
+        """
+        Runs the given InternalInvokeFunction on the given state in a worker process.
+        Returns the return data. Unlike InternalInvokeFunction.call(), the state is not modified.
+        """
+        loop = asyncio.get_event_loop()
+        contract_states = {
+            contract_address: state.contract_states[contract_address]
+            for contract_address in (tx.contract_address, tx.code_address)
+        }
+        snapshot = _CarriedStateSnapshot(
+            shared_state=state.shared_state,
+            block_info=state.block_info,
+            contract_addresses=set(state.contract_states.keys()),
+            contract_states=contract_states,
+            contract_hashes=[
+                contract_hash
+                for contract_hash in {
+                    contract_state.state.contract_hash
+                    for contract_state in contract_states.values()
+                }
+                if contract_hash in state.contract_definitions
+            ],
+        )
+
+        call_id = next(self.call_ids)
+        self.calls[call_id] = _CallContext(
+            storage=state.ffc.storage,
+            contract_states=state.contract_states,
+            contract_definitions=state.contract_definitions,
+            loop=loop,
+        )
+        try:
+            result = await asyncio.wrap_future(
+                self.pool.submit(_run_call, call_id, tx, snapshot, general_config)
+            )
+        finally:
+            del self.calls[call_id]
+
+        if result.error is not None:
+            code, message = result.error
+            raise StarkException(code=code, message=message)
+        assert result.retdata is not None
+        return result.retdata
+
+    def close(self):
+        if _process_pool_call_executors.get(self.n_workers) is self:
+            del _process_pool_call_executors[self.n_workers]
+        self.pool.shutdown()
+        self.listener.close()
+
+    # Serving the requests of the worker processes.
+
+    def _accept_connections(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                # The listener was closed.
+                return
+            threading.Thread(
+                target=self._serve_connection,
+                args=(connection,),
+                name="contract_call_executor_connection",
+                daemon=True,
+            ).start()
+
+    def _serve_connection(self, connection: multiprocessing.connection.Connection):
+        with connection:
+            while True:
+                try:
+                    call_id, method, arg = connection.recv()
+                except EOFError:
+                    # The worker process exited.
+                    return
+                try:
+                    response = ("ok", self._handle_request(call_id=call_id, method=method, arg=arg))
+                except Exception as exception:
+                    logger.debug("Failed to serve a contract call request.", exc_info=True)
+                    response = ("error", f"{type(exception).__name__}: {exception}")
+                connection.send(response)
+
+    def _handle_request(self, call_id: int, method: str, arg: Any) -> Any:
+        context = self.calls[call_id]
+        if method == "mget":
+            return asyncio.run_coroutine_threadsafe(
+                coro=context.storage.mget(keys=arg), loop=context.loop
+            ).result()
+        if method == "contract_state":
+            return asyncio.run_coroutine_threadsafe(
+                coro=_get_item(mapping=context.contract_states, key=arg), loop=context.loop
+            ).result()
+        if method == "contract_definitions":
+            return [context.contract_definitions.get(contract_hash) for contract_hash in arg]
+        raise NotImplementedError(f"Unexpected request method: {method}.")
+
+
+async def _get_item(mapping: MutableMapping[Any, Any], key: Any) -> Optional[Any]:
+    """
+    Returns mapping[key], or None if the key is missing. Runs on the loop of the call, as the state
+    may be modified by its other tasks.
+    """
+    try:
+        return mapping[key]
+    except KeyError:
+        return None
+
+
+# The process pool contract call executors of this process, by number of workers.
+_process_pool_call_executors: Dict[Optional[int], ProcessPoolCallExecutor] = {}
+
+
+def get_process_pool_call_executor(n_workers: Optional[int] = None) -> ProcessPoolCallExecutor:
+    """
+    Returns the process pool contract call executor with the given number of workers, and creates
+    it on the first use (or after it is closed).
+    """
+    executor = _process_pool_call_executors.get(n_workers)
+    if executor is None:
+        executor = _process_pool_call_executors[n_workers] = ProcessPoolCallExecutor(
+            n_workers=n_workers
+        )
+    return executor
+
+
+# Worker processes.
+
+
+class _Worker:
+    """
+    The state of a worker process, kept across calls.
+    """
+
+    def __init__(self, connection: multiprocessing.connection.Connection):
+        self.connection = connection
+        self.lock = threading.Lock()
+        # The Cairo runs use this loop (running on a different thread) to read the storage.
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self.loop.run_forever, name="contract_call_worker_loop", daemon=True
+        ).start()
+        self.fact_cache = FactCache()
+        self.contract_definitions: cachetools.LRUCache[
+            bytes, ContractDefinition
+        ] = cachetools.LRUCache(maxsize=MAX_CACHED_CONTRACT_DEFINITIONS)
+
+    def request(self, call_id: int, method: str, arg: Any) -> Any:
+        """
+        Sends a request to the process that owns the call, and returns the response.
+        """
+        with self.lock:
+            self.connection.send((call_id, method, arg))
+            status, value = self.connection.recv()
+        if status != "ok":
+            raise ContractCallExecutorError(value)
+        return value
+
+    def get_contract_definitions(
+        self, call_id: int, contract_hashes: Sequence[bytes]
+    ) -> Dict[bytes, ContractDefinition]:
+        """
+        Returns the given contract definitions, omitting those unknown to the process that owns the
+        call.
+        """
+        missing_hashes = [
+            contract_hash
+            for contract_hash in contract_hashes
+            if contract_hash not in self.contract_definitions
+        ]
+        if len(missing_hashes) > 0:
+            for contract_hash, contract_definition in zip(
+                missing_hashes,
+                self.request(call_id=call_id, method="contract_definitions", arg=missing_hashes),
+            ):
+                if contract_definition is not None:
+                    self.contract_definitions[contract_hash] = contract_definition
+        return {
+            contract_hash: self.contract_definitions[contract_hash]
+            for contract_hash in contract_hashes
+            if contract_hash in self.contract_definitions
+        }
+
+
+class _ProxyContractStates(MutableMapping[int, ContractCarriedState]):
+    """
+    The contract states of a call in a worker process. Contains the contract addresses of the
+    carried state of the call; the states missing from the snapshot are read from the process that
+    owns the call on their first access.
+    """
+
+    def __init__(self, worker: _Worker, call_id: int, snapshot: _CarriedStateSnapshot):
+        self.worker = worker
+        self.call_id = call_id
+        self.contract_addresses = set(snapshot.contract_addresses)
+        # The contract states read so far.
+        self.contract_states = dict(snapshot.contract_states)
+
+    def __getitem__(self, contract_address: int) -> ContractCarriedState:
+        if contract_address not in self.contract_states:
+            if contract_address not in self.contract_addresses:
+                raise KeyError(contract_address)
+            contract_state = self.worker.request(
+                call_id=self.call_id, method="contract_state", arg=contract_address
+            )
+            if contract_state is None:
+                raise KeyError(contract_address)
+            self.contract_states[contract_address] = contract_state
+        return self.contract_states[contract_address]
+
+    def __setitem__(self, contract_address: int, contract_state: ContractCarriedState):
+        self.contract_addresses.add(contract_address)
+        self.contract_states[contract_address] = contract_state
+
+    def __delitem__(self, contract_address: int):
+        self.contract_addresses.remove(contract_address)
+        self.contract_states.pop(contract_address, None)
+
+    def __contains__(self, contract_address: object) -> bool:
+        return contract_address in self.contract_addresses
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.contract_addresses)
+
+    def __len__(self) -> int:
+        return len(self.contract_addresses)
+
+
+class _ProxyContractDefinitions(Dict[bytes, ContractDefinition]):
+    """
+    The contract definitions of a call in a worker process. The definitions are read from the
+    cache of the worker, or from the process that owns the call, on their first access.
+    """
+
+    def __init__(
+        self, worker: _Worker, call_id: int, contract_definitions: Dict[bytes, ContractDefinition]
+    ):
+        super().__init__(contract_definitions)
+        self.worker = worker
+        self.call_id = call_id
+
+    def __missing__(self, contract_hash: bytes) -> ContractDefinition:
+        contract_definitions = self.worker.get_contract_definitions(
+            call_id=self.call_id, contract_hashes=[contract_hash]
+        )
+        if contract_hash not in contract_definitions:
+            raise KeyError(contract_hash)
+        contract_definition = self[contract_hash] = contract_definitions[contract_hash]
+        return contract_definition
+
+
+class _ProxyStorage(Storage):
+    """
+    The storage of a call in a worker process. Reads are served by the process that owns the call;
+    writes are kept locally.
+    """
+
+    def __init__(self, worker: _Worker, call_id: int):
+        self.worker = worker
+        self.call_id = call_id
+        # A value of None marks a deleted key.
+        self.local_values: Dict[bytes, Optional[bytes]] = {}
+
+    async def set_value(self, key: bytes, value: bytes):
+        self.local_values[key] = value
+
+    async def del_value(self, key: bytes):
+        self.local_values[key] = None
+
+    async def get_value(self, key: bytes) -> Optional[bytes]:
+        (value,) = await self.mget(keys=[key])
+        return value
+
+    async def mget(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        keys_to_read = [key for key in keys if key not in self.local_values]
+        values = (
+            dict(
+                zip(
+                    keys_to_read,
+                    self.worker.request(call_id=self.call_id, method="mget", arg=keys_to_read),
+                )
+            )
+            if len(keys_to_read) > 0
+            else {}
+        )
+        return tuple(
+            self.local_values[key] if key in self.local_values else values[key] for key in keys
+        )
+
+
+# The state of this process, if it is a worker process.
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(address, authkey: bytes):
+    global _worker
+    _worker = _Worker(connection=multiprocessing.connection.Client(address, authkey=authkey))
+
+
+def _warm_up():
+    pass
+
+
+def _run_call(
+    call_id: int,
+    tx,
+    snapshot: _CarriedStateSnapshot,
+    general_config: StarknetGeneralConfig,
+) -> _CallResult:
+    """
+    Runs a call in a worker process. See ProcessPoolCallExecutor.call().
+    """
+    worker = _worker
+    assert worker is not None, "Calls must run in a worker process."
+
+    ffc = FactFetchingContext(
+        storage=_ProxyStorage(worker=worker, call_id=call_id),
+        hash_func=pedersen_hash_func,
+        fact_cache=worker.fact_cache,
+    )
+    state = CarriedState.from_contracts(
+        shared_state=snapshot.shared_state,
+        ffc=ffc,
+        contract_definitions=_ProxyContractDefinitions(
+            worker=worker,
+            call_id=call_id,
+            contract_definitions=worker.get_contract_definitions(
+                call_id=call_id, contract_hashes=snapshot.contract_hashes
+            ),
+        ),
+        contract_states=_ProxyContractStates(worker=worker, call_id=call_id, snapshot=snapshot),
+    )
+    state.block_info = snapshot.block_info
+
+    try:
+        retdata = tx._synchronous_call(state=state, general_config=general_config, loop=worker.loop)
+    except StarkException as exception:
+        return _CallResult(error=(exception.code, exception.message))
+    return _CallResult(retdata=retdata)
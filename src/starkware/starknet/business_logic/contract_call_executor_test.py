@@ -0,0 +1,149 @@
+import os
+from typing import Iterator
+
+import pytest
+
+from starkware.starknet.business_logic.contract_call_executor import (
+    ProcessPoolCallExecutor,
+    get_process_pool_call_executor,
+)
+from starkware.starknet.business_logic.internal_transaction import InternalInvokeFunction
+from starkware.starknet.compiler.compile import compile_starknet_files
+from starkware.starknet.definitions.error_codes import StarknetErrorCode
+from starkware.starknet.definitions.general_config import (
+    ContractCallExecutorType,
+    StarknetGeneralConfig,
+)
+from starkware.starknet.public.abi import get_selector_from_name
+from starkware.starknet.services.api.contract_definition import EntryPointType
+from starkware.starknet.testing.state import StarknetState
+from starkware.starkware_utils.error_handling import StarkException
+
+CONTRACT_FILE = os.path.join(os.path.dirname(__file__), "..", "testing", "test.cairo")
+
+
+@pytest.fixture(scope="module")
+def executor() -> Iterator[ProcessPoolCallExecutor]:
+    executor = get_process_pool_call_executor(n_workers=2)
+    yield executor
+    executor.close()
+
+
+def create_tx(
+    general_config: StarknetGeneralConfig, contract_address: int, name: str, calldata
+) -> InternalInvokeFunction:
+    return InternalInvokeFunction.create(
+        general_config=general_config,
+        contract_address=contract_address,
+        entry_point_selector=get_selector_from_name(name),
+        entry_point_type=EntryPointType.EXTERNAL,
+        calldata=calldata,
+        signature=[],
+        caller_address=0,
+        nonce=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_process_pool_call(executor: ProcessPoolCallExecutor):
+    thread_config = StarknetGeneralConfig()
+    process_pool_config = StarknetGeneralConfig.load(
+        data={
+            **thread_config.dump(),
+            "contract_call_executor": ContractCallExecutorType.PROCESS_POOL.name,
+            "n_contract_call_workers": 2,
+        }
+    )
+    assert process_pool_config.contract_call_executor is ContractCallExecutorType.PROCESS_POOL
+    starknet = await StarknetState.empty(general_config=thread_config)
+    contract_definition = compile_starknet_files(files=[CONTRACT_FILE])
+    contract_address, _ = await starknet.deploy(
+        contract_definition=contract_definition, constructor_calldata=[]
+    )
+    other_contract_address, _ = await starknet.deploy(
+        contract_definition=contract_definition, constructor_calldata=[]
+    )
+    await starknet.invoke_raw(
+        contract_address=contract_address,
+        selector="increase_value",
+        calldata=[100, 5],
+        caller_address=0,
+    )
+
+    get_value_tx = create_tx(
+        general_config=thread_config,
+        contract_address=contract_address,
+        name="get_value",
+        calldata=[100],
+    )
+    assert await get_value_tx.call(state=starknet.state, general_config=thread_config) == [5]
+    for _ in range(3):
+        assert await get_value_tx.call(
+            state=starknet.state, general_config=process_pool_config
+        ) == [5]
+
+    # The changes made by a call, including those of internal calls, are discarded.
+    call_increase_value_tx = create_tx(
+        general_config=thread_config,
+        contract_address=other_contract_address,
+        name="call_increase_value",
+        calldata=[contract_address, 100, 1],
+    )
+    assert (
+        await call_increase_value_tx.call(state=starknet.state, general_config=process_pool_config)
+        == []
+    )
+    assert await get_value_tx.call(state=starknet.state, general_config=process_pool_config) == [5]
+
+    # Errors are raised in the calling process.
+    missing_entry_point_tx = create_tx(
+        general_config=thread_config,
+        contract_address=contract_address,
+        name="missing_entry_point",
+        calldata=[],
+    )
+    with pytest.raises(StarkException) as exception:
+        await missing_entry_point_tx.call(state=starknet.state, general_config=process_pool_config)
+    assert exception.value.code is StarknetErrorCode.ENTRY_POINT_NOT_FOUND_IN_CONTRACT
+
+    # The states of the contracts called by internal calls are read on demand, and behave as in
+    # the calling process.
+    call_uninitialized_contract_tx = create_tx(
+        general_config=thread_config,
+        contract_address=other_contract_address,
+        name="call_increase_value",
+        calldata=[contract_address + 1, 100, 1],
+    )
+    for general_config in (process_pool_config, thread_config):
+        with pytest.raises(StarkException) as exception:
+            await call_uninitialized_contract_tx.call(
+                state=starknet.copy().state, general_config=general_config
+            )
+        assert exception.value.code is StarknetErrorCode.UNINITIALIZED_CONTRACT
+
+
+@pytest.mark.asyncio
+async def test_closed_executor_is_replaced():
+    config = StarknetGeneralConfig.load(
+        data={
+            **StarknetGeneralConfig().dump(),
+            "contract_call_executor": ContractCallExecutorType.PROCESS_POOL.name,
+            "n_contract_call_workers": 1,
+        }
+    )
+    starknet = await StarknetState.empty(general_config=config)
+    contract_address, _ = await starknet.deploy(
+        contract_definition=compile_starknet_files(files=[CONTRACT_FILE]), constructor_calldata=[]
+    )
+    get_value_tx = create_tx(
+        general_config=config, contract_address=contract_address, name="get_value", calldata=[100]
+    )
+
+    executor = get_process_pool_call_executor(n_workers=1)
+    executor.close()
+    new_executor = get_process_pool_call_executor(n_workers=1)
+    assert new_executor is not executor
+    try:
+        assert await get_value_tx.call(state=starknet.state, general_config=config) == [0]
+    finally:
+        new_executor.close()
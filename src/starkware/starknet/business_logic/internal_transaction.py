@@ -19,6 +19,7 @@ from starkware.cairo.lang.vm.relocatable import RelocatableValue
 from starkware.cairo.lang.vm.security import SecurityError
 from starkware.cairo.lang.vm.utils import ResourcesError
 from starkware.cairo.lang.vm.vm_exceptions import HintException, VmException, VmExceptionBase
+from starkware.starknet.business_logic.contract_call_executor import get_process_pool_call_executor
 from starkware.starknet.business_logic.internal_transaction_interface import (
     InternalStateTransaction,
 )
@@ -36,7 +37,10 @@ from starkware.starknet.business_logic.transaction_execution_objects import (
 from starkware.starknet.core.os import os_utils, syscall_utils
 from starkware.starknet.definitions import fields
 from starkware.starknet.definitions.error_codes import StarknetErrorCode
-from starkware.starknet.definitions.general_config import StarknetGeneralConfig
+from starkware.starknet.definitions.general_config import (
+    ContractCallExecutorType,
+    StarknetGeneralConfig,
+)
 from starkware.starknet.definitions.transaction_type import TransactionType
 from starkware.starknet.public.abi import (
     DEFAULT_ENTRY_POINT_SELECTOR,
@@ -684,6 +688,14 @@ class InternalInvokeFunction(InternalTransaction):
             pending_modifications=pre_run_contract_carried_state.storage_updates.copy(),
             loop=loop,
         )
+        if general_config.enable_storage_prefetching:
+            # Start reading the storage addresses that recent executions of this entry point read.
+            starknet_storage.prefetch(
+                addresses=state.storage_access_profiles.get(
+                    contract_hash=code_contract_state.contract_hash,
+                    entry_point_selector=self.entry_point_selector,
+                )
+            )
 
         initial_syscall_ptr = cast(RelocatableValue, os_context[SYSCALL_PTR_OFFSET])
         syscall_handler = syscall_utils.BusinessLogicSysCallHandler(
@@ -752,6 +764,13 @@ class InternalInvokeFunction(InternalTransaction):
                 message="Got an unexpected exception during the execution of the transaction.",
             )
 
+        if general_config.enable_storage_prefetching:
+            state.storage_access_profiles.update(
+                contract_hash=code_contract_state.contract_hash,
+                entry_point_selector=self.entry_point_selector,
+                addresses=starknet_storage.accessed_addresses,
+            )
+
         # Complete handler validations.
         os_utils.validate_and_process_os_context(
             runner=runner,
@@ -807,13 +826,35 @@ class InternalInvokeFunction(InternalTransaction):
         Runs the selected entry point with the given calldata in the contract specified by the
         transaction.
         Returns the return data.
-        Note that this function modifies the state.
+        Note that this function modifies the state, unless the call runs in a worker process (see
+        StarknetGeneralConfig.contract_call_executor).
         """
+        if general_config.contract_call_executor is ContractCallExecutorType.PROCESS_POOL:
+            executor = get_process_pool_call_executor(
+                n_workers=general_config.n_contract_call_workers
+            )
+            return await executor.call(tx=self, state=state, general_config=general_config)
+
         # Pass the running loop before entering to it. It will be used to run asynchronous
         # tasks, such as fetching data from storage.
         loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
-        _run = functools.partial(
-            self._run,
+        _synchronous_call = functools.partial(
+            self._synchronous_call, state=state, general_config=general_config, loop=loop
+        )
+
+        return await loop.run_in_executor(executor=None, func=_synchronous_call)
+
+    def _synchronous_call(
+        self,
+        state: CarriedState,
+        general_config: StarknetGeneralConfig,
+        loop: asyncio.AbstractEventLoop,
+    ) -> List[int]:
+        """
+        The synchronous part of call(). Also runs in the worker processes of the PROCESS_POOL
+        contract call executor.
+        """
+        runner, _ = self._run(
             state=state,
             general_config=general_config,
             loop=loop,
@@ -822,8 +863,6 @@ class InternalInvokeFunction(InternalTransaction):
                 n_steps=general_config.invoke_tx_max_n_steps
             ),
         )
-
-        runner, _ = await loop.run_in_executor(executor=None, func=_run)
         return self._get_return_values(runner=runner)
 
     def _get_return_values(self, runner: CairoFunctionRunner) -> List[int]:
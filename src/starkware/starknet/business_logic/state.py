@@ -1,8 +1,7 @@
 import copy
 import dataclasses
 import logging
-import typing
-from collections import ChainMap, defaultdict
+from collections import defaultdict
 from dataclasses import field
 from typing import Dict, MutableMapping, Optional, Set, Tuple
 
@@ -14,13 +13,13 @@ from services.everest.business_logic.state import (
     StateSelectorBase,
 )
 from starkware.cairo.lang.vm.cairo_pie import ExecutionResources
-from starkware.python.utils import gather_in_chunks, safe_zip
+from starkware.python.utils import LayeredDict, gather_in_chunks, safe_zip
 from starkware.starknet.business_logic.state_objects import ContractCarriedState, ContractState
 from starkware.starknet.definitions import fields
 from starkware.starknet.definitions.error_codes import StarknetErrorCode
 from starkware.starknet.definitions.general_config import StarknetGeneralConfig
 from starkware.starknet.services.api.contract_definition import ContractDefinition
-from starkware.starknet.storage.starknet_storage import StorageLeaf
+from starkware.starknet.storage.starknet_storage import StorageAccessProfiles, StorageLeaf
 from starkware.starkware_utils.commitment_tree.binary_fact_tree import BinaryFactDict
 from starkware.starkware_utils.commitment_tree.patricia_tree.patricia_tree import PatriciaTree
 from starkware.starkware_utils.config_base import Config
@@ -32,7 +31,7 @@ logger = logging.getLogger(__name__)
 state_objects_logger = logging.getLogger(f"{__name__}:state_objects_logger")
 
 ContractCarriedStateMapping = MutableMapping[int, ContractCarriedState]
-ContractCarriedStateChainMapping = typing.ChainMap[int, ContractCarriedState]
+ContractCarriedStateLayeredMapping = LayeredDict[int, ContractCarriedState]
 
 
 @marshmallow_dataclass.dataclass(frozen=True)
@@ -113,12 +112,13 @@ class CarriedState(CarriedStateBase):
         parent_state: Optional["CarriedState"],
         shared_state: "SharedState",
         ffc: FactFetchingContext,
-        contract_definitions: typing.ChainMap[bytes, ContractDefinition],
-        contract_states: ContractCarriedStateChainMapping,
+        contract_definitions: LayeredDict[bytes, ContractDefinition],
+        contract_states: ContractCarriedStateLayeredMapping,
         cairo_usage: ExecutionResources,
-        contract_address_to_n_storage_writings: typing.ChainMap[int, int],
+        contract_address_to_n_storage_writings: LayeredDict[int, int],
         block_info: BlockInfo,
-        syscall_counter: typing.ChainMap[str, int],
+        syscall_counter: LayeredDict[str, int],
+        storage_access_profiles: StorageAccessProfiles,
     ):
         """
         Private constructor.
@@ -150,6 +150,15 @@ class CarriedState(CarriedStateBase):
         # A mapping from system call to the cumulative times it was invoked.
         self.syscall_counter = syscall_counter
 
+        # The storage addresses read by recent executions of each contract entry point, used to
+        # prefetch them if general_config.enable_storage_prefetching is set. Shared with the
+        # child states, as the profiles are only hints and need not be reverted.
+        self.storage_access_profiles = storage_access_profiles
+
+        # The addresses of the contracts whose storage_updates dict was created by this state (or
+        # by a child state applied to it), and hence may be updated in place.
+        self.contracts_with_owned_storage_updates: Set[int] = set()
+
     @classmethod
     def _create_from_parent_state(cls, parent_state: "CarriedState") -> "CarriedState":
         """
@@ -167,6 +176,7 @@ class CarriedState(CarriedStateBase):
             ),
             block_info=parent_state.block_info,
             syscall_counter=parent_state.syscall_counter.new_child(),
+            storage_access_profiles=parent_state.storage_access_profiles,
         )
 
         return carried_state
@@ -183,12 +193,13 @@ class CarriedState(CarriedStateBase):
             parent_state=None,
             ffc=ffc,
             shared_state=shared_state,
-            contract_definitions=ChainMap(),
-            contract_states=ChainMap(),
+            contract_definitions=LayeredDict(),
+            contract_states=LayeredDict(),
             cairo_usage=ExecutionResources.empty(),
-            contract_address_to_n_storage_writings=ChainMap(),
+            contract_address_to_n_storage_writings=LayeredDict(),
             block_info=shared_state.block_info,
-            syscall_counter=ChainMap(),
+            syscall_counter=LayeredDict(),
+            storage_access_profiles=StorageAccessProfiles(),
         )
 
     @classmethod
@@ -238,12 +249,13 @@ class CarriedState(CarriedStateBase):
             parent_state=None,
             ffc=ffc,
             shared_state=shared_state,
-            contract_definitions=ChainMap(contract_definitions),
-            contract_states=ChainMap(contract_states),
+            contract_definitions=LayeredDict(contract_definitions),
+            contract_states=LayeredDict(contract_states),
             cairo_usage=ExecutionResources.empty(),
-            contract_address_to_n_storage_writings=ChainMap(),
+            contract_address_to_n_storage_writings=LayeredDict(),
             block_info=shared_state.block_info,
-            syscall_counter=ChainMap(),
+            syscall_counter=LayeredDict(),
+            storage_access_profiles=StorageAccessProfiles(),
         )
 
     @property
@@ -276,6 +288,11 @@ class CarriedState(CarriedStateBase):
         Applies the given storage modifications to the given contract storage.
         """
         contract_carried_state = self.contract_states[contract_address]
+        if contract_address in self.contracts_with_owned_storage_updates:
+            # The storage updates are not shared with the parent state; update them in place.
+            contract_carried_state.storage_updates.update(modifications)
+            return
+
         self.contract_states[contract_address] = dataclasses.replace(
             contract_carried_state,
             storage_updates={
@@ -283,6 +300,7 @@ class CarriedState(CarriedStateBase):
                 **modifications,
             },
         )
+        self.contracts_with_owned_storage_updates.add(contract_address)
 
     def subtract_merkle_facts(self, previous_state: "CarriedState") -> "CarriedState":
         """
@@ -292,7 +310,7 @@ class CarriedState(CarriedStateBase):
         raise NotImplementedError
 
     @property
-    def chain_maps(self) -> Tuple[typing.ChainMap, ...]:
+    def layered_dicts(self) -> Tuple[LayeredDict, ...]:
         return (
             self.contract_states,
             self.contract_definitions,
@@ -300,17 +318,15 @@ class CarriedState(CarriedStateBase):
             self.syscall_counter,
         )
 
-    def _validate_references_of_chain_maps(self):
+    def _validate_references_of_layered_dicts(self):
         assert self.parent_state is not None
-        for child_chain_map, parent_chain_map in zip(self.chain_maps, self.parent_state.chain_maps):
-            # Verify that the child's parent maps are all references to its (expected) parent maps.
-            assert all(
-                child_map is parent_map
-                # safe_zip also verifies that the lists are of the same length.
-                for child_map, parent_map in safe_zip(
-                    child_chain_map.parents.maps, parent_chain_map.maps
-                )
-            ), "Child ChainMap does not hold a reference to its parent."
+        # Verify that the child's layers are opened on top of its (expected) parent's layers.
+        assert all(
+            child_dict.parent is parent_dict
+            for child_dict, parent_dict in safe_zip(
+                self.layered_dicts, self.parent_state.layered_dicts
+            )
+        ), "Child LayeredDict is not a layer of its parent."
 
     def _apply(self):
         """
@@ -318,16 +334,30 @@ class CarriedState(CarriedStateBase):
         This method should not be directly used; use copy_and_apply instead.
         """
         assert self.parent_state is not None
-        self._validate_references_of_chain_maps()
+        self._validate_references_of_layered_dicts()
 
         # Apply state updates.
         self.parent_state.cairo_usage = self.cairo_usage
-        for child_chain_map, parent_chain_map in zip(self.chain_maps, self.parent_state.chain_maps):
-            parent_chain_map.update(child_chain_map.maps[0])
+        for layered_dict in self.layered_dicts:
+            layered_dict.apply_to_parent()
+        self.parent_state.contracts_with_owned_storage_updates.update(
+            self.contracts_with_owned_storage_updates
+        )
 
         # Update additional entire block-related information.
         self.parent_state.block_info = self.block_info
 
+    def _discard(self):
+        """
+        Reverts the state updates made on self, leaving self.parent_state unchanged.
+        This method should not be directly used; use copy_and_apply instead.
+        """
+        assert self.parent_state is not None
+        self._validate_references_of_layered_dicts()
+
+        for layered_dict in self.layered_dicts:
+            layered_dict.discard()
+
 
 @marshmallow_dataclass.dataclass(frozen=True)
 class SharedState(SharedStateBase):
@@ -425,8 +455,8 @@ class SharedState(SharedStateBase):
                 for contract_state in current_carried_state.contract_states.values()
             )
         )
-        contract_states = ChainMap(
-            dict(safe_zip(current_carried_state.contract_states.keys(), updated_contract_states))
+        contract_states = dict(
+            safe_zip(current_carried_state.contract_states.keys(), updated_contract_states)
         )
 
         # Apply changes.
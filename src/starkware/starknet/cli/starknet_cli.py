@@ -474,27 +474,52 @@ async def get_transaction(args, command_args):
         description="Outputs the transaction information given its ID."
     )
     parser.add_argument(
-        "--hash", type=str, required=True, help="The hash of the transaction to query."
+        "--hash",
+        type=str,
+        nargs="+",
+        required=True,
+        help=(
+            "The hash of the transaction to query. "
+            "If more than one hash is given, a list of the transactions is output."
+        ),
     )
     parser.parse_args(command_args, namespace=args)
 
     feeder_gateway_client = get_feeder_gateway_client(args)
 
-    tx_info_as_dict = await feeder_gateway_client.get_transaction(tx_hash=args.hash)
-    print(json.dumps(tx_info_as_dict, indent=4, sort_keys=True))
+    tx_infos = await feeder_gateway_client.get_transactions(tx_hashes=args.hash)
+    print_json_objects(json_objects=tx_infos)
 
 
 async def get_transaction_receipt(args, command_args):
     parser = argparse.ArgumentParser(description="Outputs the transaction receipt given its ID.")
     parser.add_argument(
-        "--hash", type=str, required=True, help="The hash of the transaction to query."
+        "--hash",
+        type=str,
+        nargs="+",
+        required=True,
+        help=(
+            "The hash of the transaction to query. "
+            "If more than one hash is given, a list of the receipts is output."
+        ),
     )
     parser.parse_args(command_args, namespace=args)
 
     feeder_gateway_client = get_feeder_gateway_client(args)
 
-    tx_receipt_as_dict = await feeder_gateway_client.get_transaction_receipt(tx_hash=args.hash)
-    print(json.dumps(tx_receipt_as_dict, indent=4, sort_keys=True))
+    tx_receipts = await feeder_gateway_client.get_transaction_receipts(tx_hashes=args.hash)
+    print_json_objects(json_objects=tx_receipts)
+
+
+def print_json_objects(json_objects: List[Any]):
+    """
+    Prints the given object if there is only one, and the list of objects otherwise.
+    """
+    print(
+        json.dumps(
+            json_objects[0] if len(json_objects) == 1 else json_objects, indent=4, sort_keys=True
+        )
+    )
 
 
 def handle_network_param(args):
@@ -6,15 +6,19 @@ from typing import Dict, List, Optional, Tuple
 from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
 from starkware.cairo.lang.compiler.assembler import assemble
 from starkware.cairo.lang.compiler.cairo_compile import (
+    BatchCompilationError,
     cairo_compile_add_common_args,
+    cairo_compile_batch,
     cairo_compile_common,
     compile_cairo_ex,
     get_codes,
+    get_module_cache,
     get_module_reader,
 )
 from starkware.cairo.lang.compiler.error_handling import LocationError
 from starkware.cairo.lang.compiler.identifier_definition import FunctionDefinition
 from starkware.cairo.lang.compiler.identifier_manager import IdentifierScope, MissingIdentifierError
+from starkware.cairo.lang.compiler.module_cache import ModuleCache
 from starkware.cairo.lang.compiler.module_reader import ModuleReader
 from starkware.cairo.lang.compiler.preprocessor.pass_manager import PassManager
 from starkware.cairo.lang.compiler.program import Program
@@ -99,12 +103,14 @@ def compile_starknet_files(
     debug_info: bool = False,
     disable_hint_validation: bool = False,
     cairo_path: Optional[List[str]] = None,
+    module_cache: Optional[ModuleCache] = None,
 ) -> ContractDefinition:
     return compile_starknet_codes(
         codes=get_codes(files),
         debug_info=debug_info,
         disable_hint_validation=disable_hint_validation,
         cairo_path=cairo_path,
+        module_cache=module_cache,
     )
 
 
@@ -113,6 +119,7 @@ def compile_starknet_codes(
     debug_info: bool = False,
     disable_hint_validation: bool = False,
     cairo_path: Optional[List[str]] = None,
+    module_cache: Optional[ModuleCache] = None,
 ) -> ContractDefinition:
     if cairo_path is None:
         cairo_path = []
@@ -122,6 +129,7 @@ def compile_starknet_codes(
         prime=DEFAULT_PRIME,
         read_module=module_reader.read,
         disable_hint_validation=disable_hint_validation,
+        module_cache=module_cache,
     )
 
     program, preprocessed = compile_cairo_ex(
@@ -161,6 +169,30 @@ def assemble_starknet_contract(
     )
 
 
+def starknet_pass_manager_factory(
+    args: argparse.Namespace, module_reader: ModuleReader
+) -> PassManager:
+    return starknet_pass_manager(
+        prime=args.prime,
+        read_module=module_reader.read,
+        disable_hint_validation=args.disable_hint_validation,
+        module_cache=get_module_cache(args),
+    )
+
+
+def starknet_compile_from_args(args: argparse.Namespace) -> StarknetPreprocessedProgram:
+    preprocessed = cairo_compile_common(
+        args=args,
+        pass_manager_factory=starknet_pass_manager_factory,
+        assemble_func=assemble_starknet_contract,
+    )
+    assert isinstance(preprocessed, StarknetPreprocessedProgram)
+    if args.abi is not None:
+        json.dump(preprocessed.abi, args.abi, indent=4, sort_keys=True)
+        args.abi.write("\n")
+    return preprocessed
+
+
 def main():
     parser = argparse.ArgumentParser(description="A tool to compile StarkNet contracts.")
     parser.add_argument("--abi", type=argparse.FileType("w"), help="Output the contract's ABI.")
@@ -168,28 +200,23 @@ def main():
         "--disable_hint_validation", action="store_true", help="Disable the hint validation."
     )
 
-    def pass_manager_factory(args: argparse.Namespace, module_reader: ModuleReader) -> PassManager:
-        return starknet_pass_manager(
-            prime=args.prime,
-            read_module=module_reader.read,
-            disable_hint_validation=args.disable_hint_validation,
-        )
-
     try:
         cairo_compile_add_common_args(parser)
         args = parser.parse_args()
-        preprocessed = cairo_compile_common(
-            args=args,
-            pass_manager_factory=pass_manager_factory,
-            assemble_func=assemble_starknet_contract,
-        )
-        assert isinstance(preprocessed, StarknetPreprocessedProgram)
-        if args.abi is not None:
-            json.dump(preprocessed.abi, args.abi, indent=4, sort_keys=True)
-            args.abi.write("\n")
+        if args.batch is not None:
+            results = cairo_compile_batch(
+                args=args, compile_func=starknet_compile_from_args, output_args=("output", "abi")
+            )
+            return 0 if all(result.error is None for result in results) else 1
+        if len(args.files) == 0:
+            parser.error("At least one file (or --batch) must be given.")
+        starknet_compile_from_args(args)
     except LocationError as err:
         print(err, file=sys.stderr)
         return 1
+    except BatchCompilationError as err:
+        print(f"Error: {err}", file=sys.stderr)
+        return 1
     return 0
 
 
@@ -1,5 +1,6 @@
-from typing import Callable, Tuple
+from typing import Callable, Optional, Tuple
 
+from starkware.cairo.lang.compiler.module_cache import ModuleCache
 from starkware.cairo.lang.compiler.preprocessor.default_pass_manager import (
     ModuleCollector,
     default_pass_manager,
@@ -28,6 +29,7 @@ def starknet_pass_manager(
     read_module: Callable[[str], Tuple[str, str]],
     opt_unused_functions: bool = True,
     disable_hint_validation: bool = False,
+    module_cache: Optional[ModuleCache] = None,
 ) -> PassManager:
     hint_whitelist = None if disable_hint_validation else get_hints_whitelist()
     manager = default_pass_manager(
@@ -37,6 +39,7 @@ def starknet_pass_manager(
         opt_unused_functions=opt_unused_functions,
         preprocessor_kwargs=dict(hint_whitelist=hint_whitelist),
         additional_scopes_to_compile={WRAPPER_SCOPE},
+        module_cache=module_cache,
     )
     # Use ModuleCollector.additional_modules to import necessary modules, whose import line
     # may be added after the module_collector phase.
@@ -52,6 +55,7 @@ def starknet_pass_manager(
                 "starkware.starknet.common.storage",
                 "starkware.starknet.common.syscalls",
             ],
+            module_cache=module_cache,
         ),
     )
 
@@ -2,7 +2,9 @@ import dataclasses
 import itertools
 import json
 import os
-from typing import Callable, List
+from typing import Callable, Iterable, List
+
+import cachetools
 
 from starkware.cairo.common.cairo_function_runner import CairoFunctionRunner
 from starkware.cairo.common.structs import CairoStructFactory, CairoStructProxy
@@ -21,6 +23,7 @@ from starkware.starknet.services.api.contract_definition import ContractDefiniti
 CAIRO_FILE = os.path.join(os.path.dirname(__file__), "contracts.cairo")
 
 
+@cachetools.cached(cache={})
 def load_program() -> Program:
     return compile_cairo_files(
         [CAIRO_FILE],
@@ -55,6 +58,20 @@ def compute_contract_hash(
     return contract_hash
 
 
+def compute_contract_hashes(
+    contract_definitions: Iterable[ContractDefinition],
+    hash_func: Callable[[int, int], int] = pedersen_hash,
+) -> List[int]:
+    """
+    Computes the hashes of the given contract definitions, in order.
+    The contracts program is compiled once and shared by all the computations.
+    """
+    return [
+        compute_contract_hash(contract_definition=contract_definition, hash_func=hash_func)
+        for contract_definition in contract_definitions
+    ]
+
+
 def compute_hinted_contract_definition_hash(contract_definition: ContractDefinition) -> int:
     """
     Computes the hash of the contract definition, including hints.
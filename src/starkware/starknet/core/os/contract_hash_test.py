@@ -0,0 +1,83 @@
+import os
+
+import cachetools
+import pytest
+
+from starkware.starknet.compiler.compile import compile_starknet_codes
+from starkware.starknet.core.os import contract_hash
+from starkware.starknet.core.os.contract_hash import (
+    compute_contract_hash,
+    compute_contract_hashes,
+    load_program,
+)
+from starkware.starknet.services.api.contract_definition import ContractDefinition
+
+# The compiled CODE below, and its hash.
+TEST_CONTRACT_FILE = os.path.join(os.path.dirname(__file__), "test_contract.json")
+TEST_CONTRACT_HASH = 0xCCA6A1DB25659AB23867C58C0959ABBF1A01D682C78F9E56D9E444E5B0C804
+
+CODE = """
+%lang starknet
+
+@external
+func foo(x : felt) -> (y : felt):
+    return (y=x)
+end
+
+@external
+func bar() -> ():
+    return ()
+end
+"""
+
+
+@pytest.fixture(scope="module")
+def contract_definition() -> ContractDefinition:
+    return compile_starknet_codes(codes=[(CODE, "contract.cairo")], debug_info=False)
+
+
+def test_load_program_is_cached():
+    assert load_program() is load_program()
+
+
+def test_compute_contract_hash():
+    with open(TEST_CONTRACT_FILE) as fp:
+        contract_definition = ContractDefinition.loads(fp.read())
+    assert compute_contract_hash(contract_definition=contract_definition) == TEST_CONTRACT_HASH
+    assert compute_contract_hashes(contract_definitions=[contract_definition]) == [
+        TEST_CONTRACT_HASH
+    ]
+
+
+def test_compute_contract_hashes_compiles_once(
+    monkeypatch, contract_definition: ContractDefinition
+):
+    compile_calls = []
+
+    def compile_cairo_files(*args, **kwargs):
+        compile_calls.append(args)
+        return original_compile_cairo_files(*args, **kwargs)
+
+    original_compile_cairo_files = contract_hash.compile_cairo_files
+    monkeypatch.setattr(contract_hash, "compile_cairo_files", compile_cairo_files)
+    # Start from an empty cache.
+    monkeypatch.setattr(
+        contract_hash, "load_program", cachetools.cached(cache={})(load_program.__wrapped__)
+    )
+
+    compute_contract_hashes(contract_definitions=[contract_definition] * 3)
+    compute_contract_hash(contract_definition=contract_definition)
+    assert len(compile_calls) == 1
+
+
+def test_compute_contract_hashes(contract_definition: ContractDefinition):
+    other_contract_definition = compile_starknet_codes(
+        codes=[(CODE.replace("bar", "baz"), "contract.cairo")], debug_info=False
+    )
+    contract_definitions = [contract_definition, other_contract_definition, contract_definition]
+    expected_hashes = [
+        compute_contract_hash(contract_definition=definition) for definition in contract_definitions
+    ]
+    assert expected_hashes[0] != expected_hashes[1]
+    assert compute_contract_hashes(contract_definitions=contract_definitions) == expected_hashes
+    assert compute_contract_hashes(contract_definitions=[]) == []
@@ -1,5 +1,6 @@
 from dataclasses import field
 from enum import Enum
+from typing import Optional
 
 import marshmallow_dataclass
 
@@ -17,6 +18,17 @@ class StarknetChainId(Enum):
     TESTNET = from_bytes(b"SN_GOERLI")
 
 
+class ContractCallExecutorType(Enum):
+    """
+    The executor of the Cairo runs of contract calls (see InternalInvokeFunction.call()).
+    THREAD - the default executor of the event loop (a thread pool).
+    PROCESS_POOL - a persistent pool of worker processes (see ProcessPoolCallExecutor).
+    """
+
+    THREAD = 0
+    PROCESS_POOL = 1
+
+
 # Default configuration values.
 
 # Note: tokens sent to this default address will be burned.
@@ -74,3 +86,28 @@ class StarknetGeneralConfig(Config):
         ),
         default=constants.EVENT_COMMITMENT_TREE_HEIGHT,
     )
+
+    contract_call_executor: ContractCallExecutorType = field(
+        metadata=dict(description="The executor of the Cairo runs of contract calls."),
+        default=ContractCallExecutorType.THREAD,
+    )
+
+    n_contract_call_workers: Optional[int] = field(
+        metadata=dict(
+            description=(
+                "The number of worker processes of the PROCESS_POOL contract call executor. "
+                "Defaults to the number of CPUs."
+            )
+        ),
+        default=None,
+    )
+
+    enable_storage_prefetching: bool = field(
+        metadata=dict(
+            description=(
+                "Whether to prefetch the storage addresses that recent executions of a contract "
+                "entry point read, when the entry point is executed."
+            )
+        ),
+        default=False,
+    )
@@ -1,5 +1,6 @@
+import functools
 import json
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 from typing_extensions import Literal
 
@@ -110,6 +111,48 @@ class FeederGatewayClient(EverestFeederGatewayClient):
         )
         return json.loads(raw_response)
 
+    async def get_blocks(
+        self, block_numbers: Sequence[BlockIdentifier], max_concurrency: int = 10
+    ) -> List[JsonObject]:
+        """
+        Returns the blocks with the given numbers (in order), fetching up to max_concurrency of
+        them at a time over pooled connections.
+        """
+        return await self.send_concurrently(
+            funcs=(
+                functools.partial(self.get_block, block_number=block_number)
+                for block_number in block_numbers
+            ),
+            max_concurrency=max_concurrency,
+        )
+
+    async def get_transactions(
+        self, tx_hashes: Sequence[CastableToHash], max_concurrency: int = 10
+    ) -> List[JsonObject]:
+        """
+        Returns the transactions with the given hashes (in order); see get_blocks().
+        """
+        return await self.send_concurrently(
+            funcs=(
+                functools.partial(self.get_transaction, tx_hash=tx_hash) for tx_hash in tx_hashes
+            ),
+            max_concurrency=max_concurrency,
+        )
+
+    async def get_transaction_receipts(
+        self, tx_hashes: Sequence[CastableToHash], max_concurrency: int = 10
+    ) -> List[JsonObject]:
+        """
+        Returns the receipts of the transactions with the given hashes (in order); see get_blocks().
+        """
+        return await self.send_concurrently(
+            funcs=(
+                functools.partial(self.get_transaction_receipt, tx_hash=tx_hash)
+                for tx_hash in tx_hashes
+            ),
+            max_concurrency=max_concurrency,
+        )
+
     async def get_block_hash_by_id(self, block_id: int) -> str:
         raw_response = await self._send_request(
             send_method="GET",
@@ -1,9 +1,26 @@
 import asyncio
 import concurrent
 import concurrent.futures
+import copy
 import dataclasses
+import heapq
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Set, Tuple, Type, TypeVar, Union
+from typing import (
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import cachetools
 
 from starkware.cairo.lang.cairo_constants import DEFAULT_PRIME
 from starkware.python.utils import from_bytes, to_bytes
@@ -102,6 +119,8 @@ class StarknetStorage(StarknetStorageInterface):
         # and validation of the storage segment.
         self.initial_values: Dict[int, int] = {}
         self.pending_modifications = {} if pending_modifications is None else pending_modifications
+        # Reads that were issued by prefetch() and were not requested yet.
+        self.prefetched_reads: Dict[int, concurrent.futures.Future[int]] = {}
         # If StarknetStorage is initialized while running inside executor, the loop must
         # be obtained and passed ahead, as get_running_loop() will raise an exception in that case.
         self.loop = asyncio.get_running_loop() if loop is None else loop
@@ -118,6 +137,57 @@ class StarknetStorage(StarknetStorageInterface):
 
         return leaves[address].value
 
+    async def _read_many_from_commitment_tree_async(
+        self, addresses: Collection[int]
+    ) -> Dict[int, int]:
+        leaves = await self.commitment_tree.get_leaves(
+            ffc=self.ffc, indices=addresses, fact_cls=StorageLeaf
+        )
+        return {address: leaf.value for address, leaf in leaves.items()}
+
+    def prefetch(self, addresses: Iterable[int]):
+        """
+        Reads the values of the given addresses from the commitment tree in a single batch, in the
+        background. A later read of one of these addresses waits for the batch instead of issuing
+        its own read.
+        Addresses that were already read or have a pending modification, as well as invalid
+        addresses, are skipped.
+        """
+        addresses_to_read = [
+            address
+            for address in addresses
+            if isinstance(address, int)
+            and 0 <= address < 2 ** self.commitment_tree.height
+            and address not in self.modifications
+            and address not in self.pending_modifications
+            and address not in self.prefetched_reads
+        ]
+        if len(addresses_to_read) == 0:
+            return
+
+        batch_future = asyncio.run_coroutine_threadsafe(
+            coro=self._read_many_from_commitment_tree_async(addresses_to_read), loop=self.loop
+        )
+        address_futures: Dict[int, concurrent.futures.Future[int]] = {
+            address: concurrent.futures.Future() for address in addresses_to_read
+        }
+
+        def set_results(batch_future: concurrent.futures.Future[Dict[int, int]]):
+            if batch_future.cancelled():
+                for future in address_futures.values():
+                    future.cancel()
+                return
+
+            exception = batch_future.exception()
+            for address, future in address_futures.items():
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(batch_future.result()[address])
+
+        batch_future.add_done_callback(set_results)
+        self.prefetched_reads.update(address_futures)
+
     def _update_init_value(self, address: int, value: int):
         assert address not in self.initial_values, f"Trying to overwrite initial_values[{address}]."
         self.initial_values[address] = value
@@ -130,8 +200,13 @@ class StarknetStorage(StarknetStorageInterface):
         if address not in self.modifications:
             pending_modification = self.pending_modifications.get(address)
             if pending_modification is None:
-                self.modifications[address] = asyncio.run_coroutine_threadsafe(
-                    coro=self._read_from_commitment_tree_async(address), loop=self.loop
+                prefetched_read = self.prefetched_reads.pop(address, None)
+                self.modifications[address] = (
+                    asyncio.run_coroutine_threadsafe(
+                        coro=self._read_from_commitment_tree_async(address), loop=self.loop
+                    )
+                    if prefetched_read is None
+                    else prefetched_read
                 )
                 return
 
@@ -220,6 +295,7 @@ class StarknetStorage(StarknetStorageInterface):
         self.pending_modifications.update(storage_updates)
         self.modifications.clear()
         self.initial_values.clear()
+        self.prefetched_reads.clear()
 
     def validate_dict_accesses(self, dict_accesses: List[int]):
         current_values: Dict[int, int] = {}
@@ -286,6 +362,89 @@ class BusinessLogicStarknetStorage(StarknetStorage):
         self.accessed_addresses.add(address)
 
 
+@dataclasses.dataclass
+class StorageAccessProfile:
+    """
+    The storage addresses read by recent executions of a contract entry point.
+    """
+
+    # The number of recorded executions of the entry point.
+    n_executions: int = 0
+    # A mapping from an address to the index (in 1..n_executions) of the last execution that read
+    # it and the number of executions that read it.
+    address_stats: Dict[int, Tuple[int, int]] = dataclasses.field(default_factory=dict)
+
+
+class StorageAccessProfiles:
+    """
+    Remembers the storage addresses read by recent executions of each contract entry point, keyed
+    by (contract hash, entry point selector), so that they can be prefetched in the next
+    execution of the same entry point (see StarknetStorage.prefetch()).
+
+    A profile keeps the addresses read by the last max_executions_per_profile executions of its
+    entry point, so that addresses that are no longer read are dropped. If there are more than
+    max_addresses_per_profile such addresses, the most recently read ones are kept (and, among
+    them, the most frequently read ones).
+    Thread-safe, as contract entry points are executed in an executor.
+    """
+
+    def __init__(
+        self,
+        max_profiles: int = 2 ** 12,
+        max_addresses_per_profile: int = 2 ** 8,
+        max_executions_per_profile: int = 4,
+    ):
+        self.profiles: cachetools.LRUCache[
+            Tuple[bytes, int], StorageAccessProfile
+        ] = cachetools.LRUCache(maxsize=max_profiles)
+        self.max_profiles = max_profiles
+        self.max_addresses_per_profile = max_addresses_per_profile
+        self.max_executions_per_profile = max_executions_per_profile
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo) -> "StorageAccessProfiles":
+        copied = StorageAccessProfiles(
+            max_profiles=self.max_profiles,
+            max_addresses_per_profile=self.max_addresses_per_profile,
+            max_executions_per_profile=self.max_executions_per_profile,
+        )
+        with self.lock:
+            for key, profile in self.profiles.items():
+                copied.profiles[key] = copy.deepcopy(profile, memo)
+        return copied
+
+    def get(self, contract_hash: bytes, entry_point_selector: int) -> FrozenSet[int]:
+        with self.lock:
+            profile = self.profiles.get((contract_hash, entry_point_selector))
+            return frozenset() if profile is None else frozenset(profile.address_stats)
+
+    def update(self, contract_hash: bytes, entry_point_selector: int, addresses: Iterable[int]):
+        """
+        Records the addresses read by an execution of the given entry point.
+        """
+        with self.lock:
+            profile = self.profiles.get((contract_hash, entry_point_selector))
+            if profile is None:
+                profile = StorageAccessProfile()
+            profile.n_executions += 1
+            for address in addresses:
+                _, count = profile.address_stats.get(address, (0, 0))
+                profile.address_stats[address] = (profile.n_executions, count + 1)
+
+            min_execution = profile.n_executions - self.max_executions_per_profile + 1
+            recent_address_stats = [
+                (address, stats)
+                for address, stats in profile.address_stats.items()
+                if stats[0] >= min_execution
+            ]
+            if len(recent_address_stats) > self.max_addresses_per_profile:
+                recent_address_stats = heapq.nlargest(
+                    self.max_addresses_per_profile, recent_address_stats, key=lambda item: item[1]
+                )
+            profile.address_stats = dict(recent_address_stats)
+            self.profiles[contract_hash, entry_point_selector] = profile
+
+
 class OsStarknetStorage(StarknetStorageInterface):
     """
     The StarknetStorage implementation that is used by the StarkNet OS run in the GpsAmbassador.
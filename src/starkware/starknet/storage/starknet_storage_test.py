@@ -0,0 +1,103 @@
+import asyncio
+import concurrent.futures
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+from starkware.starknet.storage.starknet_storage import (
+    BusinessLogicStarknetStorage,
+    StorageAccessProfiles,
+    StorageLeaf,
+)
+from starkware.starkware_utils.commitment_tree.patricia_tree.patricia_tree import PatriciaTree
+from starkware.storage.dict_storage import DictStorage
+from starkware.storage.storage import FactFetchingContext
+from starkware.storage.test_utils import hash_func
+
+
+class MgetCountingStorage(DictStorage):
+    """
+    A DictStorage that counts the mget() calls made to it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.n_mget_calls = 0
+
+    async def mget(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        self.n_mget_calls += 1
+        return await super().mget(keys=keys)
+
+
+@pytest.mark.asyncio
+async def test_prefetch():
+    ffc = FactFetchingContext(storage=MgetCountingStorage(), hash_func=hash_func)
+    tree = await PatriciaTree.empty_tree(ffc=ffc, height=251, leaf_fact=StorageLeaf.empty())
+    tree = await tree.update(
+        ffc=ffc, modifications=[(address, StorageLeaf(value=address + 1)) for address in range(8)]
+    )
+    storage = BusinessLogicStarknetStorage(
+        commitment_tree=tree, ffc=ffc, pending_modifications={3: StorageLeaf(value=30)}
+    )
+
+    def run() -> List[int]:
+        # Invalid addresses are ignored.
+        storage.prefetch(addresses=[-1, 2 ** 251, *range(5)])
+        return [storage.read(address=address) for address in range(6)]
+
+    ffc.storage.n_mget_calls = 0
+    values = await asyncio.get_running_loop().run_in_executor(None, run)
+    assert values == [1, 2, 3, 30, 5, 6]
+    n_prefetch_mget_calls = ffc.storage.n_mget_calls
+
+    # Reading the same addresses without prefetching takes more storage round trips.
+    storage = BusinessLogicStarknetStorage(commitment_tree=tree, ffc=ffc)
+    ffc.storage.n_mget_calls = 0
+    await asyncio.get_running_loop().run_in_executor(
+        None, lambda: [storage.read(address=address) for address in range(5)]
+    )
+    assert n_prefetch_mget_calls < ffc.storage.n_mget_calls
+
+
+@pytest.mark.asyncio
+async def test_prefetch_cancelled():
+    ffc = FactFetchingContext(storage=MgetCountingStorage(), hash_func=hash_func)
+    tree = await PatriciaTree.empty_tree(ffc=ffc, height=251, leaf_fact=StorageLeaf.empty())
+    storage = BusinessLogicStarknetStorage(commitment_tree=tree, ffc=ffc)
+
+    async def cancelled_read(addresses: Collection[int]) -> Dict[int, int]:
+        raise asyncio.CancelledError()
+
+    storage._read_many_from_commitment_tree_async = cancelled_read  # type: ignore
+
+    def run():
+        storage.prefetch(addresses=[1, 2])
+        # A read of a prefetched address fails, rather than waiting forever.
+        with pytest.raises(concurrent.futures.CancelledError):
+            storage.read(address=1)
+
+    await asyncio.get_running_loop().run_in_executor(None, run)
+
+
+def test_storage_access_profiles():
+    profiles = StorageAccessProfiles(
+        max_profiles=2, max_addresses_per_profile=3, max_executions_per_profile=2
+    )
+    assert profiles.get(contract_hash=b"a", entry_point_selector=0) == frozenset()
+
+    # Addresses that were not read by the recent executions are dropped.
+    profiles.update(contract_hash=b"a", entry_point_selector=0, addresses=[1, 2])
+    assert profiles.get(contract_hash=b"a", entry_point_selector=0) == {1, 2}
+    profiles.update(contract_hash=b"a", entry_point_selector=0, addresses=[1])
+    assert profiles.get(contract_hash=b"a", entry_point_selector=0) == {1, 2}
+    profiles.update(contract_hash=b"a", entry_point_selector=0, addresses=[1, 3])
+    assert profiles.get(contract_hash=b"a", entry_point_selector=0) == {1, 3}
+
+    # Large profiles keep the most recently read addresses.
+    profiles.update(contract_hash=b"a", entry_point_selector=1, addresses=[1, 2])
+    profiles.update(contract_hash=b"a", entry_point_selector=1, addresses=[4, 3, 1])
+    assert profiles.get(contract_hash=b"a", entry_point_selector=1) == {1, 3, 4}
+
+    # The least recently used profile is dropped.
+    profiles.update(contract_hash=b"b", entry_point_selector=0, addresses=[5])
+    assert profiles.get(contract_hash=b"a", entry_point_selector=0) == frozenset()
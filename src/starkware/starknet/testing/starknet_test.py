@@ -1,9 +1,14 @@
+import asyncio
+import copy
 import os
 import re
 
 import pytest
 
 from starkware.starknet.compiler.compile import compile_starknet_files
+from starkware.starknet.definitions.general_config import StarknetGeneralConfig
+from starkware.starknet.public.abi import get_selector_from_name
+from starkware.starknet.storage.starknet_storage import StorageLeaf
 from starkware.starknet.testing.contract import StarknetContract
 from starkware.starknet.testing.starknet import Starknet
 
@@ -41,6 +46,67 @@ async def test_basic(starknet: Starknet, contract: StarknetContract):
     await starknet.deploy(contract_def=contract_def)
 
 
+@pytest.mark.asyncio
+async def test_concurrent_invokes(starknet: Starknet, contract: StarknetContract):
+    other_contract = await starknet.deploy(source=CONTRACT_FILE)
+    # Each invocation runs on a copy of the state, and the copies are open at the same time.
+    await asyncio.gather(
+        contract.increase_value(address=100, value=5).invoke(),
+        other_contract.increase_value(address=100, value=7).invoke(),
+    )
+    assert (await contract.get_value(address=100).call()).result == (5,)
+    assert (await other_contract.get_value(address=100).call()).result == (7,)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_state_copies(starknet: Starknet, contract: StarknetContract):
+    other_contract = await starknet.deploy(source=CONTRACT_FILE)
+    state = starknet.state.state
+    with state.copy_and_apply() as first_copy:
+        first_copy.update_contract_storage(
+            contract_address=contract.contract_address, modifications={100: StorageLeaf(value=5)}
+        )
+        # Copies of the state do not include the updates of the open copy.
+        state_snapshot = copy.deepcopy(state)
+        with state.copy_and_apply() as second_copy:
+            assert second_copy.contract_states[contract.contract_address].storage_updates == {}
+            second_copy.update_contract_storage(
+                contract_address=other_contract.contract_address,
+                modifications={200: StorageLeaf(value=7)},
+            )
+
+    assert state.contract_states[contract.contract_address].storage_updates == {
+        100: StorageLeaf(value=5)
+    }
+    assert state.contract_states[other_contract.contract_address].storage_updates == {
+        200: StorageLeaf(value=7)
+    }
+    assert state_snapshot.contract_states[contract.contract_address].storage_updates == {}
+
+
+@pytest.mark.asyncio
+async def test_storage_prefetching(starknet: Starknet, contract: StarknetContract):
+    # The storage access profiles are not recorded by default.
+    await contract.increase_value(address=100, value=5).invoke()
+    assert len(starknet.state.state.storage_access_profiles.profiles) == 0
+
+    general_config = StarknetGeneralConfig.load(
+        data={**StarknetGeneralConfig().dump(), "enable_storage_prefetching": True}
+    )
+    prefetching_starknet = await Starknet.empty(general_config=general_config)
+    prefetching_contract = await prefetching_starknet.deploy(source=CONTRACT_FILE)
+    for _ in range(2):
+        await prefetching_contract.increase_value(address=100, value=5).invoke()
+    assert (await prefetching_contract.get_value(address=100).call()).result == (10,)
+    profiles = prefetching_starknet.state.state.storage_access_profiles
+    assert 100 in profiles.get(
+        contract_hash=prefetching_starknet.state.state.contract_states[
+            prefetching_contract.contract_address
+        ].state.contract_hash,
+        entry_point_selector=get_selector_from_name("increase_value"),
+    )
+
+
 @pytest.mark.asyncio
 async def test_l2_to_l1_message(starknet: Starknet, contract: StarknetContract):
     l1_address = int("0xce08635cc6477f3634551db7613cc4f36b4e49dc", 16)
@@ -1,7 +1,7 @@
 import copy
 from typing import Dict, List, Optional, Tuple, Union, cast
 
-from starkware.cairo.lang.vm.crypto import pedersen_hash_func
+from starkware.cairo.lang.vm.crypto import pedersen_hash_func, pedersen_hash_func_many
 from starkware.starknet.business_logic.internal_transaction import (
     InternalDeploy,
     InternalInvokeFunction,
@@ -18,7 +18,7 @@ from starkware.starknet.services.api.contract_definition import ContractDefiniti
 from starkware.starknet.services.api.gateway.transaction import Deploy
 from starkware.starknet.services.api.messages import StarknetMessageToL1
 from starkware.storage.dict_storage import DictStorage
-from starkware.storage.storage import FactFetchingContext
+from starkware.storage.storage import FactCache, FactFetchingContext
 
 CastableToAddress = Union[str, int]
 CastableToAddressSalt = Union[str, int]
@@ -64,7 +64,12 @@ class StarknetState:
         if general_config is None:
             general_config = StarknetGeneralConfig()
 
-        ffc = FactFetchingContext(storage=DictStorage(), hash_func=pedersen_hash_func)
+        ffc = FactFetchingContext(
+            storage=DictStorage(),
+            hash_func=pedersen_hash_func,
+            fact_cache=FactCache(),
+            batch_hash_func=pedersen_hash_func_many,
+        )
         state = await CarriedState.create_empty_for_test(
             shared_state=None, ffc=ffc, general_config=general_config
         )
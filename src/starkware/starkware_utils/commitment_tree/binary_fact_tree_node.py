@@ -1,8 +1,8 @@
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Collection, Dict, Optional, Tuple, Type, TypeVar
+from typing import Collection, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
 
-from starkware.python.utils import from_bytes
+from starkware.python.utils import from_bytes, gather_in_chunks
 from starkware.starkware_utils.commitment_tree.binary_fact_tree import BinaryFactDict, TFact
 from starkware.starkware_utils.commitment_tree.inner_node_fact import InnerNodeFact
 from starkware.storage.storage import FactFetchingContext
@@ -10,6 +10,10 @@ from starkware.storage.storage import FactFetchingContext
 TInnerNodeFact = TypeVar("TInnerNodeFact", bound=InnerNodeFact)
 TBinaryFactTreeNode = TypeVar("TBinaryFactTreeNode", bound="BinaryFactTreeNode")
 
+# The maximal number of facts read from the storage in a single mget call, when reading the facts
+# of many nodes at once.
+READ_FACTS_BATCH_SIZE = 1000
+
 
 class BinaryFactTreeNode(ABC):
     """
@@ -83,6 +87,24 @@ class BinaryFactTreeNode(ABC):
         Return True iff the nodes represent the same node in a tree.
         """
 
+    @classmethod
+    async def get_nodes_children(
+        cls,
+        ffc: FactFetchingContext,
+        nodes: Sequence["BinaryFactTreeNode"],
+        facts: Optional[BinaryFactDict] = None,
+    ) -> List[Tuple["BinaryFactTreeNode", "BinaryFactTreeNode"]]:
+        """
+        Returns the children of each of the given nodes (see get_children()).
+        Implementations may override this method in order to read the facts of all the nodes from
+        the storage in batches, rather than one at a time.
+
+        If facts argument is not None, this dictionary is filled with facts read from the DB.
+        """
+        return list(
+            await asyncio.gather(*(node.get_children(ffc=ffc, facts=facts) for node in nodes))
+        )
+
     async def _get_leaves(
         self,
         ffc: FactFetchingContext,
@@ -96,6 +118,9 @@ class BinaryFactTreeNode(ABC):
         If facts argument is not None, this dictionary is filled during traversal through the tree
         by the facts of their paths from the root down.
 
+        The tree is traversed level by level, so that the facts of all the nodes of the same level
+        are read together (see get_nodes_children()).
+
         This method is to be called by a get_leaves() method of a specific tree implementation
         (derived class of BinaryFactTree).
         """
@@ -104,46 +129,78 @@ class BinaryFactTreeNode(ABC):
             f"{InnerNodeFact.__name__}."
         )
 
-        def unify_leaves(
-            left_leaves: Dict[int, TFact], right_leaves: Dict[int, TFact]
-        ) -> Dict[int, TFact]:
-            return {**left_leaves, **{x + mid: y for x, y in right_leaves.items()}}
-
         if len(indices) == 0:
             return {}
 
-        if self.is_leaf:
-            assert set(indices) == {0}, f"Merkle tree indices out of range: {indices}."
-            leaf = await fact_cls.get_or_fail(storage=ffc.storage, suffix=self.leaf_hash)
-
-            return {0: leaf}
-
-        mid = 2 ** (self.get_height_in_tree() - 1)
-        left_indices = [index for index in indices if index < mid]
-        right_indices = [(index - mid) for index in indices if index >= mid]
+        # The nodes of the current level that lead to requested leaves. Each node is given with the
+        # indices of the requested leaves relative to it and with the index of its leftmost leaf.
+        level: List[Tuple[BinaryFactTreeNode, List[int], int]] = [(self, list(indices), 0)]
+        for height in range(self.get_height_in_tree(), 0, -1):
+            mid = 2 ** (height - 1)
+            nodes_children = await self.get_nodes_children(
+                ffc=ffc, nodes=[node for node, _, _ in level], facts=facts
+            )
+            next_level: List[Tuple[BinaryFactTreeNode, List[int], int]] = []
+            for (_, node_indices, first_leaf_index), (left_child, right_child) in zip(
+                level, nodes_children
+            ):
+                left_indices = [index for index in node_indices if index < mid]
+                right_indices = [(index - mid) for index in node_indices if index >= mid]
+                if len(left_indices) > 0:
+                    next_level.append((left_child, left_indices, first_leaf_index))
+                if len(right_indices) > 0:
+                    next_level.append((right_child, right_indices, first_leaf_index + mid))
+            level = next_level
+
+        for _, node_indices, _ in level:
+            assert set(node_indices) == {0}, f"Merkle tree indices out of range: {node_indices}."
+
+        leaves = await read_facts(
+            ffc=ffc, fact_cls=fact_cls, fact_hashes=[node.leaf_hash for node, _, _ in level]
+        )
+        return {first_leaf_index: leaf for (_, _, first_leaf_index), leaf in zip(level, leaves)}
 
-        left_child, right_child = await self.get_children(ffc=ffc, facts=facts)
 
-        # Optimizations in order to avoid a redundant asyncio.gather call that postpones the
-        # execution of the recursive task.
-        if len(left_indices) == 0:
-            right_leaves = await right_child._get_leaves(
-                ffc=ffc, indices=right_indices, fact_cls=fact_cls, facts=facts
+async def read_facts(
+    ffc: FactFetchingContext, fact_cls: Type[TFact], fact_hashes: Sequence[bytes]
+) -> List[TFact]:
+    """
+    Reads the facts of the given hashes from the storage, using mget calls of at most
+    READ_FACTS_BATCH_SIZE facts each.
+    Facts found in the fact cache of ffc (if any) are not read, and the read facts are added to it.
+    """
+    fact_cache = ffc.fact_cache
+    cached_facts: List[Optional[TFact]] = (
+        [None] * len(fact_hashes)
+        if fact_cache is None
+        else [fact_cache.get(fact_cls=fact_cls, suffix=fact_hash) for fact_hash in fact_hashes]
+    )
+    hashes_to_read = [
+        fact_hash for fact_hash, fact in zip(fact_hashes, cached_facts) if fact is None
+    ]
+    batches = await gather_in_chunks(
+        awaitables=(
+            fact_cls.get_many_or_fail(
+                storage=ffc.storage, suffixes=hashes_to_read[i : i + READ_FACTS_BATCH_SIZE]
             )
-            return unify_leaves(right_leaves=right_leaves, left_leaves={})
+            for i in range(0, len(hashes_to_read), READ_FACTS_BATCH_SIZE)
+        ),
+        chunk_size=ffc.n_workers,
+    )
+    read_facts_iterator = (fact for batch in batches for fact in batch)
 
-        if len(right_indices) == 0:
-            left_leaves = await left_child._get_leaves(
-                ffc=ffc, indices=left_indices, fact_cls=fact_cls, facts=facts
-            )
-            return unify_leaves(right_leaves={}, left_leaves=left_leaves)
+    facts: List[TFact] = []
+    for fact_hash, cached_fact in zip(fact_hashes, cached_facts):
+        if cached_fact is not None:
+            facts.append(cached_fact)
+            continue
 
-        left_leaves, right_leaves = await asyncio.gather(
-            left_child._get_leaves(ffc=ffc, indices=left_indices, fact_cls=fact_cls, facts=facts),
-            right_child._get_leaves(ffc=ffc, indices=right_indices, fact_cls=fact_cls, facts=facts),
-        )
+        fact = next(read_facts_iterator)
+        if fact_cache is not None:
+            fact_cache.set(fact=fact, suffix=fact_hash)
+        facts.append(fact)
 
-        return unify_leaves(left_leaves=left_leaves, right_leaves=right_leaves)
+    return facts
 
 
 async def read_node_fact(
@@ -152,7 +209,15 @@ async def read_node_fact(
     fact_hash: bytes,
     facts: Optional[BinaryFactDict],
 ) -> TInnerNodeFact:
-    node_fact = await inner_node_fact_cls.get_or_fail(storage=ffc.storage, suffix=fact_hash)
+    node_fact = (
+        None
+        if ffc.fact_cache is None
+        else ffc.fact_cache.get(fact_cls=inner_node_fact_cls, suffix=fact_hash)
+    )
+    if node_fact is None:
+        node_fact = await inner_node_fact_cls.get_or_fail(storage=ffc.storage, suffix=fact_hash)
+        if ffc.fact_cache is not None:
+            ffc.fact_cache.set(fact=node_fact, suffix=fact_hash)
 
     if facts is not None:
         facts[from_bytes(fact_hash)] = node_fact.to_tuple()
@@ -160,6 +225,24 @@ async def read_node_fact(
     return node_fact
 
 
+async def read_node_facts(
+    ffc: FactFetchingContext,
+    inner_node_fact_cls: Type[TInnerNodeFact],
+    fact_hashes: Sequence[bytes],
+    facts: Optional[BinaryFactDict],
+) -> List[TInnerNodeFact]:
+    """
+    Same as read_node_fact(), for many facts at once (see read_facts()).
+    """
+    node_facts = await read_facts(ffc=ffc, fact_cls=inner_node_fact_cls, fact_hashes=fact_hashes)
+
+    if facts is not None:
+        for fact_hash, node_fact in zip(fact_hashes, node_facts):
+            facts[from_bytes(fact_hash)] = node_fact.to_tuple()
+
+    return node_facts
+
+
 async def write_node_fact(
     ffc: FactFetchingContext, inner_node_fact: InnerNodeFact, facts: Optional[BinaryFactDict]
 ) -> bytes:
@@ -1,5 +1,6 @@
 import asyncio
 import dataclasses
+import functools
 from abc import ABC, abstractmethod
 from concurrent.futures import Executor
 from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
@@ -11,12 +12,22 @@ from starkware.starkware_utils.commitment_tree.binary_fact_tree_node import (
     TInnerNodeFact,
 )
 from starkware.starkware_utils.validated_dataclass import ValidatedDataclass
-from starkware.storage.storage import FactFetchingContext, HashFunctionType
+from starkware.storage.storage import (
+    BatchHashFunctionType,
+    FactFetchingContext,
+    HashFunctionType,
+)
 
 T = TypeVar("T")
 TCalculationNode = TypeVar("TCalculationNode", bound="CalculationNode")
 NodeFactDict = Dict[bytes, TInnerNodeFact]
 
+# The minimal estimated cost (see get_calculation_costs()) of a calculation that is distributed
+# by full_calculate_with_process_pool(). Smaller calculations are cheaper to compute in a thread of
+# the current process than to send to a worker process.
+MIN_PROCESS_POOL_TASK_COST = 256
+
+
 class Calculation(Generic[T], ABC):
     """
     A calculation that can produce a result of type T. The calculation is dependent on the results
@@ -50,6 +61,14 @@ class Calculation(Generic[T], ABC):
         (using their hash as the key).
         """
 
+    def get_hash_inputs(self, dependency_results: List[Any]) -> List[Tuple[bytes, bytes]]:
+        """
+        Returns the (x, y) pairs that calculate() passes to hash_func, given the same
+        dependency_results, so that they can be hashed in a batch before calling it.
+        Calculations that do not compute hashes return an empty list.
+        """
+        return []
+
     def calculate_new_fact_nodes(
         self,
         dependency_results: List[Any],
@@ -86,18 +105,67 @@ class Calculation(Generic[T], ABC):
             dependency_results=dependency_results, hash_func=hash_func, fact_nodes=fact_nodes
         )
 
+    def full_calculate_by_levels(
+        self,
+        hash_func: HashFunctionType,
+        batch_hash_func: BatchHashFunctionType,
+        fact_nodes: NodeFactDict,
+    ) -> T:
+        """
+        Same as full_calculate(), except that the calculations are done level by level, from the
+        leaves up, and the hashes of each level (see get_hash_inputs()) are computed with a single
+        call to batch_hash_func.
+        """
+        results: Dict[int, Any] = {}
+        for level in get_calculation_levels(root=self):
+            level_dependency_results = [
+                [
+                    results[id(dependency)]
+                    for dependency in calculation.get_dependency_calculations()
+                ]
+                for calculation in level
+            ]
+            hash_inputs = [
+                hash_input
+                for calculation, dependency_results in zip(level, level_dependency_results)
+                for hash_input in calculation.get_hash_inputs(dependency_results=dependency_results)
+            ]
+            level_hash_func = (
+                hash_func
+                if len(hash_inputs) == 0
+                else get_precomputed_hash_func(
+                    hash_func=hash_func,
+                    hashes=dict(zip(hash_inputs, batch_hash_func(hash_inputs))),
+                )
+            )
+            for calculation, dependency_results in zip(level, level_dependency_results):
+                results[id(calculation)] = calculation.calculate(
+                    dependency_results=dependency_results,
+                    hash_func=level_hash_func,
+                    fact_nodes=fact_nodes,
+                )
+
+        return results[id(self)]
+
     def full_calculate_new_fact_nodes(
         self,
         hash_func: HashFunctionType,
+        batch_hash_func: Optional[BatchHashFunctionType] = None,
     ) -> Tuple[T, NodeFactDict]:
         """
         Produces the result of this calculation. Returns the result and a dict containing generated
         facts.
 
-        Recursively calcuates the result of the dependency calculations.
+        Recursively calcuates the result of the dependency calculations. If batch_hash_func is
+        given, the hashes of each level are computed in a batch (see full_calculate_by_levels()).
         """
         fact_nodes: NodeFactDict = {}
-        result = self.full_calculate(hash_func=hash_func, fact_nodes=fact_nodes)
+        if batch_hash_func is None:
+            result = self.full_calculate(hash_func=hash_func, fact_nodes=fact_nodes)
+        else:
+            result = self.full_calculate_by_levels(
+                hash_func=hash_func, batch_hash_func=batch_hash_func, fact_nodes=fact_nodes
+            )
         return result, fact_nodes
 
     async def full_calculate_with_executor(
@@ -106,12 +174,14 @@ class Calculation(Generic[T], ABC):
         hash_func: HashFunctionType,
         fact_nodes: NodeFactDict,
         depth: int,
+        batch_hash_func: Optional[BatchHashFunctionType] = None,
     ) -> T:
         """
         Produces the result of this calculation.
 
         Gets the dependency calculations at the layer that is `depth` layers from the current node.
-        Distributes those calculations using the executor.
+        Distributes those calculations using the executor. If batch_hash_func is given, each of
+        them computes its hashes in batches (see full_calculate_by_levels()).
 
         Any facts generated during the calculation will be saved in fact_nodes
         (using their hash as the key).
@@ -119,7 +189,7 @@ class Calculation(Generic[T], ABC):
         if depth == 0:
             # We can't use full_calculate here due to thread-safety issues.
             result, sub_facts = await asyncio.get_event_loop().run_in_executor(
-                executor, self.full_calculate_new_fact_nodes, hash_func
+                executor, self.full_calculate_new_fact_nodes, hash_func, batch_hash_func
             )
             fact_nodes.update(sub_facts)
             return result
@@ -127,7 +197,11 @@ class Calculation(Generic[T], ABC):
         dependency_results = await asyncio.gather(
             *[
                 dependency_calculation.full_calculate_with_executor(
-                    executor=executor, hash_func=hash_func, fact_nodes=fact_nodes, depth=depth - 1
+                    executor=executor,
+                    hash_func=hash_func,
+                    fact_nodes=fact_nodes,
+                    depth=depth - 1,
+                    batch_hash_func=batch_hash_func,
                 )
                 for dependency_calculation in self.get_dependency_calculations()
             ]
@@ -139,6 +213,97 @@ class Calculation(Generic[T], ABC):
         fact_nodes.update(sub_facts)
         return result
 
+    async def full_calculate_with_process_pool(
+        self,
+        executor: Executor,
+        hash_func: HashFunctionType,
+        fact_nodes: NodeFactDict,
+        n_tasks: int,
+        batch_hash_func: Optional[BatchHashFunctionType] = None,
+    ) -> T:
+        """
+        Produces the result of this calculation.
+
+        Splits the calculation into about n_tasks independent sub-calculations of similar estimated
+        cost (rather than at a fixed depth), and distributes them using the executor. Each
+        sub-calculation is sent to the executor as a whole, together with hash_func, and its
+        generated facts are returned with its result; hence, the executor may be a process pool, in
+        which case the calculation and hash_func must be picklable.
+        The calculations above the distributed ones, as well as calculations that are too small to
+        distribute, are done in the default executor of the event loop (a thread of the current
+        process).
+        If batch_hash_func is given (and picklable), each task computes its hashes in batches (see
+        full_calculate_by_levels()).
+
+        Any facts generated during the calculation will be saved in fact_nodes
+        (using their hash as the key).
+        """
+        loop = asyncio.get_event_loop()
+        costs = get_calculation_costs(root=self)
+        if costs[id(self)] <= MIN_PROCESS_POOL_TASK_COST:
+            result, sub_facts = await loop.run_in_executor(
+                None, self.full_calculate_new_fact_nodes, hash_func, batch_hash_func
+            )
+            fact_nodes.update(sub_facts)
+            return result
+
+        tasks = split_calculation(
+            root=self,
+            costs=costs,
+            max_task_cost=max(MIN_PROCESS_POOL_TASK_COST, -(-costs[id(self)] // n_tasks)),
+        )
+        task_results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor, task.full_calculate_new_fact_nodes, hash_func, batch_hash_func
+                )
+                for task in tasks
+            )
+        )
+
+        known_results: Dict[int, Any] = {}
+        for task, (result, sub_facts) in zip(tasks, task_results):
+            known_results[id(task)] = result
+            fact_nodes.update(sub_facts)
+
+        # We can't use fact_nodes here due to thread-safety issues.
+        top_facts: NodeFactDict = {}
+        result = await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.calculate_with_known_results,
+                known_results=known_results,
+                hash_func=hash_func,
+                fact_nodes=top_facts,
+            ),
+        )
+        fact_nodes.update(top_facts)
+        return result
+
+    def calculate_with_known_results(
+        self,
+        known_results: Dict[int, Any],
+        hash_func: HashFunctionType,
+        fact_nodes: NodeFactDict,
+    ) -> T:
+        """
+        Same as full_calculate(), except that the results of the calculations in known_results
+        (given by the id() of the calculation object) are not recalculated.
+        """
+        if id(self) in known_results:
+            return known_results[id(self)]
+
+        dependency_results: List[Any] = [
+            dependency_calculation.calculate_with_known_results(
+                known_results=known_results, hash_func=hash_func, fact_nodes=fact_nodes
+            )
+            for dependency_calculation in self.get_dependency_calculations()
+        ]
+
+        return self.calculate(
+            dependency_results=dependency_results, hash_func=hash_func, fact_nodes=fact_nodes
+        )
+
 
 class CalculationNode(Calculation[TBinaryFactTreeNode], ABC):
     """
@@ -196,3 +361,99 @@ class ConstantCalculation(HashCalculation, ValidatedDataclass):
 
     def get_dependency_calculations(self) -> List[Calculation[bytes]]:
         return []
+
+
+def get_calculation_costs(root: Calculation) -> Dict[int, int]:
+    """
+    Returns a mapping from the id() of each calculation in the calculation tree rooted at root to
+    its estimated cost: the number of calculations in its subtree that have dependencies.
+    For commitment trees, this is the number of hashes needed to produce the result.
+    """
+    costs: Dict[int, int] = {}
+    # An iterative post-order traversal; each calculation is pushed twice - once to push its
+    # dependencies and once (after they are handled) to compute its cost.
+    stack: List[Tuple[Calculation, bool]] = [(root, False)]
+    while len(stack) > 0:
+        calculation, dependencies_handled = stack.pop()
+        dependency_calculations = calculation.get_dependency_calculations()
+        if not dependencies_handled:
+            stack.append((calculation, True))
+            stack.extend((dependency, False) for dependency in dependency_calculations)
+            continue
+
+        costs[id(calculation)] = sum(
+            costs[id(dependency)] for dependency in dependency_calculations
+        ) + (1 if len(dependency_calculations) > 0 else 0)
+
+    return costs
+
+
+def get_calculation_levels(root: Calculation) -> List[List[Calculation]]:
+    """
+    Returns the calculations of the calculation tree rooted at root, grouped by their level: the
+    length of the longest path from the calculation to a calculation without dependencies. Each
+    calculation appears once, and after all of its dependencies.
+    """
+    levels: Dict[int, int] = {}
+    calculations_by_level: List[List[Calculation]] = []
+    # An iterative post-order traversal, as in get_calculation_costs().
+    stack: List[Tuple[Calculation, bool]] = [(root, False)]
+    while len(stack) > 0:
+        calculation, dependencies_handled = stack.pop()
+        if id(calculation) in levels:
+            continue
+        dependency_calculations = calculation.get_dependency_calculations()
+        if not dependencies_handled:
+            stack.append((calculation, True))
+            stack.extend((dependency, False) for dependency in dependency_calculations)
+            continue
+
+        level = max(
+            (levels[id(dependency)] + 1 for dependency in dependency_calculations), default=0
+        )
+        levels[id(calculation)] = level
+        if level == len(calculations_by_level):
+            calculations_by_level.append([])
+        calculations_by_level[level].append(calculation)
+
+    return calculations_by_level
+
+
+def get_precomputed_hash_func(
+    hash_func: HashFunctionType, hashes: Dict[Tuple[bytes, bytes], bytes]
+) -> HashFunctionType:
+    """
+    Returns a hash function that takes the hashes of the given (x, y) pairs from hashes, and
+    computes the hashes of other pairs using hash_func.
+    """
+
+    def precomputed_hash_func(x: bytes, y: bytes) -> bytes:
+        hash_value = hashes.get((x, y))
+        return hash_func(x, y) if hash_value is None else hash_value
+
+    return precomputed_hash_func
+
+
+def split_calculation(
+    root: Calculation, costs: Dict[int, int], max_task_cost: int
+) -> List[Calculation]:
+    """
+    Splits the calculation tree rooted at root into independent sub-calculations (tasks), each of
+    estimated cost at most max_task_cost, by repeatedly splitting any calculation that is too
+    expensive into its dependencies. Calculations that have no dependencies are not returned.
+    The split calculations remain to be done once the results of the tasks are known.
+    """
+    tasks: List[Calculation] = []
+    pending = [root]
+    while len(pending) > 0:
+        calculation = pending.pop()
+        cost = costs[id(calculation)]
+        if cost == 0:
+            continue
+        if cost <= max_task_cost:
+            tasks.append(calculation)
+            continue
+
+        pending.extend(calculation.get_dependency_calculations())
+
+    return tasks
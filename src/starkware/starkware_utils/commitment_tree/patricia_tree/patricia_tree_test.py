@@ -1,11 +1,16 @@
 import asyncio
+import os
 import random
-from typing import Iterable, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
 
 import pytest
 from queue import Queue
 
-from starkware.crypto.signature.fast_pedersen_hash import pedersen_hash_func
+from starkware.crypto.signature.fast_pedersen_hash import (
+    pedersen_hash_func,
+    pedersen_hash_func_many,
+)
 from starkware.python.random_test import parametrize_random_object
 from starkware.python.utils import from_bytes, to_bytes
 from starkware.starkware_utils.commitment_tree.binary_fact_tree import BinaryFactDict
@@ -15,11 +20,32 @@ from starkware.starkware_utils.commitment_tree.patricia_tree.nodes import (
     PatriciaNodeFact,
 )
 from starkware.starkware_utils.commitment_tree.patricia_tree.patricia_tree import PatriciaTree
-from starkware.storage.storage import FactFetchingContext
+from starkware.starkware_utils.commitment_tree.update_tree import get_n_workers
+from starkware.starkware_utils.executor import service_executor
+from starkware.storage.storage import FactCache, FactFetchingContext
 from starkware.storage.storage_utils import LeafFact
 from starkware.storage.test_utils import MockStorage
 
 
+class MgetCountingStorage(MockStorage):
+    """
+    A mock storage that counts the mget calls and forbids single reads.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.n_mget_calls = 0
+        self.allow_get_value = True
+
+    async def get_value(self, key: bytes) -> Optional[bytes]:
+        assert self.allow_get_value, f"Unexpected single read of {key!r}."
+        return await super().get_value(key=key)
+
+    async def mget(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        self.n_mget_calls += 1
+        return tuple(self.db.get(key) for key in keys)
+
+
 @pytest.fixture
 def ffc() -> FactFetchingContext:
     return FactFetchingContext(storage=MockStorage(), hash_func=pedersen_hash_func)
@@ -107,3 +133,166 @@ async def test_update_and_decommit(
 
     # Verify that the root can be reached using the preimages, from every leaf.
     verify_leaves_are_reachable_from_root(root=root, leaf_hashes=leaf_hashes, preimages=preimages)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("height,n_leaves", [(12, 500), (10, 2 ** 9)], ids=["sparse", "dense"])
+async def test_update_with_process_pool(ffc: FactFetchingContext, height: int, n_leaves: int):
+    """
+    Tests that updating a tree using a process pool results in the same root and facts as
+    updating it in the current process.
+    """
+    random_object = random.Random(0)
+    tree = await PatriciaTree.empty_tree(ffc=ffc, height=height, leaf_fact=LeafFact(value=0))
+    leaves = [LeafFact(value=value) for value in random_object.choices(range(1, 1000), k=n_leaves)]
+    # Put half of the modifications in the leftmost quarter of the tree, to create uneven work.
+    quarter_size = 2 ** (height - 2)
+    indices = [random_object.randrange(quarter_size) for _ in range(n_leaves // 2)] + [
+        random_object.randrange(quarter_size, 2 ** height) for _ in range(n_leaves - n_leaves // 2)
+    ]
+    modifications = list(zip(indices, leaves))
+
+    expected_facts: BinaryFactDict = {}
+    expected_tree = await tree.update(ffc=ffc, modifications=modifications, facts=expected_facts)
+
+    facts: BinaryFactDict = {}
+    with ProcessPoolExecutor(max_workers=2) as executor, service_executor(executor, n_workers=2):
+        updated_tree = await tree.update(ffc=ffc, modifications=modifications, facts=facts)
+
+    assert updated_tree == expected_tree
+    assert facts == expected_facts
+
+
+def test_get_n_workers():
+    # The calculation is split according to the size of the process pool, not the number of CPUs.
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        with service_executor(executor, n_workers=3):
+            assert get_n_workers() == 3
+        with service_executor(executor):
+            assert get_n_workers() == (os.cpu_count() or 1)
+
+
+@pytest.mark.asyncio
+async def test_update_with_batch_hash_func(ffc: FactFetchingContext):
+    """
+    Tests that updating a tree with a batch hash function results in the same root and facts, and
+    that most of the hashes are computed in batches.
+    """
+    random_object = random.Random(0)
+    height = 10
+    tree = await PatriciaTree.empty_tree(ffc=ffc, height=height, leaf_fact=LeafFact(value=0))
+    modifications = [
+        (index, LeafFact(value=random_object.randrange(1, 1000)))
+        for index in random_object.sample(range(2 ** height), k=300)
+    ]
+    expected_facts: BinaryFactDict = {}
+    expected_tree = await tree.update(ffc=ffc, modifications=modifications, facts=expected_facts)
+
+    n_hash_calls = 0
+    batch_sizes: List[int] = []
+
+    def hash_func(x: bytes, y: bytes) -> bytes:
+        nonlocal n_hash_calls
+        n_hash_calls += 1
+        return pedersen_hash_func(x, y)
+
+    def batch_hash_func(pairs: Sequence[Tuple[bytes, bytes]]) -> List[bytes]:
+        batch_sizes.append(len(pairs))
+        return pedersen_hash_func_many(pairs)
+
+    batch_ffc = FactFetchingContext(
+        storage=ffc.storage, hash_func=hash_func, batch_hash_func=batch_hash_func
+    )
+    facts: BinaryFactDict = {}
+    assert await tree.update(ffc=batch_ffc, modifications=modifications, facts=facts) == (
+        expected_tree
+    )
+    assert facts == expected_facts
+    # Only the nodes above the subtrees that are calculated as a whole (the top 5 levels) are
+    # hashed one by one.
+    assert n_hash_calls < 2 ** 5
+    assert sum(batch_sizes) > 10 * n_hash_calls
+
+    process_pool_ffc = FactFetchingContext(
+        storage=ffc.storage, hash_func=pedersen_hash_func, batch_hash_func=pedersen_hash_func_many
+    )
+    facts = {}
+    with ProcessPoolExecutor(max_workers=2) as executor, service_executor(executor, n_workers=2):
+        updated_tree = await tree.update(
+            ffc=process_pool_ffc, modifications=modifications, facts=facts
+        )
+    assert updated_tree == expected_tree
+    assert facts == expected_facts
+
+
+@pytest.mark.asyncio
+async def test_get_leaves_reads_facts_per_level():
+    """
+    Tests that get_leaves() reads the facts of each level of the tree with a single mget call.
+    """
+    storage = MgetCountingStorage()
+    ffc = FactFetchingContext(storage=storage, hash_func=pedersen_hash_func)
+    random_object = random.Random(0)
+    height = 10
+    tree = await PatriciaTree.empty_tree(ffc=ffc, height=height, leaf_fact=LeafFact(value=0))
+    modifications = {
+        index: LeafFact(value=random_object.randrange(1, 1000))
+        for index in random_object.sample(range(2 ** height), k=100)
+    }
+    tree = await tree.update(ffc=ffc, modifications=list(modifications.items()))
+
+    storage.allow_get_value = False
+    indices = [*modifications.keys(), *random_object.sample(range(2 ** height), k=20)]
+    preimages: BinaryFactDict = {}
+    leaves = await tree.get_leaves(ffc=ffc, indices=indices, fact_cls=LeafFact, facts=preimages)
+
+    assert leaves == {index: modifications.get(index, LeafFact(value=0)) for index in indices}
+    # One call per inner level, and one for the leaves.
+    assert storage.n_mget_calls == height + 1
+    leaf_hashes = [
+        from_bytes(leaf._hash(hash_func=pedersen_hash_func)) for leaf in modifications.values()
+    ]
+    verify_leaves_are_reachable_from_root(
+        root=from_bytes(tree.root), leaf_hashes=leaf_hashes, preimages=preimages
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_leaves_with_fact_cache():
+    storage = MgetCountingStorage()
+    ffc = FactFetchingContext(storage=storage, hash_func=pedersen_hash_func)
+    random_object = random.Random(0)
+    height = 10
+    tree = await PatriciaTree.empty_tree(ffc=ffc, height=height, leaf_fact=LeafFact(value=0))
+    modifications = {
+        index: LeafFact(value=random_object.randrange(1, 1000))
+        for index in random_object.sample(range(2 ** height), k=100)
+    }
+    tree = await tree.update(ffc=ffc, modifications=list(modifications.items()))
+
+    storage.allow_get_value = False
+    storage.n_mget_calls = 0
+    fact_cache = FactCache()
+    indices = list(modifications.keys())
+    for _ in range(2):
+        # The contexts share the cache, so the facts are only read by the first one.
+        cached_ffc = FactFetchingContext(
+            storage=storage, hash_func=pedersen_hash_func, fact_cache=fact_cache
+        )
+        leaves = await tree.get_leaves(ffc=cached_ffc, indices=indices, fact_cls=LeafFact)
+        assert leaves == modifications
+        assert storage.n_mget_calls == height + 1
+
+    assert fact_cache.hit_ratio == 0.5
+
+    # Facts written through a context are cached as well.
+    storage.allow_get_value = True
+    cached_ffc = FactFetchingContext(
+        storage=storage, hash_func=pedersen_hash_func, fact_cache=FactCache()
+    )
+    tree = await tree.update(ffc=cached_ffc, modifications=[(0, LeafFact(value=1))])
+    storage.allow_get_value = False
+    assert await tree.get_leaves(ffc=cached_ffc, indices=[0], fact_cls=LeafFact) == {
+        0: LeafFact(value=1)
+    }
+    assert storage.n_mget_calls == height + 1
@@ -1,6 +1,7 @@
 import dataclasses
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from starkware.python.utils import to_bytes
 from starkware.starkware_utils.commitment_tree.binary_fact_tree import BinaryFactDict
 from starkware.starkware_utils.commitment_tree.binary_fact_tree_node import read_node_fact
 from starkware.starkware_utils.commitment_tree.calculation import (
@@ -32,6 +33,10 @@ class BinaryCalculation(HashCalculation):
     def get_dependency_calculations(self) -> List[Calculation[bytes]]:
         return [self.left, self.right]
 
+    def get_hash_inputs(self, dependency_results: List[bytes]) -> List[Tuple[bytes, bytes]]:
+        left_hash, right_hash = dependency_results
+        return [(left_hash, right_hash)]
+
     def calculate(
         self,
         dependency_results: List[bytes],
@@ -54,6 +59,10 @@ class EdgeCalculation(HashCalculation):
     def get_dependency_calculations(self) -> List[Calculation[bytes]]:
         return [self.bottom]
 
+    def get_hash_inputs(self, dependency_results: List[bytes]) -> List[Tuple[bytes, bytes]]:
+        (bottom_hash,) = dependency_results
+        return [(bottom_hash, to_bytes(self.path))]
+
     def calculate(
         self,
         dependency_results: List[bytes],
@@ -130,6 +139,9 @@ class VirtualCalculationNode(CalculationNode[VirtualPatriciaNode], ValidatedData
     def get_dependency_calculations(self) -> List[Calculation[bytes]]:
         return self.bottom_calculation.get_dependency_calculations()
 
+    def get_hash_inputs(self, dependency_results: List[bytes]) -> List[Tuple[bytes, bytes]]:
+        return self.bottom_calculation.get_hash_inputs(dependency_results=dependency_results)
+
     def calculate(
         self,
         dependency_results: List[bytes],
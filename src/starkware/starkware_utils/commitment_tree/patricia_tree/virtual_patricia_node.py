@@ -1,11 +1,12 @@
 import asyncio
 import dataclasses
-from typing import Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 from starkware.starkware_utils.commitment_tree.binary_fact_tree import BinaryFactDict
 from starkware.starkware_utils.commitment_tree.binary_fact_tree_node import (
     BinaryFactTreeNode,
     read_node_fact,
+    read_node_facts,
     write_node_fact,
 )
 from starkware.starkware_utils.commitment_tree.patricia_tree.nodes import (
@@ -183,22 +184,58 @@ class VirtualPatriciaNode(BinaryFactTreeNode, ValidatedDataclass):
         # At this point the preimage of self.bottom_node must be read from the storage, to know
         # what kind of node it represents - a committed edge node, or a binary node.
         fact = await self.read_bottom_node_fact(ffc=ffc, facts=facts)
+        return self._get_children_from_fact(fact=fact)
 
-        if isinstance(fact, EdgeNodeFact):
-            # A previously committed edge node.
-            edge_node = VirtualPatriciaNode(
-                bottom_node=fact.bottom_node,
-                path=fact.edge_path,
-                length=fact.edge_length,
-                height=self.height,
-            )
-            return edge_node._get_virtual_edge_node_children()
+    @classmethod
+    async def get_nodes_children(
+        cls,
+        ffc: FactFetchingContext,
+        nodes: Sequence["BinaryFactTreeNode"],
+        facts: Optional[BinaryFactDict] = None,
+    ) -> List[Tuple["BinaryFactTreeNode", "BinaryFactTreeNode"]]:
+        """
+        Returns the children of each of the given VirtualPatriciaNode objects (see
+        get_children()). The facts needed for that are read from the storage in batches.
 
-        assert isinstance(fact, BinaryNodeFact)
-        return (
-            self.from_hash(hash_value=fact.left_node, height=children_height),
-            self.from_hash(hash_value=fact.right_node, height=children_height),
+        If facts argument is not None, this dictionary is filled with facts read from the DB.
+        """
+        # Downcast arguments.
+        virtual_nodes: List[VirtualPatriciaNode] = []
+        for node in nodes:
+            assert isinstance(node, VirtualPatriciaNode)
+            assert not node.is_leaf, "get_children() must not be called on leaves."
+            virtual_nodes.append(node)
+
+        # Read the facts of the nodes whose children cannot be deduced without them, once per
+        # distinct fact.
+        fact_hashes = list(
+            dict.fromkeys(
+                node.bottom_node
+                for node in virtual_nodes
+                if not (node.is_empty or node.is_virtual_edge)
+            )
+        )
+        node_facts = await read_node_facts(
+            ffc=ffc,
+            inner_node_fact_cls=PatriciaNodeFact,  # type: ignore
+            fact_hashes=fact_hashes,
+            facts=facts,
         )
+        fact_by_hash = dict(zip(fact_hashes, node_facts))
+
+        nodes_children: List[Tuple["BinaryFactTreeNode", "BinaryFactTreeNode"]] = []
+        for node in virtual_nodes:
+            if node.is_empty:
+                empty_child = VirtualPatriciaNode.empty_node(height=node.height - 1)
+                nodes_children.append((empty_child, empty_child))
+            elif node.is_virtual_edge:
+                nodes_children.append(node._get_virtual_edge_node_children())
+            else:
+                nodes_children.append(
+                    node._get_children_from_fact(fact=fact_by_hash[node.bottom_node])
+                )
+
+        return nodes_children
 
     # Internal utils.
 
@@ -259,6 +296,29 @@ class VirtualPatriciaNode(BinaryFactTreeNode, ValidatedDataclass):
             height=non_empty_child.height + 1,
         )
 
+    def _get_children_from_fact(
+        self, fact: PatriciaNodeFact
+    ) -> Tuple["VirtualPatriciaNode", "VirtualPatriciaNode"]:
+        """
+        Returns the children of a node of the form (hash, 0, 0), given the fact of the hash.
+        """
+        if isinstance(fact, EdgeNodeFact):
+            # A previously committed edge node.
+            edge_node = VirtualPatriciaNode(
+                bottom_node=fact.bottom_node,
+                path=fact.edge_path,
+                length=fact.edge_length,
+                height=self.height,
+            )
+            return edge_node._get_virtual_edge_node_children()
+
+        assert isinstance(fact, BinaryNodeFact)
+        children_height = self.height - 1
+        return (
+            self.from_hash(hash_value=fact.left_node, height=children_height),
+            self.from_hash(hash_value=fact.right_node, height=children_height),
+        )
+
     def _get_virtual_edge_node_children(
         self,
     ) -> Tuple["VirtualPatriciaNode", "VirtualPatriciaNode"]:
@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, AsyncIterator, Collection, Dict, NamedTuple, Optional, Tuple, Type, Union
 
 from starkware.python.utils import from_bytes, gather_in_chunks
@@ -8,7 +10,7 @@ from starkware.starkware_utils.commitment_tree.binary_fact_tree_node import (
 )
 from starkware.starkware_utils.commitment_tree.calculation import CalculationNode, NodeFactDict
 from starkware.starkware_utils.commitment_tree.merkle_tree.traverse_tree import traverse_tree
-from starkware.starkware_utils.executor import executor_ctx_var
+from starkware.starkware_utils.executor import executor_ctx_var, executor_n_workers_ctx_var
 from starkware.storage.storage import Fact, FactFetchingContext
 
 UpdateTree = Optional[Union[Tuple[Any, Any], Fact]]
@@ -16,6 +18,10 @@ NodeType = NamedTuple(
     "NodeType", [("index", int), ("tree", BinaryFactTreeNode), ("update", UpdateTree)]
 )
 
+# The number of tasks per worker process that the calculation of the new facts is split into,
+# when it is distributed over a process pool. More tasks than workers allow balancing uneven tasks.
+PROCESS_POOL_TASKS_PER_WORKER = 4
+
 
 async def update_tree(
     tree: TBinaryFactTreeNode,
@@ -118,9 +124,23 @@ async def update_tree(
 
     updated_calc_node = await build_updated_calculation()
 
-    root_node = await updated_calc_node.full_calculate_with_executor(
-        executor=executor_ctx_var.get(), hash_func=ffc.hash_func, fact_nodes=new_facts, depth=5
-    )
+    executor = executor_ctx_var.get()
+    if isinstance(executor, ProcessPoolExecutor):
+        root_node = await updated_calc_node.full_calculate_with_process_pool(
+            executor=executor,
+            hash_func=ffc.hash_func,
+            fact_nodes=new_facts,
+            n_tasks=PROCESS_POOL_TASKS_PER_WORKER * get_n_workers(),
+            batch_hash_func=ffc.batch_hash_func,
+        )
+    else:
+        root_node = await updated_calc_node.full_calculate_with_executor(
+            executor=executor,
+            hash_func=ffc.hash_func,
+            fact_nodes=new_facts,
+            depth=5,
+            batch_hash_func=ffc.batch_hash_func,
+        )
 
     await write_fact_nodes(ffc=ffc, fact_nodes=new_facts)
 
@@ -131,6 +151,16 @@ async def update_tree(
     return root_node
 
 
+def get_n_workers() -> int:
+    """
+    Returns the number of worker processes of the process pool in executor_ctx_var, as given to
+    service_executor() by the code that created it. Defaults to the number of CPUs, which is the
+    default size of a ProcessPoolExecutor.
+    """
+    n_workers = executor_n_workers_ctx_var.get()
+    return n_workers if n_workers is not None else (os.cpu_count() or 1)
+
+
 def build_update_tree(height: int, modifications: Collection[Tuple[int, TFact]]) -> UpdateTree:
     """
     Constructs a tree from leaf updates. This is not a full binary tree. It is just the subtree
@@ -163,3 +193,6 @@ async def write_fact_nodes(ffc: FactFetchingContext, fact_nodes: NodeFactDict):
         root_node.set(storage=ffc.storage, suffix=root_hash)
         for root_hash, root_node in fact_nodes.items()
     )
+    if ffc.fact_cache is not None:
+        for root_hash, root_node in fact_nodes.items():
+            ffc.fact_cache.set(fact=root_node, suffix=root_hash)
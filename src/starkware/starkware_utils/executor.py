@@ -4,16 +4,24 @@ from contextvars import ContextVar
 from typing import Optional
 
 executor_ctx_var: ContextVar[Optional[Executor]] = ContextVar("executor", default=None)
+# The number of workers of the executor in executor_ctx_var, if known.
+executor_n_workers_ctx_var: ContextVar[Optional[int]] = ContextVar(
+    "executor_n_workers", default=None
+)
 
 
 @contextmanager
-def service_executor(executor: Executor):
+def service_executor(executor: Executor, n_workers: Optional[int] = None):
     """
-    Context manager that sets executor_ctx_var context variable.
+    Context manager that sets executor_ctx_var context variable, and executor_n_workers_ctx_var to
+    n_workers (the number of workers the executor was created with, if known).
     """
     try:
         prev = executor_ctx_var.get()
+        prev_n_workers = executor_n_workers_ctx_var.get()
         executor_ctx_var.set(executor)
+        executor_n_workers_ctx_var.set(n_workers)
         yield
     finally:
         executor_ctx_var.set(prev)
+        executor_n_workers_ctx_var.set(prev_n_workers)
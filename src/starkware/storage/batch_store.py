@@ -1,19 +1,108 @@
 import asyncio
 import logging
-from asyncio import Queue
-from typing import Optional, Tuple
+from collections import deque
+from typing import Any, Deque, Dict, Generic, List, Optional, Tuple, TypeVar
 
+from starkware.storage import metrics
 from starkware.storage.storage import Storage
 
 logger = logging.getLogger(__name__)
 NoneType = type(None)
+T = TypeVar("T")
+
+
+class BatchQueue(Generic[T]):
+    """
+    A queue of storage requests, from which the BatchStore workers take batches.
+    """
+
+    def __init__(self, max_batch_size: Optional[int], max_linger: float):
+        self.items: Deque[T] = deque()
+        self.max_batch_size = max_batch_size
+        self.max_linger = max_linger
+        self.not_empty_event = asyncio.Event()
+        # Set when the queue holds a full batch; used to stop lingering early.
+        self.full_batch_event = asyncio.Event()
+
+    def put(self, item: T):
+        self.items.append(item)
+        self.not_empty_event.set()
+        if self._has_full_batch():
+            self.full_batch_event.set()
+
+    async def get_batch(self) -> List[T]:
+        """
+        Waits for the queue to be non-empty, and then returns up to max_batch_size items.
+        If the queue does not hold a full batch, waits up to max_linger seconds for it to fill.
+        """
+        while True:
+            while len(self.items) == 0:
+                self.not_empty_event.clear()
+                await self.not_empty_event.wait()
+
+            if self.max_linger > 0 and not self._has_full_batch():
+                self.full_batch_event.clear()
+                try:
+                    await asyncio.wait_for(self.full_batch_event.wait(), timeout=self.max_linger)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Another worker may have taken the items in the meantime.
+            if len(self.items) > 0:
+                break
+
+        n_items = len(self.items)
+        if self.max_batch_size is not None:
+            n_items = min(n_items, self.max_batch_size)
+        # Since no await occurs in this loop, this is safe.
+        queue_items = [self.items.popleft() for _ in range(n_items)]
+
+        if not self._has_full_batch():
+            self.full_batch_event.clear()
+        return queue_items
+
+    def _has_full_batch(self) -> bool:
+        return self.max_batch_size is not None and len(self.items) >= self.max_batch_size
 
 
 class BatchStore(Storage):
-    def __init__(self, storage: Storage, n_workers_set: int, n_workers_get: int):
+    """
+    A storage that batches concurrent set_value() and get_value() calls into mset() and mget()
+    calls to the underlying storage, processed by n_workers_set and n_workers_get workers.
+
+    Each batch holds up to max_batch_size requests (unbounded if None). A worker that finds less
+    than a full batch waits up to max_linger seconds for more requests before sending it.
+    Up to max_in_flight requests may be queued or in process at a time (unbounded if None);
+    further requests wait for earlier ones to complete.
+    Requests for the same key in a batch are coalesced: a single value is read for all of them,
+    and the last value is written.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        n_workers_set: int,
+        n_workers_get: int,
+        max_batch_size: Optional[int] = None,
+        max_linger: float = 0,
+        max_in_flight: Optional[int] = None,
+        metric_active: bool = False,
+    ):
+        assert max_batch_size is None or max_batch_size > 0, "max_batch_size must be positive."
+        assert max_linger >= 0, "max_linger must be non-negative."
+        assert max_in_flight is None or max_in_flight > 0, "max_in_flight must be positive."
+
         self.store = storage
-        self.set_queue: Queue[Tuple[bytes, bytes, asyncio.Future]] = Queue()
-        self.get_queue: Queue[Tuple[bytes, asyncio.Future]] = Queue()
+        self.set_queue: BatchQueue[Tuple[bytes, bytes, asyncio.Future]] = BatchQueue(
+            max_batch_size=max_batch_size, max_linger=max_linger
+        )
+        self.get_queue: BatchQueue[Tuple[bytes, asyncio.Future]] = BatchQueue(
+            max_batch_size=max_batch_size, max_linger=max_linger
+        )
+        self.in_flight_semaphore: Optional[asyncio.Semaphore] = (
+            None if max_in_flight is None else asyncio.Semaphore(max_in_flight)
+        )
+        self.metric_active = metric_active
         self.tasks = [asyncio.create_task(self.set_value_thread()) for _ in range(n_workers_set)]
         self.tasks += [asyncio.create_task(self.get_value_thread()) for _ in range(n_workers_get)]
 
@@ -22,35 +111,41 @@ class BatchStore(Storage):
             task.cancel()
             try:
                 await task
+            except asyncio.CancelledError:
+                pass
             except Exception as ex:
-                if not isinstance(ex, asyncio.CancelledError):
-                    logger.error(f"Excpetion occurred! Exception: {ex}")
-                    logger.debug("Exception details", exc_info=True)
+                logger.error(f"Excpetion occurred! Exception: {ex}")
+                logger.debug("Exception details", exc_info=True)
+
+    async def _put_and_wait(self, queue: BatchQueue, item: Tuple[Any, ...]) -> Any:
+        future = item[-1]
+        if self.in_flight_semaphore is None:
+            queue.put(item)
+            return await future
+
+        async with self.in_flight_semaphore:
+            queue.put(item)
+            return await future
 
     async def set_value(self, key: bytes, value: bytes):
         # Put value in the set_queue.
         future: asyncio.Future[NoneType] = asyncio.Future()
-        await self.set_queue.put((key, value, future))
-        await future
+        await self._put_and_wait(queue=self.set_queue, item=(key, value, future))
 
     async def get_value(self, key: bytes) -> Optional[bytes]:
         # Put value in the get_queue.
         future: asyncio.Future[Optional[bytes]] = asyncio.Future()
-        await self.get_queue.put((key, future))
-        return await future
+        return await self._put_and_wait(queue=self.get_queue, item=(key, future))
 
     async def del_value(self, key: bytes):
         await self.store.del_value(key)
 
-    async def get_queue_items(self, queue):
-        queue_items = []
-        if queue.empty():
-            # Empty queue, await next item.
-            queue_items.append(await queue.get())
-        for _ in range(queue.qsize()):
-            # Since no await occurs in this loop, this is safe.
-            queue_items.append(queue.get_nowait())
-        return queue_items
+    def _report_batch(self, operation: str, n_keys: int, start_time: float):
+        if not self.metric_active:
+            return
+        latency = asyncio.get_event_loop().time() - start_time
+        metrics.BATCH_STORE_BATCH_LATENCY.labels(operation=operation).observe(latency)
+        metrics.BATCH_STORE_BATCH_SIZE.labels(operation=operation).observe(n_keys)
 
     async def set_value_thread(self):
         """
@@ -58,11 +153,20 @@ class BatchStore(Storage):
         in batch (using 'mset').
         """
         while True:
-            queue_items = await self.get_queue_items(self.set_queue)
+            queue_items = await self.set_queue.get_batch()
             futures_list = [future for _, _, future in queue_items]
-            await self.store.mset({key: val for key, val, _ in queue_items})
+            # Later writes to the same key override earlier ones.
+            updates = {key: val for key, val, _ in queue_items}
+            start_time = asyncio.get_event_loop().time()
+            try:
+                await self.store.mset(updates)
+            except Exception as ex:
+                set_exception(futures=futures_list, exception=ex)
+                continue
+            self._report_batch(operation="mset", n_keys=len(updates), start_time=start_time)
             for item in futures_list:
-                item.set_result(None)
+                if not item.done():
+                    item.set_result(None)
 
     async def get_value_thread(self):
         """
@@ -70,8 +174,24 @@ class BatchStore(Storage):
         in batch (using 'mget').
         """
         while True:
-            queue_items = await self.get_queue_items(self.get_queue)
+            queue_items = await self.get_queue.get_batch()
             futures_list = [future for _, future in queue_items]
-            res = await self.store.mget([key for key, _ in queue_items])
-            for i, item in enumerate(futures_list):
-                item.set_result(res[i])
+            # Read each key once.
+            keys = list(dict.fromkeys(key for key, _ in queue_items))
+            start_time = asyncio.get_event_loop().time()
+            try:
+                res = await self.store.mget(keys)
+            except Exception as ex:
+                set_exception(futures=futures_list, exception=ex)
+                continue
+            self._report_batch(operation="mget", n_keys=len(keys), start_time=start_time)
+            values: Dict[bytes, Optional[bytes]] = dict(zip(keys, res))
+            for key, item in queue_items:
+                if not item.done():
+                    item.set_result(values[key])
+
+
+def set_exception(futures: List[asyncio.Future], exception: Exception):
+    for future in futures:
+        if not future.done():
+            future.set_exception(exception)
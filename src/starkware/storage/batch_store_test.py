@@ -1,10 +1,11 @@
 import asyncio
 import logging
+from typing import List, Optional, Sequence, Tuple
 
 import pytest
 
 from starkware.storage.batch_store import BatchStore
-from starkware.storage.test_utils import DelayedStorage
+from starkware.storage.test_utils import DelayedStorage, MockStorage, timed_call_range
 
 logger = logging.getLogger(__name__)
 
@@ -29,3 +30,77 @@ async def test_batch_store():
     await storage.close()
     for task in tasks:
         await task
+
+
+class MgetRecordingStorage(MockStorage):
+    """
+    A MockStorage that records the keys of each mget() call.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.mget_calls: List[List[bytes]] = []
+
+    async def mget(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        self.mget_calls.append(list(keys))
+        await asyncio.sleep(0.01)
+        return await super().mget(keys=keys)
+
+
+@pytest.mark.asyncio
+async def test_batch_store_batch_size_and_coalescing():
+    inner_store = MgetRecordingStorage()
+    inner_store.db = {b"key%d" % i: b"value%d" % i for i in range(5)}
+    storage = BatchStore(
+        storage=inner_store, n_workers_set=1, n_workers_get=1, max_batch_size=4, metric_active=True
+    )
+
+    keys = [b"key0", b"key1", b"key0", b"key2", b"key3", b"key4"]
+    values = await asyncio.gather(*(storage.get_value(key) for key in keys))
+    assert list(values) == [inner_store.db[key] for key in keys]
+    # The first batch holds 4 requests for 3 distinct keys.
+    assert inner_store.mget_calls == [[b"key0", b"key1", b"key2"], [b"key3", b"key4"]]
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_store_linger():
+    inner_store = MgetRecordingStorage()
+    storage = BatchStore(
+        storage=inner_store, n_workers_set=1, n_workers_get=1, max_batch_size=3, max_linger=10
+    )
+
+    async def get_later(key: bytes, delay: float):
+        await asyncio.sleep(delay)
+        return await storage.get_value(key)
+
+    # The worker waits for the batch to fill, and sends it as soon as it is full.
+    with timed_call_range(max_t=1):
+        await asyncio.gather(get_later(b"a", 0), get_later(b"b", 0.01), get_later(b"c", 0.02))
+    assert inner_store.mget_calls == [[b"a", b"b", b"c"]]
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_store_max_in_flight():
+    inner_store = MgetRecordingStorage()
+    storage = BatchStore(storage=inner_store, n_workers_set=1, n_workers_get=2, max_in_flight=2)
+
+    await asyncio.gather(*(storage.get_value(b"key%d" % i) for i in range(5)))
+    assert max(len(keys) for keys in inner_store.mget_calls) <= 2
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_store_error():
+    class FailingStorage(MockStorage):
+        async def mset(self, updates):
+            raise Exception("Write failed.")
+
+    storage = BatchStore(storage=FailingStorage(), n_workers_set=1, n_workers_get=1)
+    with pytest.raises(Exception, match="Write failed."):
+        await storage.set_value(b"key", b"value")
+    # The worker survives the error.
+    with pytest.raises(Exception, match="Write failed."):
+        await storage.set_value(b"key", b"value")
+    await storage.close()
@@ -1,4 +1,5 @@
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 import cachetools
 
@@ -29,38 +30,194 @@ class DictStorage(Storage):
             pass
 
 
+# The estimated memory overhead of a cached value, in bytes, on top of the length of the value.
+# Covers the key and the cache bookkeeping. Used when the cache size is measured in bytes.
+CACHE_ENTRY_OVERHEAD = 128
+
+
+def get_key_prefix(key: bytes) -> str:
+    """
+    Returns the prefix of a storage key (the part before the first ':'; see DBObject.db_key()),
+    used to label the metrics of CachedStorage.
+    """
+    prefix, separator, _ = key.partition(b":")
+    return prefix.decode("ascii", errors="replace") if len(separator) > 0 else ""
+
+
+class EvictionTrackingLRUCache(cachetools.LRUCache):
+    """
+    An LRU cache that calls on_evict with the key of each value it evicts.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        getsizeof: Optional[Callable[[Any], int]] = None,
+        on_evict: Optional[Callable[[bytes], None]] = None,
+    ):
+        super().__init__(maxsize=maxsize, getsizeof=getsizeof)
+        self.on_evict = on_evict
+
+    def popitem(self):
+        key, value = super().popitem()
+        if self.on_evict is not None:
+            self.on_evict(key)
+        return key, value
+
+
 class CachedStorage(Storage):
-    def __init__(self, storage: Storage, max_size: int, metric_active: Optional[bool] = None):
+    """
+    A storage that caches the values of an underlying storage in memory. Only immutable items
+    are expected (e.g., facts), so cached values are never invalidated.
+
+    max_size bounds the number of cached values, or, if size_in_bytes is True, their total size in
+    bytes (the length of each value plus CACHE_ENTRY_OVERHEAD).
+    If miss_ttl is given, keys that were not found are cached for miss_ttl seconds (up to
+    max_misses keys), so repeated reads of a missing key do not reach the underlying storage.
+    If second_tier is given, it is consulted before the underlying storage and is filled with the
+    values read from (and written to) the underlying storage. It is meant to be a local storage
+    that is larger than the memory cache, such as an SqliteStorage with mmap_size set.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        max_size: int,
+        metric_active: Optional[bool] = None,
+        size_in_bytes: bool = False,
+        miss_ttl: Optional[float] = None,
+        max_misses: int = 2 ** 16,
+        second_tier: Optional[Storage] = None,
+    ):
         self.storage = storage
-        self.cache: cachetools.LRUCache[bytes, Any] = cachetools.LRUCache(maxsize=max_size)
         self.metric_active = False if metric_active is None else metric_active
+        self.cache: cachetools.LRUCache[bytes, Any] = EvictionTrackingLRUCache(
+            maxsize=max_size,
+            getsizeof=(lambda value: len(value) + CACHE_ENTRY_OVERHEAD) if size_in_bytes else None,
+            on_evict=self._on_evict if self.metric_active else None,
+        )
+        self.miss_cache: Optional[cachetools.TTLCache[bytes, bool]] = (
+            None if miss_ttl is None else cachetools.TTLCache(maxsize=max_misses, ttl=miss_ttl)
+        )
+        self.second_tier = second_tier
 
     @classmethod
     async def create_from_config(
-        cls, storage_config: Dict[str, Any], max_size: int, metric_active: bool
+        cls,
+        storage_config: Dict[str, Any],
+        max_size: int,
+        metric_active: bool,
+        size_in_bytes: bool = False,
+        miss_ttl: Optional[float] = None,
+        max_misses: int = 2 ** 16,
+        second_tier_config: Optional[Dict[str, Any]] = None,
     ) -> "CachedStorage":
         return cls(
             storage=await Storage.create_instance_from_config(config=storage_config),
             max_size=max_size,
             metric_active=metric_active,
+            size_in_bytes=size_in_bytes,
+            miss_ttl=miss_ttl,
+            max_misses=max_misses,
+            second_tier=None
+            if second_tier_config is None
+            else await Storage.create_instance_from_config(config=second_tier_config),
         )
 
+    def _on_evict(self, key: bytes):
+        metrics.CACHED_STORAGE_EVICTION.labels(prefix=get_key_prefix(key)).inc()
+
+    def _cache_value(self, key: bytes, value: bytes):
+        if self.miss_cache is not None:
+            self.miss_cache.pop(key, None)
+        try:
+            self.cache[key] = value
+        except ValueError:
+            # The value is larger than the cache.
+            pass
+
+    def _get_cached(self, key: bytes) -> Tuple[bool, Optional[bytes]]:
+        """
+        Returns (True, value) if the value of key (or its absence) is cached,
+        and (False, None) otherwise.
+        """
+        value = self.cache.get(key)
+        if value is not None:
+            return True, value
+        if self.miss_cache is not None and key in self.miss_cache:
+            return True, None
+        return False, None
+
     async def set_value(self, key: bytes, value: bytes):
-        self.cache[key] = value
-        await self.storage.set_value(key, value)
+        self._cache_value(key=key, value=value)
+        if self.second_tier is None:
+            await self.storage.set_value(key, value)
+        else:
+            await asyncio.gather(
+                self.storage.set_value(key, value), self.second_tier.set_value(key, value)
+            )
 
     async def get_value(self, key: bytes) -> Optional[bytes]:
-        if self.metric_active:
-            metrics.CACHED_STORAGE_GET_TOTAL.inc()
-        if key in self.cache:
-            if self.metric_active:
-                metrics.CACHED_STORAGE_GET_CACHE.inc()
-            return self.cache[key]
-        value = await self.storage.get_value(key)
-        if value is None:
-            return None
-        self.cache[key] = value
+        (value,) = await self.mget(keys=[key])
         return value
 
+    async def mget(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        values: Dict[bytes, Optional[bytes]] = {}
+        keys_to_read: List[bytes] = []
+        for key in keys:
+            if key in values:
+                continue
+            is_cached, value = self._get_cached(key=key)
+            if is_cached:
+                values[key] = value
+            else:
+                # Mark the key, so duplicate keys are read once.
+                values[key] = None
+                keys_to_read.append(key)
+
+        if self.metric_active:
+            self._report_reads(keys=keys, keys_read=set(keys_to_read))
+
+        if len(keys_to_read) > 0:
+            values.update(await self._read_through(keys=keys_to_read))
+        return tuple(values[key] for key in keys)
+
+    async def _read_through(self, keys: List[bytes]) -> Dict[bytes, Optional[bytes]]:
+        """
+        Reads the given keys from the second tier and the underlying storage, and caches them.
+        """
+        values: Dict[bytes, Optional[bytes]] = {}
+        if self.second_tier is not None:
+            values.update(zip(keys, await self.second_tier.mget(keys=keys)))
+            keys = [key for key in keys if values[key] is None]
+
+        if len(keys) > 0:
+            storage_values = dict(zip(keys, await self.storage.mget(keys=keys)))
+            values.update(storage_values)
+            if self.second_tier is not None:
+                found_values = {
+                    key: value for key, value in storage_values.items() if value is not None
+                }
+                if len(found_values) > 0:
+                    await self.second_tier.mset(updates=found_values)
+
+        for key, value in values.items():
+            if value is not None:
+                self._cache_value(key=key, value=value)
+            elif self.miss_cache is not None:
+                self.miss_cache[key] = True
+        return values
+
+    def _report_reads(self, keys: Sequence[bytes], keys_read: Set[bytes]):
+        metrics.CACHED_STORAGE_GET_TOTAL.inc(len(keys))
+        n_hits = 0
+        for key in keys:
+            if key in keys_read:
+                metrics.CACHED_STORAGE_MISS.labels(prefix=get_key_prefix(key)).inc()
+            else:
+                metrics.CACHED_STORAGE_HIT.labels(prefix=get_key_prefix(key)).inc()
+                n_hits += 1
+        metrics.CACHED_STORAGE_GET_CACHE.inc(n_hits)
+
     async def del_value(self, key: bytes):
         raise NotImplementedError("CachedStorage is expected to handle only immutable items")
@@ -12,6 +12,45 @@ CACHED_STORAGE_GET_CACHE = prometheus_client.Counter(
     labelnames=(),
 )
 
+CACHED_STORAGE_HIT = prometheus_client.Counter(
+    name="starkware_cached_storage_hit_count",
+    documentation=(
+        "Count of keys read from CachedStorage that were found in its memory cache, "
+        "including cached misses"
+    ),
+    labelnames=("prefix",),
+)
+
+CACHED_STORAGE_MISS = prometheus_client.Counter(
+    name="starkware_cached_storage_miss_count",
+    documentation="Count of keys read from CachedStorage that were not found in its memory cache",
+    labelnames=("prefix",),
+)
+
+CACHED_STORAGE_EVICTION = prometheus_client.Counter(
+    name="starkware_cached_storage_eviction_count",
+    documentation="Count of values evicted from the memory cache of CachedStorage",
+    labelnames=("prefix",),
+)
+
+BATCH_STORE_BATCH_LATENCY = prometheus_client.Histogram(
+    name="starkware_batch_store_batch_latency_seconds",
+    documentation="Latency of the batched mset()/mget() calls of BatchStore",
+    labelnames=("operation",),
+)
+
+BATCH_STORE_BATCH_SIZE = prometheus_client.Histogram(
+    name="starkware_batch_store_batch_size",
+    documentation="Number of distinct keys in the batched mset()/mget() calls of BatchStore",
+    labelnames=("operation",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, float("inf")),
+)
+
 # Metric names may diverge on client argument.
 CACHED_STORAGE_GET_TOTAL_NAME = getattr(CACHED_STORAGE_GET_TOTAL, "_name")
 CACHED_STORAGE_GET_CACHE_NAME = getattr(CACHED_STORAGE_GET_CACHE, "_name")
+CACHED_STORAGE_HIT_NAME = getattr(CACHED_STORAGE_HIT, "_name")
+CACHED_STORAGE_MISS_NAME = getattr(CACHED_STORAGE_MISS, "_name")
+CACHED_STORAGE_EVICTION_NAME = getattr(CACHED_STORAGE_EVICTION, "_name")
+BATCH_STORE_BATCH_LATENCY_NAME = getattr(BATCH_STORE_BATCH_LATENCY, "_name")
+BATCH_STORE_BATCH_SIZE_NAME = getattr(BATCH_STORE_BATCH_SIZE, "_name")
@@ -0,0 +1,192 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from starkware.python.utils import blockify
+from starkware.storage.storage import Storage
+
+T = TypeVar("T")
+
+# The maximal number of keys in a single SELECT statement. Older SQLite versions limit the number
+# of variables in a statement to 999.
+MAX_KEYS_PER_QUERY = 900
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL")
+
+
+class SqliteStorage(Storage):
+    """
+    A persistent local storage, backed by an SQLite database file in WAL mode.
+
+    Writes are buffered in memory and committed to the database in a single transaction once
+    max_pending_writes writes are buffered, or when flush() (or close()) is called. Hence, up to
+    max_pending_writes of the latest writes may be lost on a crash; use max_pending_writes=1 to
+    commit every write. Reads see the buffered writes, including those that are being committed.
+    The synchronous argument sets SQLite's synchronous pragma: with "NORMAL" (the default) a commit
+    is not fsynced until the next WAL checkpoint; with "FULL" each commit is fsynced.
+    If mmap_size is given, up to mmap_size bytes of the database file are memory-mapped (see
+    SQLite's mmap_size pragma), which saves a copy per read on large, read-mostly databases.
+
+    All the database operations run on a dedicated thread, so they do not block the event loop.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_pending_writes: int = 1000,
+        synchronous: str = "NORMAL",
+        mmap_size: Optional[int] = None,
+    ):
+        assert max_pending_writes > 0, "max_pending_writes must be positive."
+        assert synchronous in SYNCHRONOUS_MODES, f"Unexpected synchronous mode: {synchronous}."
+        assert mmap_size is None or mmap_size >= 0, "mmap_size must be non-negative."
+
+        self.path = path
+        self.max_pending_writes = max_pending_writes
+        # Writes that were not committed yet. A value of None marks a deleted key.
+        self.pending_writes: Dict[bytes, Optional[bytes]] = {}
+        # Batches of writes that are being committed (oldest first), which are still visible to
+        # reads until their commit finishes.
+        self.inflight_writes: List[Dict[bytes, Optional[bytes]]] = []
+        # The database connection may only be used by the thread that created it.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite_storage")
+        self.connection = self.executor.submit(self._connect, synchronous, mmap_size).result()
+
+    def _connect(self, synchronous: str, mmap_size: Optional[int]) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={synchronous}")
+        if mmap_size is not None:
+            connection.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS storage (key BLOB PRIMARY KEY, value BLOB NOT NULL) "
+            "WITHOUT ROWID"
+        )
+        connection.commit()
+        return connection
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        return await asyncio.get_event_loop().run_in_executor(self.executor, func, *args)
+
+    # Database operations; must run on self.executor.
+
+    def _read(self, keys: Sequence[bytes]) -> Dict[bytes, bytes]:
+        values: Dict[bytes, bytes] = {}
+        for keys_chunk in blockify(keys, chunk_size=MAX_KEYS_PER_QUERY):
+            query = (
+                "SELECT key, value FROM storage WHERE key IN "
+                f"({', '.join('?' * len(keys_chunk))})"
+            )
+            values.update(self.connection.execute(query, keys_chunk))
+        return values
+
+    def _write(self, writes: List[Tuple[bytes, Optional[bytes]]]):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO storage (key, value) VALUES (?, ?)",
+                [(key, value) for key, value in writes if value is not None],
+            )
+            self.connection.executemany(
+                "DELETE FROM storage WHERE key = ?",
+                [(key,) for key, value in writes if value is None],
+            )
+
+    def _compact(self):
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.connection.execute("VACUUM")
+
+    # Storage API.
+
+    async def set_value(self, key: bytes, value: bytes):
+        assert isinstance(key, bytes), f"key must be bytes. Got {type(key)}."
+        assert isinstance(value, bytes), f"value must be bytes. Got {type(value)}."
+        self.pending_writes[key] = value
+        await self._maybe_flush()
+
+    async def mset(self, updates: Dict[bytes, bytes]):
+        for key, value in updates.items():
+            assert isinstance(key, bytes), f"key must be bytes. Got {type(key)}."
+            assert isinstance(value, bytes), f"value must be bytes. Got {type(value)}."
+        self.pending_writes.update(updates)
+        await self._maybe_flush()
+
+    async def setnx_value(self, key: bytes, value: bytes) -> bool:
+        if await self.get_value(key=key) is not None:
+            return False
+        # Another coroutine may have written the key while it was read. Checking the buffered
+        # writes and writing the key are done without yielding to the event loop.
+        if self._get_buffered_writes(keys=[key]).get(key) is not None:
+            return False
+        await self.set_value(key=key, value=value)
+        return True
+
+    async def get_value(self, key: bytes) -> Optional[bytes]:
+        (value,) = await self.mget(keys=[key])
+        return value
+
+    async def mget(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        # Take the buffered values before reading, as they may be flushed during the read. Commits
+        # that finish during the read are seen by it, as the database operations run in order.
+        buffered_values = self._get_buffered_writes(keys=keys)
+        keys_to_read = [key for key in keys if key not in buffered_values]
+        values = await self._run(self._read, keys_to_read) if len(keys_to_read) > 0 else {}
+        return tuple(
+            buffered_values[key] if key in buffered_values else values.get(key) for key in keys
+        )
+
+    def _get_buffered_writes(self, keys: Sequence[bytes]) -> Dict[bytes, Optional[bytes]]:
+        """
+        Returns the latest buffered (pending or in-flight) write of each of the given keys that has
+        one.
+        """
+        buffered_values: Dict[bytes, Optional[bytes]] = {}
+        for writes in (self.pending_writes, *reversed(self.inflight_writes)):
+            for key in keys:
+                if key in writes and key not in buffered_values:
+                    buffered_values[key] = writes[key]
+        return buffered_values
+
+    async def del_value(self, key: bytes):
+        self.pending_writes[key] = None
+        await self._maybe_flush()
+
+    async def _maybe_flush(self):
+        if len(self.pending_writes) >= self.max_pending_writes:
+            await self.flush()
+
+    async def flush(self):
+        """
+        Commits the buffered writes to the database.
+        """
+        if len(self.pending_writes) == 0:
+            return
+
+        # Writes made while the commit is in progress are kept for the next flush. The committed
+        # writes remain visible to reads until the commit finishes.
+        writes = self.pending_writes
+        self.pending_writes = {}
+        self.inflight_writes.append(writes)
+        try:
+            await self._run(self._write, list(writes.items()))
+        except Exception:
+            self.pending_writes = {**writes, **self.pending_writes}
+            raise
+        finally:
+            self.inflight_writes = [batch for batch in self.inflight_writes if batch is not writes]
+
+    async def compact(self):
+        """
+        Commits the buffered writes, moves the content of the write-ahead log into the database file
+        and rebuilds the database file to reclaim the space of deleted and overwritten values.
+        """
+        await self.flush()
+        await self._run(self._compact)
+
+    async def close(self):
+        """
+        Commits the buffered writes and closes the database.
+        """
+        await self.flush()
+        await self._run(self.connection.close)
+        self.executor.shutdown()
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from starkware.storage.sqlite_storage import SqliteStorage
+from starkware.storage.storage import Storage
+
+
+def read_committed_value(path: str, key: bytes):
+    """
+    Reads the value of key directly from the database file, ignoring writes that were not committed.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        row = connection.execute("SELECT value FROM storage WHERE key = ?", (key,)).fetchone()
+    finally:
+        connection.close()
+    return None if row is None else row[0]
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return os.path.join(tmp_path, "storage.db")
+
+
+@pytest.mark.asyncio
+async def test_sqlite_storage(db_path: str):
+    storage = SqliteStorage(path=db_path, max_pending_writes=3)
+
+    assert await storage.get_value(key=b"a") is None
+    await storage.set_value(key=b"a", value=b"1")
+    await storage.mset(updates={b"b": b"2", b"c": b"3"})
+    assert await storage.mget(keys=[b"c", b"x", b"a"]) == (b"3", None, b"1")
+
+    assert await storage.setnx_value(key=b"a", value=b"10") is False
+    assert await storage.setnx_value(key=b"d", value=b"4") is True
+    assert await storage.get_value(key=b"d") == b"4"
+
+    await storage.del_value(key=b"b")
+    assert await storage.get_value(key=b"b") is None
+    await storage.close()
+
+    # Reopen the database and check that the values persisted.
+    storage = SqliteStorage(path=db_path)
+    assert await storage.mget(keys=[b"a", b"b", b"c", b"d"]) == (b"1", None, b"3", b"4")
+    await storage.compact()
+    assert await storage.get_int(key=b"a") == 1
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_storage_write_batching(db_path: str):
+    storage = SqliteStorage(path=db_path, max_pending_writes=3)
+
+    await storage.set_value(key=b"a", value=b"1")
+    await storage.set_value(key=b"b", value=b"2")
+    # The writes are buffered, but visible to reads.
+    assert await storage.get_value(key=b"a") == b"1"
+    assert read_committed_value(path=db_path, key=b"a") is None
+
+    # The third write fills the buffer and commits all of them.
+    await storage.set_value(key=b"c", value=b"3")
+    assert read_committed_value(path=db_path, key=b"a") == b"1"
+
+    await storage.del_value(key=b"a")
+    await storage.flush()
+    assert read_committed_value(path=db_path, key=b"a") is None
+    assert read_committed_value(path=db_path, key=b"c") == b"3"
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_storage_concurrent_setnx(db_path: str):
+    # With max_pending_writes=1, every write is committed while the other calls are running.
+    storage = SqliteStorage(path=db_path, max_pending_writes=1)
+    results = await asyncio.gather(
+        *(storage.setnx_value(key=b"k", value=bytes([i])) for i in range(5))
+    )
+    assert results.count(True) == 1
+    assert await storage.get_value(key=b"k") == bytes([results.index(True)])
+    await storage.close()
+    assert read_committed_value(path=db_path, key=b"k") == bytes([results.index(True)])
+
+
+@pytest.mark.asyncio
+async def test_from_config(db_path: str):
+    config = {
+        "class": "starkware.storage.sqlite_storage.SqliteStorage",
+        "config": {"path": db_path, "max_pending_writes": 1, "synchronous": "FULL"},
+    }
+    storage = await Storage.create_instance_from_config(config=config)
+    assert isinstance(storage, SqliteStorage)
+    await storage.set_value(key=b"a", value=b"1")
+    assert read_committed_value(path=db_path, key=b"a") == b"1"
+    await storage.close()
@@ -19,6 +19,7 @@ python_lib(starkware_storage_lib
     imm_storage.py
     internal_proxy_storage.py
     names.py
+    sqlite_storage.py
     storage.py
 
     LIBS
@@ -61,11 +62,13 @@ full_python_test(starkware_storage_test
     batch_store_test.py
     gated_storage_test.py
     internal_proxy_storage_test.py
+    sqlite_storage_test.py
     storage_test.py
 
     LIBS
     starkware_storage_lib
     starkware_storage_test_utils_lib
+    starkware_storage_utils_lib
     pip_pytest
     pip_pytest_asyncio
 )
@@ -3,7 +3,9 @@ import contextlib
 import dataclasses
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
+
+import cachetools
 
 from starkware.python.utils import from_bytes, get_exception_repr, to_bytes
 from starkware.starkware_utils.config_base import get_object_by_path
@@ -14,7 +16,10 @@ logger = logging.getLogger(__name__)
 
 HASH_BYTES = 32
 HashFunctionType = Callable[[bytes, bytes], bytes]
+# A function that hashes a batch of (x, y) pairs, equivalent to [hash_func(x, y) for x, y in pairs].
+BatchHashFunctionType = Callable[[Sequence[Tuple[bytes, bytes]]], List[bytes]]
 TIntToIntMapping = TypeVar("TIntToIntMapping", bound="IntToIntMapping")
+TFact = TypeVar("TFact", bound="Fact")
 
 
 class Storage(ABC):
@@ -152,6 +157,25 @@ class DBObject(Serializable):
 
         return await asyncio.get_event_loop().run_in_executor(None, cls.deserialize, result)
 
+    @classmethod
+    async def get_many_or_fail(
+        cls: Type[TDBObject], storage: Storage, suffixes: Sequence[bytes]
+    ) -> List[TDBObject]:
+        """
+        Returns the values under the keys cls.db_key(suffix) in the storage, for the given
+        suffixes, using a single mget call.
+        If any of the keys does not exist, raises an exception.
+        """
+        db_keys = [cls.db_key(suffix=suffix) for suffix in suffixes]
+        results: List[bytes] = []
+        for db_key, result in zip(db_keys, await storage.mget(keys=db_keys)):
+            assert result is not None, f"Key {db_key!r} does not appear in storage."
+            results.append(result)
+
+        return await asyncio.get_event_loop().run_in_executor(
+            None, lambda: [cls.deserialize(result) for result in results]
+        )
+
     async def set(self, storage: Storage, suffix: bytes):
         serialized = await asyncio.get_event_loop().run_in_executor(None, self.serialize)
         await storage.set_value(self.db_key(suffix), serialized)
@@ -246,19 +270,31 @@ class FactFetchingContext:
     """
     Information needed to fetch and store facts from a storage.
     A user may provide different implementations to the hash function in here.
+    If batch_hash_func is given, it must compute the same hashes as hash_func; it is used to
+    compute many hashes at once where possible (e.g., the nodes of a level of a commitment tree).
+    If fact_cache is given, facts read or written through this context (e.g., commitment tree
+    nodes) are kept there in their deserialized form and shared by all the users of the context.
     """
 
     def __init__(
-        self, storage: Storage, hash_func: HashFunctionType, n_workers: Optional[int] = None
+        self,
+        storage: Storage,
+        hash_func: HashFunctionType,
+        n_workers: Optional[int] = None,
+        fact_cache: Optional["FactCache"] = None,
+        batch_hash_func: Optional[BatchHashFunctionType] = None,
     ):
         self.storage = storage
         self.hash_func = hash_func
         self.n_workers = n_workers
+        self.fact_cache = fact_cache
+        self.batch_hash_func = batch_hash_func
 
     def __repr__(self) -> str:
         return (
             f"{type(self)}(storage={self.storage!r}, hash_func={self.hash_func!r}, "
-            f"n_workers={self.n_workers!r})"
+            f"n_workers={self.n_workers!r}, fact_cache={self.fact_cache!r}, "
+            f"batch_hash_func={self.batch_hash_func!r})"
         )
 
 
@@ -275,9 +311,44 @@ class Fact(DBObject):
     async def set_fact(self, ffc: FactFetchingContext) -> bytes:
         hash_val = self._hash(ffc.hash_func)
         await self.set(storage=ffc.storage, suffix=hash_val)
+        if ffc.fact_cache is not None:
+            ffc.fact_cache.set(fact=self, suffix=hash_val)
         return hash_val
 
 
+class FactCache:
+    """
+    A bounded LRU cache of deserialized facts, keyed by their DB keys.
+    As facts are immutable, cached facts never become stale.
+    Counts the cache hits and misses, to allow monitoring the hit ratio.
+    """
+
+    def __init__(self, max_size: int = 2 ** 16):
+        self.cache: cachetools.LRUCache[bytes, Fact] = cachetools.LRUCache(maxsize=max_size)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fact_cls: Type[TFact], suffix: bytes) -> Optional[TFact]:
+        fact = self.cache.get(fact_cls.db_key(suffix=suffix))
+        if not isinstance(fact, fact_cls):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return fact
+
+    def set(self, fact: "Fact", suffix: bytes):
+        self.cache[fact.db_key(suffix=suffix)] = fact
+
+    @property
+    def hit_ratio(self) -> float:
+        n_lookups = self.hits + self.misses
+        return 0.0 if n_lookups == 0 else self.hits / n_lookups
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(max_size={self.cache.maxsize}, hit_ratio={self.hit_ratio})"
+
+
 class LockError(Exception):
     pass
 
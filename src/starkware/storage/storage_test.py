@@ -1,9 +1,13 @@
 import asyncio
+from typing import Optional, Sequence, Tuple
 
+import prometheus_client
 import pytest
 
-from starkware.storage.dict_storage import DictStorage
-from starkware.storage.storage import IntToIntMapping, Storage
+from starkware.storage import metrics
+from starkware.storage.dict_storage import CachedStorage, DictStorage
+from starkware.storage.storage import FactCache, IntToIntMapping, Storage
+from starkware.storage.storage_utils import LeafFact
 from starkware.storage.test_utils import DummyLockManager
 
 
@@ -45,3 +49,105 @@ def test_int_to_int_mapping_serializability():
     tested_object = IntToIntMapping(value=2021)
     serialized = tested_object.serialize()
     assert tested_object == IntToIntMapping.deserialize(data=serialized)
+
+
+class ReadCountingStorage(DictStorage):
+    """
+    A DictStorage that counts the keys read from it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.n_reads = 0
+
+    async def get_value(self, key: bytes) -> Optional[bytes]:
+        self.n_reads += 1
+        return await super().get_value(key=key)
+
+    async def mget(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        self.n_reads += len(keys)
+        return tuple(self.db.get(key) for key in keys)
+
+
+def get_metric_value(name: str, prefix: str) -> float:
+    value = prometheus_client.REGISTRY.get_sample_value(f"{name}_total", {"prefix": prefix})
+    return 0 if value is None else value
+
+
+@pytest.mark.asyncio
+async def test_cached_storage_size_in_bytes():
+    storage = ReadCountingStorage()
+    # Room for two values of 100 bytes.
+    cached_storage = CachedStorage(
+        storage=storage, max_size=2 * (100 + 128), metric_active=True, size_in_bytes=True
+    )
+    evictions_before = get_metric_value(name=metrics.CACHED_STORAGE_EVICTION_NAME, prefix="a")
+
+    for i in range(3):
+        await cached_storage.set_value(key=b"a:%d" % i, value=bytes(100))
+    assert len(cached_storage.cache) == 2
+    assert (
+        get_metric_value(name=metrics.CACHED_STORAGE_EVICTION_NAME, prefix="a")
+        == evictions_before + 1
+    )
+
+    # A value that is larger than the cache is not cached.
+    await cached_storage.set_value(key=b"a:large", value=bytes(1000))
+    assert await cached_storage.get_value(key=b"a:large") == bytes(1000)
+    assert len(cached_storage.cache) == 2
+    assert storage.n_reads == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_storage_mget_and_misses():
+    storage = ReadCountingStorage()
+    await storage.mset(updates={b"b:0": b"0", b"b:1": b"1"})
+    cached_storage = CachedStorage(storage=storage, max_size=10, metric_active=True, miss_ttl=60)
+    hits_before = get_metric_value(name=metrics.CACHED_STORAGE_HIT_NAME, prefix="b")
+    misses_before = get_metric_value(name=metrics.CACHED_STORAGE_MISS_NAME, prefix="b")
+
+    keys = [b"b:0", b"b:1", b"b:2", b"b:0"]
+    assert await cached_storage.mget(keys=keys) == (b"0", b"1", None, b"0")
+    assert storage.n_reads == 3
+    # The values, as well as the missing key, are cached.
+    assert await cached_storage.mget(keys=keys) == (b"0", b"1", None, b"0")
+    assert storage.n_reads == 3
+    assert get_metric_value(name=metrics.CACHED_STORAGE_HIT_NAME, prefix="b") == hits_before + 4
+    assert get_metric_value(name=metrics.CACHED_STORAGE_MISS_NAME, prefix="b") == misses_before + 4
+
+    # Writing a missing key replaces the cached miss.
+    await cached_storage.set_value(key=b"b:2", value=b"2")
+    assert await cached_storage.get_value(key=b"b:2") == b"2"
+    assert storage.n_reads == 3
+
+
+@pytest.mark.asyncio
+async def test_cached_storage_second_tier():
+    storage = ReadCountingStorage()
+    second_tier = ReadCountingStorage()
+    await storage.set_value(key=b"c:0", value=b"0")
+    cached_storage = CachedStorage(storage=storage, max_size=1, second_tier=second_tier)
+
+    assert await cached_storage.get_value(key=b"c:0") == b"0"
+    assert second_tier.db == {b"c:0": b"0"}
+    await cached_storage.set_value(key=b"c:1", value=b"1")
+    assert second_tier.db == {b"c:0": b"0", b"c:1": b"1"}
+
+    # b"c:0" was evicted from the memory cache, and is read from the second tier.
+    assert await cached_storage.get_value(key=b"c:0") == b"0"
+    assert storage.n_reads == 1
+    assert second_tier.n_reads == 2
+
+
+def test_fact_cache():
+    fact_cache = FactCache(max_size=1)
+    fact = LeafFact(value=1)
+    assert fact_cache.get(fact_cls=LeafFact, suffix=b"1") is None
+
+    fact_cache.set(fact=fact, suffix=b"1")
+    assert fact_cache.get(fact_cls=LeafFact, suffix=b"1") is fact
+    assert (fact_cache.hits, fact_cache.misses) == (1, 1)
+
+    # The cache is bounded.
+    fact_cache.set(fact=LeafFact(value=2), suffix=b"2")
+    assert fact_cache.get(fact_cls=LeafFact, suffix=b"1") is None